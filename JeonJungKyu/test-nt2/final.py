@@ -316,19 +316,13 @@ def generate_response_stream(user_input: str):
     RAG 시스템을 사용하여 사용자 입력에 대한 응답을 스트림으로 생성합니다.
     """
     try:
-        # RAG 시스템 호출 (스트림 방식으로 가정)
-        # run_flexible_rag가 generator를 반환한다고 가정
+        # RAG 시스템 호출 (LLM 토큰 단위 스트림)
         for chunk in run_flexible_rag(user_input):
             yield chunk
     except Exception as e:
         # RAG 시스템 오류 시 fallback 응답
         st.error(f"RAG 시스템 오류: {str(e)}")
-        fallback_response = generate_fallback_response(user_input)
-        # fallback 응답을 스트림처럼 처리
-        for word in fallback_response.split():
-            yield word + " "
-            import time
-            time.sleep(0.05)  # 시각적 효과를 위한 딜레이
+        yield generate_fallback_response(user_input)
 
 
 def generate_fallback_response(user_input: str) -> str:
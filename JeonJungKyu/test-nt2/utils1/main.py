@@ -1,9 +1,11 @@
 from .handle_node import (handle_accounting1, handle_accounting2, handle_accounting3,
                           handle_business1, handle_business2, handle_business3,
                           handle_financial1, handle_financial2, handle_financial3,
-                          handle_hybrid1, handle_hybrid2, handle_hybrid3, elief)
+                          handle_hybrid1, handle_hybrid2, handle_hybrid3, elief,
+                          build_accounting_inputs, build_business_inputs, build_financial_inputs, build_hybrid_inputs)
 from .chain_setting import create_chain
 import os
+import time
 
 simple_chain, classification_chain, extract_chain,hybrid_chain1, hybrid_chain2, hybrid_chain3,account_chain1, account_chain2, account_chain3,business_chain1, business_chain2, business_chain3, financial_chain1, financial_chain2, financial_chain3 = create_chain()
 
@@ -80,3 +82,43 @@ def run_flexible_rag3(question: str) -> str:
         return elief(question)
     else:
         return f"❗질문의 유형을 정확히 분류할 수 없습니다.\n(모델 응답: {type_output})"
+
+
+# final.py 용 스트리밍 분기 실행 함수 (LLM 토큰을 그대로 흘려보냄)
+# metrics 딕셔너리를 넘기면 첫 토큰까지 걸린 시간(time_to_first_token)을 기록함
+def run_flexible_rag(question: str, level: int = 1, metrics: dict | None = None):
+    started = time.perf_counter()
+    metrics = metrics if metrics is not None else {}
+
+    type_output = classification_chain.invoke({"question": question}).strip().lower()
+    type_result = type_output.split("작업유형:")[-1].strip() if "작업유형:" in type_output else type_output
+    metrics["type"] = type_result
+
+    # 근거 수집은 handle 함수와 같은 build_*_inputs 로 하고, 마지막 체인만 stream() 으로 실행
+    answer = None
+    if type_result == "accounting":
+        chain = [account_chain1, account_chain2, account_chain3][level - 1]
+        inputs = build_accounting_inputs(question)
+    elif type_result == "business":
+        chain = [business_chain1, business_chain2, business_chain3][level - 1]
+        inputs = build_business_inputs(question)
+    elif type_result == "finance":
+        chain = [financial_chain1, financial_chain2, financial_chain3][level - 1]
+        inputs = build_financial_inputs(question)
+    elif type_result == "hybrid":
+        chain = [hybrid_chain1, hybrid_chain2, hybrid_chain3][level - 1]
+        inputs = build_hybrid_inputs(question)
+    elif type_result == "else":
+        chain, inputs = simple_chain, {"question": question}
+    else:
+        chain, inputs = None, None
+        answer = f"❗질문의 유형을 정확히 분류할 수 없습니다.\n(모델 응답: {type_output})"
+
+    chunks = chain.stream(inputs) if chain is not None else iter([answer])
+    for chunk in chunks:
+        if not chunk:
+            continue
+        if "time_to_first_token" not in metrics:
+            metrics["time_to_first_token"] = time.perf_counter() - started
+            print(f"⏱️ 첫 토큰까지 {metrics['time_to_first_token']:.2f}초 (유형: {type_result})")
+        yield chunk
@@ -7,6 +7,7 @@ import base64
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 import re
+import uuid
 from typing import List, Dict
 import pandas as pd
 from pykrx import stock
@@ -17,9 +18,8 @@ import markdown
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 # RAG 시스템 import (두 번째 파일의 RAG 시스템 사용)
-from utils1.main import run_flexible_rag1
-from utils1.main import run_flexible_rag2
-from utils1.main import run_flexible_rag3
+# 모델/인덱스는 RAG 서버(python -m utils1.server)에서 로딩하고, 화면은 RAG_SERVER_URL 로 질문만 전달
+from utils1.rag_client import stream_flexible_rag1, stream_flexible_rag2, stream_flexible_rag3
 
 
 # 이미지를 base64로 인코딩하는 함수
@@ -530,37 +530,33 @@ def time_ago(pub_date: str) -> str:
 def generate_response_stream(user_input: str):
     """
     RAG 시스템을 사용하여 사용자 입력에 대한 응답을 스트림으로 생성합니다.
-    선택된 레벨에 따라 다른 RAG 함수를 호출합니다.
+    선택된 레벨에 따라 다른 RAG 함수를 호출하고, LLM이 생성하는 토큰을 그대로 전달합니다.
+    첫 토큰까지 걸린 시간 등은 st.session_state.last_rag_metrics 에 기록됩니다.
     """
+    metrics = {"level": st.session_state.selected_level}
+    st.session_state.last_rag_metrics = metrics
+    # 같은 세션에서 같은 질문을 다른 레벨로 다시 물으면 검색 결과를 재사용하도록 세션 id 전달
+    session_id = st.session_state.rag_session_id
+    streamed = False
     try:
-        # 선택된 레벨에 따라 해당하는 RAG 함수 호출
-        if st.session_state.selected_level == "초급":
-            response = run_flexible_rag1(user_input)
-        elif st.session_state.selected_level == "중급":
-            response = run_flexible_rag2(user_input)
+        # 선택된 레벨에 따라 해당하는 RAG 스트리밍 함수 호출
+        if st.session_state.selected_level == "중급":
+            chunks = stream_flexible_rag2(user_input, metrics, session_id)
         elif st.session_state.selected_level == "고급":
-            response = run_flexible_rag3(user_input)
+            chunks = stream_flexible_rag3(user_input, metrics, session_id)
         else:
             # 기본값은 초급
-            response = run_flexible_rag1(user_input)
+            chunks = stream_flexible_rag1(user_input, metrics, session_id)
 
-        # 응답을 단어 단위로 분할하여 스트리밍
-        words = response.split()
-        for word in words:
-            yield word + " "
-            import time
-            time.sleep(0.1)  # 단어 간 딜레이 (0.1초)
+        for chunk in chunks:
+            streamed = True
+            yield chunk
 
     except Exception as e:
-        # RAG 시스템 오류 시 fallback 응답
+        # RAG 시스템 오류 시 fallback 응답 (이미 일부가 출력된 경우에는 덧붙이지 않음)
         st.error(f"RAG 시스템 오류: {str(e)}")
-        fallback_response = generate_fallback_response(user_input)
-        # fallback 응답을 단어 단위로 스트리밍
-        words = fallback_response.split()
-        for word in words:
-            yield word + " "
-            import time
-            time.sleep(0.1)  # 단어 간 딜레이
+        if not streamed:
+            yield generate_fallback_response(user_input)
 
 
 def generate_fallback_response(user_input: str) -> str:
@@ -598,6 +594,10 @@ if "selected_level" not in st.session_state:
     st.session_state.selected_level = "초급"
 if "info_mode" not in st.session_state:
     st.session_state.info_mode = "뉴스"
+if "last_rag_metrics" not in st.session_state:
+    st.session_state.last_rag_metrics = {}
+if "rag_session_id" not in st.session_state:
+    st.session_state.rag_session_id = uuid.uuid4().hex
 
 
 # 대화 관리 함수들
@@ -1259,7 +1259,8 @@ with col_chat:
         st.session_state.messages.append({
             "role": "assistant",
             "content": bot_reply,
-            "level": st.session_state.selected_level
+            "level": st.session_state.selected_level,
+            "metrics": dict(st.session_state.last_rag_metrics)
         })
 
         # 응답 완료 후 플래그 리셋
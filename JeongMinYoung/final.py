@@ -1,7 +1,7 @@
 import streamlit as st
 from datetime import datetime
 import time
-from utils1.main import run_flexible_rag
+from utils1.rag_client import run_flexible_rag
 import requests
 import os
 from dotenv import load_dotenv
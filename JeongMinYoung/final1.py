@@ -13,7 +13,7 @@ from typing import List, Dict
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 # RAG 시스템 import
-from utils1.main import run_flexible_rag3
+from utils1.rag_client import run_flexible_rag3
 
 
 # 이미지를 base64로 인코딩하는 함수
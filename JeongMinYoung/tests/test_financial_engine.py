@@ -0,0 +1,37 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils1.financial_engine import ITEM_NAMES, compute_ratios
+
+
+# 항목 x 연도 금액표 (자본총계, 당기순이익만 채움)
+def _frame(equity: dict[int, float], net_income: dict[int, float]) -> pd.DataFrame:
+    frame = pd.DataFrame(index=ITEM_NAMES, columns=sorted(equity), dtype=float)
+    frame.loc["자본총계"] = pd.Series(equity)
+    frame.loc["당기순이익"] = pd.Series(net_income)
+    return frame
+
+
+def test_roe_uses_average_equity_for_consecutive_years():
+    frame = _frame({2023: 100.0, 2024: 300.0}, {2023: 10.0, 2024: 20.0})
+    roe = compute_ratios(frame).loc["ROE"]
+
+    assert roe[2023] == pytest.approx(10.0)  # 전기 자본 없음 -> 기말자본
+    assert roe[2024] == pytest.approx(20.0 / 200.0 * 100)
+
+
+def test_roe_does_not_average_across_missing_years():
+    # 2020, 2024 요청 -> 전기 금액으로 2019, 2023 도 채워진 표
+    frame = _frame({2019: 50.0, 2020: 150.0, 2023: 400.0, 2024: 600.0},
+                   {2019: 5.0, 2020: 10.0, 2023: 40.0, 2024: 50.0})
+    roe = compute_ratios(frame).loc["ROE"]
+
+    assert roe[2019] == pytest.approx(10.0)
+    assert roe[2020] == pytest.approx(10.0 / 100.0 * 100)
+    assert roe[2023] == pytest.approx(40.0 / 400.0 * 100)  # 2020 자본과 평균하지 않음
+    assert roe[2024] == pytest.approx(50.0 / 500.0 * 100)
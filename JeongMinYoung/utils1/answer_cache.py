@@ -0,0 +1,179 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+
+# 비슷한 질문에 대한 최종 답변을 재사용하는 의미 기반 답변 캐시 (SQLite)
+# - 키: (레벨, 작업유형, 기업코드, 연도) 가 같은 항목 중 정규화된 질문 임베딩의 코사인 유사도가 ANSWER_CACHE_THRESHOLD 이상
+#   예) "삼성전자 2023년 매출 알려줘" / "삼성전자 23년도 매출액은?" -> 같은 (레벨, finance, 00126380, 2023) 에서 유사도 비교
+#   회사는 이름이 아니라 확인된 기업코드로 묶어서 라우팅 경로(규칙/LLM)나 표기("삼성전자"/"삼성 전자")가 달라도 같은 키가 됨
+#   세부 주제(매출/매출액 등)는 키에 넣지 않고 질문 임베딩 유사도로만 비교
+# - 회사/연도가 없는 질문(회계 개념, 회사 없는 사업 질문)은 키가 넓어서 ANSWER_CACHE_NO_ENTITY_THRESHOLD 로 더 엄격하게 비교
+#   (1 이상으로 설정하면 이런 질문은 캐시하지 않음)
+# - ANSWER_CACHE_TTL 초가 지난 항목은 사용하지 않고, ANSWER_CACHE_MAX_ENTRIES 를 넘으면 가장 오래 안 쓴 항목부터 삭제 (LRU)
+# - DART 데이터나 인덱스가 바뀌면 invalidate() 로 기업코드 단위/전체 삭제
+
+DEFAULT_CACHE_PATH = os.getenv(
+    "ANSWER_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "answer_cache.sqlite3")
+)
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.92"))
+ANSWER_CACHE_NO_ENTITY_THRESHOLD = float(os.getenv("ANSWER_CACHE_NO_ENTITY_THRESHOLD", "0.97"))
+ANSWER_CACHE_TTL = int(os.getenv("ANSWER_CACHE_TTL", str(24 * 3600)))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "5000"))
+
+_PUNCT_RE = re.compile(r"[^\w\s]")
+_SPACE_RE = re.compile(r"\s+")
+
+
+# 임베딩 전에 질문 정규화 (대소문자, 문장부호, 공백 차이 제거)
+def normalize_question(question: str) -> str:
+    text = _PUNCT_RE.sub(" ", question.strip().lower())
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+class AnswerCache:
+    """질문 임베딩 유사도로 최종 답변을 재사용하는 클래스"""
+
+    def __init__(self, embed_query, path: str = DEFAULT_CACHE_PATH,
+                 threshold: float = ANSWER_CACHE_THRESHOLD, ttl: int = ANSWER_CACHE_TTL,
+                 max_entries: int = ANSWER_CACHE_MAX_ENTRIES,
+                 no_entity_threshold: float = ANSWER_CACHE_NO_ENTITY_THRESHOLD):
+        self.embed_query = embed_query
+        self.path = path
+        self.threshold = threshold
+        self.no_entity_threshold = no_entity_threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # 키 구성이 다른 예전 저장소(회사명/주제 컬럼)는 재사용할 수 없으므로 새로 만듦
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(answers)")}
+        if columns and ("task_type" not in columns or "company" in columns):
+            self._conn.execute("DROP TABLE answers")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS answers ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " level INTEGER NOT NULL,"
+            " task_type TEXT NOT NULL,"
+            " corp_code TEXT NOT NULL,"
+            " years TEXT NOT NULL,"
+            " question TEXT NOT NULL,"
+            " embedding BLOB NOT NULL,"
+            " answer TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_used_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS answers_key ON answers (level, task_type, corp_code, years)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS answers_corp ON answers (corp_code)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(level: int, task_type: str, corp_code: str | None, years: list[str] | None) -> tuple:
+        return int(level), task_type, (corp_code or "").strip(), ",".join(sorted(set(years or [])))
+
+    # 회사/연도가 모두 없으면 더 엄격한 임계값 사용
+    def _threshold_for(self, key: tuple) -> float:
+        return self.threshold if key[2] or key[3] else self.no_entity_threshold
+
+    def _embed(self, question: str) -> np.ndarray:
+        vector = np.asarray(self.embed_query(normalize_question(question)), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    # 가장 비슷한 질문의 답변 (임계값 미만이거나 만료되었으면 None)
+    def lookup(self, level: int, question: str, task_type: str, corp_code: str | None = None,
+               years: list[str] | None = None) -> str | None:
+        key = self.make_key(level, task_type, corp_code, years)
+        threshold = self._threshold_for(key)
+        if threshold >= 1:
+            self.misses += 1
+            return None
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, embedding, answer FROM answers"
+                " WHERE level = ? AND task_type = ? AND corp_code = ? AND years = ? AND created_at >= ?",
+                (*key, time.time() - self.ttl)
+            ).fetchall()
+        if not rows:
+            self.misses += 1
+            return None
+
+        query = self._embed(question)
+        matrix = np.stack([np.frombuffer(blob, dtype=np.float32) for _, blob, _ in rows])
+        scores = matrix @ query
+        best = int(scores.argmax())
+        if scores[best] < threshold:
+            self.misses += 1
+            return None
+
+        entry_id, _, answer = rows[best]
+        with self._lock:
+            self._conn.execute("UPDATE answers SET last_used_at = ? WHERE id = ?", (time.time(), entry_id))
+            self._conn.commit()
+        self.hits += 1
+        print(f"💾 답변 캐시 적중 (유사도 {scores[best]:.3f})")
+        return answer
+
+    def store(self, level: int, question: str, answer: str, task_type: str, corp_code: str | None = None,
+              years: list[str] | None = None) -> None:
+        key = self.make_key(level, task_type, corp_code, years)
+        if self._threshold_for(key) >= 1:
+            return
+        embedding = self._embed(question).astype(np.float32).tobytes()
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO answers (level, task_type, corp_code, years, question, embedding, answer, created_at, last_used_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (*key, question, embedding, answer, now, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    # 만료 항목 삭제 후 최대 개수를 넘는 만큼 가장 오래 안 쓴 항목 삭제 (lock 안에서 호출)
+    def _evict(self) -> None:
+        self._conn.execute("DELETE FROM answers WHERE created_at < ?", (time.time() - self.ttl,))
+        self._conn.execute(
+            "DELETE FROM answers WHERE id IN ("
+            " SELECT id FROM answers ORDER BY last_used_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+
+    # 기업코드 단위 또는 전체 삭제 (DART 데이터/인덱스 변경 시)
+    def invalidate(self, corp_code: str | None = None, level: int | None = None) -> None:
+        query, params = "DELETE FROM answers WHERE 1 = 1", []
+        if corp_code:
+            query += " AND corp_code = ?"
+            params.append(corp_code)
+        if level is not None:
+            query += " AND level = ?"
+            params.append(int(level))
+        with self._lock:
+            self._conn.execute(query, params)
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0}
+
+
+# 임베딩 모델 없이 저장소만 열어서 전체 삭제 (인덱스 재생성 스크립트에서 사용)
+def clear_answer_cache(path: str = DEFAULT_CACHE_PATH) -> None:
+    if not os.path.exists(path):
+        return
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("DELETE FROM answers")
+        conn.commit()
+    except sqlite3.OperationalError:
+        pass
+    finally:
+        conn.close()
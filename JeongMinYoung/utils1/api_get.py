@@ -1,17 +1,41 @@
-import requests
 import os
 
-# 제무재표 api로 받아오는 함수
-def get_financial_state(
+from .dart_cache import statement_cache
+from .dart_transport import get_json, aget_json
+
+
+# DART 단일회사 전체 재무제표 API 호출 (원본 응답 반환)
+def fetch_financial_statement(
     corp_code: str,
     bsns_year: str,
     reprt_code: str,
     fs_div: str
-) -> list[str]:
+) -> dict:
+
+    DART_API_KEY = os.getenv("DART_API_KEY")
+
+    params = {
+        "crtfc_key": DART_API_KEY,
+        "corp_code": corp_code,
+        "bsns_year": bsns_year,
+        "reprt_code": reprt_code,
+        "fs_div": fs_div,
+    }
+
+    # 연결 재사용, 재시도, 요청 한도는 공용 전송 계층(dart_transport)에서 처리
+    return get_json("fnlttSinglAcntAll.json", params)
+
+
+# fetch_financial_statement 의 async 버전 (이벤트 루프를 막지 않고 여러 연도/회사를 동시에 조회)
+async def afetch_financial_statement(
+    corp_code: str,
+    bsns_year: str,
+    reprt_code: str,
+    fs_div: str
+) -> dict:
 
     DART_API_KEY = os.getenv("DART_API_KEY")
 
-    url = "https://opendart.fss.or.kr/api/fnlttSinglAcntAll.json"
     params = {
         "crtfc_key": DART_API_KEY,
         "corp_code": corp_code,
@@ -20,10 +44,50 @@ def get_financial_state(
         "fs_div": fs_div,
     }
 
+    return await aget_json("fnlttSinglAcntAll.json", params)
+
 
-    response = requests.get(url, params=params)
-    data = response.json()
+# 재무제표 원본 응답 (로컬 저장소에 있으면 API 호출 없이 재사용)
+def get_financial_statement(
+    corp_code: str,
+    bsns_year: str,
+    reprt_code: str,
+    fs_div: str
+) -> dict:
+
+    def fetch():
+        return fetch_financial_statement(corp_code, bsns_year, reprt_code, fs_div)
+
+    if statement_cache is not None:
+        return statement_cache.get_or_fetch(corp_code, bsns_year, reprt_code, fs_div, fetch)
+    return fetch()
+
+
+# get_financial_statement 의 async 버전
+async def aget_financial_statement(
+    corp_code: str,
+    bsns_year: str,
+    reprt_code: str,
+    fs_div: str
+) -> dict:
+
+    async def afetch():
+        return await afetch_financial_statement(corp_code, bsns_year, reprt_code, fs_div)
+
+    if statement_cache is not None:
+        return await statement_cache.aget_or_fetch(corp_code, bsns_year, reprt_code, fs_div, afetch)
+    return await afetch()
+
+
+# 제무재표 api로 받아오는 함수 (계정별 한 줄 문자열 목록)
+def get_financial_state(
+    corp_code: str,
+    bsns_year: str,
+    reprt_code: str,
+    fs_div: str
+) -> list[str]:
 
+    data = get_financial_statement(corp_code, bsns_year, reprt_code, fs_div)
     data_list = []
 
     if data["status"] == "000":
@@ -35,4 +99,4 @@ def get_financial_state(
             data_list.append(f"{name} : {curr} (당기), {prev} (전기), 통화: {currency}")
         return data_list
     else:
-        return [f"[API 오류] {data.get('message', '정의되지 않은 오류')}"]
\ No newline at end of file
+        return [f"[API 오류] {data.get('message', '정의되지 않은 오류')}"]
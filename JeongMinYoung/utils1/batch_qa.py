@@ -0,0 +1,184 @@
+import argparse
+import asyncio
+import csv
+import hashlib
+import json
+import os
+import time
+
+from langchain_community.callbacks import get_openai_callback
+
+from . import main as rag_main
+from .registry import warm_up
+
+
+# 준비된 질문 목록(JSONL/CSV)을 한 번에 답변하는 일괄 처리 도구 (주간 리포트, 회귀 테스트 세트 등)
+# 실행: python -m utils1.batch_qa questions.jsonl -o answers.jsonl --concurrency 8
+# - 입력 한 줄(행): question (필수), level (1~3, 없으면 --level), id, session_id (선택)
+# - 결과 한 줄: id, question, level, type, answer, sources, 단계별 시간(timings), 토큰 수(tokens), error
+# - 결과는 끝난 순서대로 바로 기록하고, 다시 실행하면 이미 기록된 id 는 건너뜀 (중단 후 이어서 실행)
+# - 실행이 끝나면 결과 파일을 id 당 한 줄로 정리 (오류로 다시 실행한 항목은 마지막 결과만 남김)
+# - DART/LLM/답변 캐시는 서버, Streamlit 과 같은 저장소를 사용
+
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+
+
+# id 가 없으면 (질문, 레벨) 해시를 id 로 사용 (같은 입력 파일로 다시 실행해도 같은 id)
+def question_id(question: str, level: int) -> str:
+    return hashlib.sha1(f"{level}\x00{question}".encode("utf-8")).hexdigest()[:16]
+
+
+def load_questions(path: str, default_level: int = 1) -> list[dict]:
+    if path.lower().endswith(".csv"):
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            rows = list(csv.DictReader(f))
+    else:
+        with open(path, encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+
+    items = []
+    for row in rows:
+        question = (row.get("question") or "").strip()
+        if not question:
+            continue
+        raw_level = row.get("level") or default_level
+        # level 이 잘못된 행은 전체 실행을 멈추지 않고 그 행만 오류로 기록
+        try:
+            level = int(raw_level)
+            error = None if level in (1, 2, 3) else f"level 은 1~3 이어야 합니다: {raw_level!r}"
+        except (TypeError, ValueError):
+            level, error = None, f"잘못된 level: {raw_level!r}"
+        items.append({
+            "id": str(row.get("id") or question_id(question, level if level is not None else raw_level)),
+            "question": question,
+            "level": level,
+            "session_id": row.get("session_id") or None,
+            "error": error,
+        })
+    return items
+
+
+# 결과 파일을 id 당 한 줄(마지막 기록)로 정리 (오류 후 다시 실행한 항목의 이전 기록 제거)
+def compact_output(path: str) -> None:
+    if not os.path.exists(path):
+        return
+    records = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            records.pop(record["id"], None)
+            records[record["id"]] = record
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for record in records.values():
+            f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+    os.replace(tmp_path, path)
+
+
+# 이미 답변이 기록된 id (오류로 끝난 항목은 다시 실행)
+def completed_ids(path: str) -> set[str]:
+    if not os.path.exists(path):
+        return set()
+    done = set()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # 중단되면서 잘린 마지막 줄
+            if not record.get("error"):
+                done.add(record["id"])
+    return done
+
+
+async def answer_one(item: dict) -> dict:
+    trace = {}
+    started = time.perf_counter()
+    record = {"id": item["id"], "question": item["question"], "level": item["level"]}
+    if item.get("error"):
+        record.update(answer=None, error=item["error"], type=None, sources=[], cache_hit=False,
+                      evidence_reused=False, timings={"total": 0.0},
+                      tokens={"prompt": 0, "completion": 0, "total": 0, "cost_usd": 0.0})
+        return record
+    # 콜백은 태스크별 context 에 걸리므로 동시에 실행되는 다른 질문의 토큰과 섞이지 않음
+    with get_openai_callback() as cb:
+        try:
+            record["answer"] = await rag_main.arun_flexible_rag(item["question"], item["level"],
+                                                                item["session_id"], trace)
+            record["error"] = None
+        except Exception as e:
+            record["answer"] = None
+            record["error"] = f"{type(e).__name__}: {e}"
+
+    record["type"] = trace.get("type")
+    record["sources"] = trace.get("sources", [])
+    record["cache_hit"] = trace.get("cache_hit", False)
+    record["evidence_reused"] = trace.get("evidence_reused", False)
+    record["timings"] = {
+        "route": trace.get("route_time"),
+        "evidence": trace.get("evidence_time"),
+        "generate": trace.get("generate_time"),
+        "total": time.perf_counter() - started,
+    }
+    record["tokens"] = {
+        "prompt": cb.prompt_tokens,
+        "completion": cb.completion_tokens,
+        "total": cb.total_tokens,
+        "cost_usd": cb.total_cost,
+    }
+    return record
+
+
+async def run_batch(items: list[dict], output_path: str, concurrency: int = BATCH_CONCURRENCY) -> dict:
+    # 동시 처리 수는 이 이벤트 루프에만 지정 (서버 등 다른 루프/모듈 설정에는 영향 없음)
+    rag_main.set_concurrency_limit(concurrency)
+    started = time.perf_counter()
+    summary = {"total": len(items), "ok": 0, "failed": 0, "tokens": 0}
+
+    with open(output_path, "a", encoding="utf-8") as out:
+        tasks = [asyncio.create_task(answer_one(item)) for item in items]
+        for finished in asyncio.as_completed(tasks):
+            record = await finished
+            out.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+            out.flush()
+
+            summary["failed" if record["error"] else "ok"] += 1
+            summary["tokens"] += record["tokens"]["total"]
+            done = summary["ok"] + summary["failed"]
+            status = "❌" if record["error"] else "✅"
+            print(f"{status} [{done}/{len(items)}] {record['id']} ({record['timings']['total']:.1f}초)")
+
+    compact_output(output_path)
+    summary["elapsed"] = time.perf_counter() - started
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="질문 목록(JSONL/CSV)을 일괄 답변해서 JSONL 로 저장")
+    parser.add_argument("input", help="질문 파일 (.jsonl 또는 .csv)")
+    parser.add_argument("-o", "--output", default="batch_answers.jsonl", help="결과 JSONL 파일 (이어서 기록)")
+    parser.add_argument("-c", "--concurrency", type=int, default=BATCH_CONCURRENCY, help="동시에 처리할 질문 수")
+    parser.add_argument("-l", "--level", type=int, default=1, choices=(1, 2, 3), help="level 이 없는 행의 기본 레벨")
+    parser.add_argument("--restart", action="store_true", help="기존 결과를 무시하고 처음부터 실행")
+    args = parser.parse_args(argv)
+
+    items = load_questions(args.input, args.level)
+    if args.restart and os.path.exists(args.output):
+        os.remove(args.output)
+    done = completed_ids(args.output)
+    pending = [item for item in items if item["id"] not in done]
+    print(f"📋 질문 {len(items)}개 중 {len(items) - len(pending)}개 완료됨, {len(pending)}개 처리 시작 (동시 {args.concurrency}개)")
+    if not pending:
+        return
+
+    warm_up(background=False)
+    summary = asyncio.run(run_batch(pending, args.output, args.concurrency))
+    print(f"🏁 완료 {summary['ok']}개, 실패 {summary['failed']}개, "
+          f"토큰 {summary['tokens']:,}개, {summary['elapsed']:.1f}초")
+
+
+if __name__ == "__main__":
+    main()
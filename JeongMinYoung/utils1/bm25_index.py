@@ -0,0 +1,138 @@
+import math
+import os
+import pickle
+import string
+from collections import Counter, defaultdict
+from functools import lru_cache
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from pydantic import ConfigDict
+
+
+# 미리 만들어 두는 BM25 역색인 (오프라인 빌드 -> 디스크 저장 -> 서버에서는 로딩만)
+# 빌드: python -m utils1.bm25_index
+
+TOKENIZER_NAME = "kykim/bert-kor-base"
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# FAISS 인덱스 폴더 -> BM25 인덱스 파일
+BM25_SOURCES = {
+    "faiss_index3": "bm25_accounting.pkl",
+    "faiss_index_bge_m3": "bm25_business.pkl",
+}
+
+_PUNCTUATION = set(string.punctuation) | {"·", "※", "○", "•", "「", "」", "『", "』"}
+
+
+# 토크나이저는 프로세스당 한 번만 로딩 (Rust 기반 fast tokenizer)
+@lru_cache(maxsize=1)
+def get_tokenizer():
+    from transformers import BertTokenizerFast
+    return BertTokenizerFast.from_pretrained(TOKENIZER_NAME)
+
+
+# BM25 용 토큰화 (구두점 토큰 제거)
+def tokenize(text: str) -> list[str]:
+    tokens = get_tokenizer().tokenize(text.lower())
+    return [t for t in tokens if t not in _PUNCTUATION]
+
+
+class BM25Index:
+    """토큰 -> (문서 번호, 빈도) postings 로 구성된 BM25 역색인"""
+
+    def __init__(self, postings: dict, doc_lengths: list[int], documents: list[Document],
+                 k1: float = BM25_K1, b: float = BM25_B):
+        self.postings = postings
+        self.doc_lengths = doc_lengths
+        self.documents = documents
+        self.k1 = k1
+        self.b = b
+        self.avg_doc_length = sum(doc_lengths) / len(doc_lengths) if doc_lengths else 0.0
+        n_docs = len(doc_lengths)
+        self.idf = {
+            token: math.log((n_docs - len(posting) + 0.5) / (len(posting) + 0.5) + 1)
+            for token, posting in postings.items()
+        }
+
+    @classmethod
+    def build(cls, documents: list[Document], k1: float = BM25_K1, b: float = BM25_B) -> "BM25Index":
+        postings = defaultdict(list)
+        doc_lengths = []
+        for doc_id, doc in enumerate(documents):
+            tokens = tokenize(doc.page_content)
+            doc_lengths.append(len(tokens))
+            for token, tf in Counter(tokens).items():
+                postings[token].append((doc_id, tf))
+        return cls(dict(postings), doc_lengths, documents, k1, b)
+
+    # 질의 토큰이 등장하는 문서만 점수 계산 (전체 문서를 훑지 않음)
+    def search(self, query: str, k: int = 6) -> list[tuple[Document, float]]:
+        scores = defaultdict(float)
+        for token in set(tokenize(query)):
+            posting = self.postings.get(token)
+            if not posting:
+                continue
+            idf = self.idf[token]
+            for doc_id, tf in posting:
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / self.avg_doc_length)
+                scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+        top = sorted(scores.items(), key=lambda x: x[1], reverse=True)[:k]
+        return [(self.documents[doc_id], score) for doc_id, score in top]
+
+    def save(self, path: str) -> None:
+        with open(path, "wb") as f:
+            pickle.dump({
+                "postings": self.postings,
+                "doc_lengths": self.doc_lengths,
+                "documents": self.documents,
+                "k1": self.k1,
+                "b": self.b,
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path: str) -> "BM25Index":
+        with open(path, "rb") as f:
+            data = pickle.load(f)
+        return cls(data["postings"], data["doc_lengths"], data["documents"], data["k1"], data["b"])
+
+
+class BM25IndexRetriever(BaseRetriever):
+    """BM25Index 를 LangChain retriever 로 감싼 클래스 (EnsembleRetriever 로 FAISS 와 결합 가능)"""
+
+    index: BM25Index
+    k: int = 6
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> list[Document]:
+        return [doc for doc, _ in self.index.search(query, self.k)]
+
+
+def bm25_index_path(filename: str) -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), filename)
+
+
+# FAISS 인덱스 폴더의 index.pkl 에서 문서만 읽어옴 (임베딩 모델 로딩 불필요)
+def load_faiss_documents(index_dir: str) -> list[Document]:
+    with open(os.path.join(bm25_index_path(index_dir), "index.pkl"), "rb") as f:
+        docstore, index_to_docstore_id = pickle.load(f)
+    return [docstore.search(index_to_docstore_id[i]) for i in sorted(index_to_docstore_id)]
+
+
+def build_all_bm25_indexes() -> None:
+    for index_dir, filename in BM25_SOURCES.items():
+        documents = load_faiss_documents(index_dir)
+        index = BM25Index.build(documents)
+        index.save(bm25_index_path(filename))
+        print(f"✅ {index_dir} -> {filename}: 문서 {len(documents)}개, 토큰 {len(index.postings)}종")
+
+
+if __name__ == "__main__":
+    from .answer_cache import clear_answer_cache
+
+    build_all_bm25_indexes()
+    clear_answer_cache()  # 검색 결과가 바뀌므로 이전 답변은 재사용하지 않음
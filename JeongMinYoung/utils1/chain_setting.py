@@ -16,6 +16,9 @@ from langchain_openai import ChatOpenAI
 
 # LangChain chains
 
+# LLM 응답 캐시
+from .llm_cache import with_llm_cache
+
 # Load environment variables
 load_dotenv()
 
@@ -707,33 +710,43 @@ financial_prompt3= PromptTemplate.from_template("""
 
 
 
-def create_chain():
-    simple_llm = ChatOpenAI(
-        model='gpt-4o',
-        temperature=0)
-    classification_chain = classification_prompt | simple_llm | StrOutputParser()
-    account_chain1 = accounting_prompt1 | simple_llm | StrOutputParser()
-    account_chain2 = accounting_prompt2 | simple_llm | StrOutputParser()
-    account_chain3 = accounting_prompt3 | simple_llm | StrOutputParser()
-    simple_chain = simple_prompt | simple_llm | StrOutputParser()
-    extract_chain = extract_prompt | simple_llm | StrOutputParser()
-    business_chain1 = business_prompt1 | simple_llm | StrOutputParser()
-    business_chain2 = business_prompt2 | simple_llm | StrOutputParser()
-    business_chain3 = business_prompt3 | simple_llm | StrOutputParser()
-    hybrid_chain1 = hybrid_prompt1 | simple_llm | StrOutputParser()
-    hybrid_chain2 = hybrid_prompt2 | simple_llm | StrOutputParser()
-    hybrid_chain3 = hybrid_prompt3 | simple_llm | StrOutputParser()
-    financial_chain1 = financial_prompt1 | simple_llm | StrOutputParser()
-    financial_chain2 = financial_prompt2 | simple_llm | StrOutputParser()
-    financial_chain3 = financial_prompt3 | simple_llm | StrOutputParser()
+# 체인 이름 -> 프롬프트 매핑 (registry 에서 체인을 하나씩 지연 생성할 때 사용)
+CHAIN_PROMPTS = {
+    "simple_chain": simple_prompt,
+    "classification_chain": classification_prompt,
+    "extract_chain": extract_prompt,
+    "hybrid_chain1": hybrid_prompt1,
+    "hybrid_chain2": hybrid_prompt2,
+    "hybrid_chain3": hybrid_prompt3,
+    "account_chain1": accounting_prompt1,
+    "account_chain2": accounting_prompt2,
+    "account_chain3": accounting_prompt3,
+    "business_chain1": business_prompt1,
+    "business_chain2": business_prompt2,
+    "business_chain3": business_prompt3,
+    "financial_chain1": financial_prompt1,
+    "financial_chain2": financial_prompt2,
+    "financial_chain3": financial_prompt3,
+}
 
-    return (simple_chain, classification_chain, extract_chain,
-            hybrid_chain1, hybrid_chain2, hybrid_chain3,
-            account_chain1, account_chain2, account_chain3,
-            business_chain1, business_chain2, business_chain3,
-            financial_chain1, financial_chain2, financial_chain3)
 
+def create_llm():
+    return ChatOpenAI(
+        model='gpt-4o',
+        temperature=0)
 
 
+# 체인마다 응답 캐시(llm_cache)를 붙인 LLM 사용 (LLM_CACHE_<체인 이름>=0 이면 해당 체인은 캐시 없이 호출)
+def build_chain(name: str, llm=None):
+    return CHAIN_PROMPTS[name] | with_llm_cache(llm or create_llm(), name) | StrOutputParser()
 
 
+def create_chain():
+    simple_llm = create_llm()
+    chains = {name: build_chain(name, simple_llm) for name in CHAIN_PROMPTS}
+
+    return (chains["simple_chain"], chains["classification_chain"], chains["extract_chain"],
+            chains["hybrid_chain1"], chains["hybrid_chain2"], chains["hybrid_chain3"],
+            chains["account_chain1"], chains["account_chain2"], chains["account_chain3"],
+            chains["business_chain1"], chains["business_chain2"], chains["business_chain3"],
+            chains["financial_chain1"], chains["financial_chain2"], chains["financial_chain3"])
@@ -0,0 +1,123 @@
+import os
+import re
+from functools import lru_cache
+
+import tiktoken
+
+
+# 프롬프트에 넣을 근거 문서를 토큰 예산에 맞춰 정리하는 모듈
+# 1) 거의 같은 청크 제거  2) MMR 로 관련성과 다양성을 함께 고려해 순서 결정
+# 3) 출처별 토큰 예산까지만 채우고 나머지는 잘라냄  4) 줄인 토큰 수 로그 출력
+
+# 출처별 토큰 예산 (환경변수로 조정 가능)
+CONTEXT_BUDGETS = {
+    "accounting": int(os.getenv("CONTEXT_BUDGET_ACCOUNTING", "2500")),
+    "business": int(os.getenv("CONTEXT_BUDGET_BUSINESS", "3000")),
+    "financial": int(os.getenv("CONTEXT_BUDGET_FINANCIAL", "4000")),
+    "hybrid_acct": int(os.getenv("CONTEXT_BUDGET_HYBRID_ACCT", "1500")),
+    "hybrid_biz": int(os.getenv("CONTEXT_BUDGET_HYBRID_BIZ", "1500")),
+    "hybrid_fin": int(os.getenv("CONTEXT_BUDGET_HYBRID_FIN", "3000")),
+}
+DEDUP_THRESHOLD = 0.85
+MMR_LAMBDA = 0.7
+
+_WORD_RE = re.compile(r"\w+")
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    try:
+        return tiktoken.encoding_for_model("gpt-4o")
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+def count_tokens(text: str) -> int:
+    return len(_encoding().encode(text))
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    tokens = _encoding().encode(text)
+    if len(tokens) <= max_tokens:
+        return text
+    return _encoding().decode(tokens[:max_tokens])
+
+
+def _shingles(text: str, n: int = 3) -> set:
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < n:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + n]) for i in range(len(words) - n + 1)}
+
+
+def _jaccard(a: set, b: set) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+# 텍스트 목록을 정리해서 하나의 문자열로 합침 (texts 는 검색 순위순)
+def pack_texts(texts: list[str], budget: int, label: str = "context", separator: str = "\n\n") -> str:
+    texts = [t for t in texts if t and t.strip()]
+    if not texts:
+        return ""
+
+    shingles = [_shingles(t) for t in texts]
+    original_tokens = sum(count_tokens(t) for t in texts)
+
+    # 1) 앞 순위 청크와 거의 같은 청크 제거
+    kept = []
+    for i in range(len(texts)):
+        if all(_jaccard(shingles[i], shingles[j]) < DEDUP_THRESHOLD for j in kept):
+            kept.append(i)
+
+    # 2) MMR: 관련성(검색 순위) - 이미 고른 청크와의 유사도
+    selected = []
+    remaining = list(kept)
+    while remaining:
+        def mmr_score(i):
+            relevance = 1.0 / (1 + kept.index(i))
+            redundancy = max((_jaccard(shingles[i], shingles[j]) for j in selected), default=0.0)
+            return MMR_LAMBDA * relevance - (1 - MMR_LAMBDA) * redundancy
+        best = max(remaining, key=mmr_score)
+        selected.append(best)
+        remaining.remove(best)
+
+    # 3) 토큰 예산까지 채우기 (마지막 청크는 남은 예산만큼 자름)
+    parts, used = [], 0
+    sep_tokens = count_tokens(separator)
+    for i in selected:
+        remaining_budget = budget - used - (sep_tokens if parts else 0)
+        if remaining_budget <= 0:
+            break
+        n_tokens = count_tokens(texts[i])
+        if n_tokens > remaining_budget:
+            parts.append(truncate_tokens(texts[i], remaining_budget))
+            used = budget
+            break
+        parts.append(texts[i])
+        used += n_tokens + (sep_tokens if len(parts) > 1 else 0)
+
+    packed = separator.join(parts)
+    saved = original_tokens - count_tokens(packed)
+    if saved > 0:
+        print(f"✂️ {label}: {original_tokens} -> {original_tokens - saved} 토큰 ({saved} 토큰 절약, 청크 {len(texts)} -> {len(parts)})")
+    return packed
+
+
+# LangChain Document 목록 정리
+def pack_documents(docs, budget: int, label: str = "context") -> str:
+    return pack_texts([doc.page_content for doc in docs], budget, label)
+
+
+# 재무제표처럼 줄 단위 데이터는 순서를 유지한 채 예산까지만 남김
+def pack_lines(lines: list[str], budget: int, label: str = "rows") -> str:
+    parts, used = [], 0
+    for line in lines:
+        n_tokens = count_tokens(line) + 1
+        if used + n_tokens > budget:
+            print(f"✂️ {label}: 예산 {budget} 토큰 초과로 {len(lines) - len(parts)}줄 생략")
+            break
+        parts.append(line)
+        used += n_tokens
+    return "\n".join(parts)
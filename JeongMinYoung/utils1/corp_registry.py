@@ -0,0 +1,179 @@
+import io
+import os
+import sqlite3
+import threading
+import time
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import Iterator, NamedTuple
+
+from .dart_transport import get_bytes
+
+
+# DART 기업코드 레지스트리 (corpCode.xml 을 한 번 받아서 SQLite 에 저장)
+# - corpCode.xml 은 iterparse 로 한 항목씩 읽어서 전체 트리를 메모리에 올리지 않음
+# - 저장한 지 CORP_REGISTRY_MAX_AGE 초가 지나면 저장된 목록을 쓰면서 백그라운드에서 다시 받음 (실패하면 기존 데이터 유지)
+# - 프로세스 안에서는 처음 한 번만 SQLite 에서 읽어 해시맵을 만들고 이후 조회는 O(1)
+
+CORP_REGISTRY_MAX_AGE = int(os.getenv("CORP_REGISTRY_MAX_AGE", str(7 * 24 * 3600)))
+DEFAULT_REGISTRY_PATH = os.getenv(
+    "CORP_REGISTRY_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "corp_registry.sqlite3")
+)
+
+
+class CorpRecord(NamedTuple):
+    corp_code: str
+    corp_name: str
+    corp_eng_name: str
+    stock_code: str
+
+
+# corpCode.xml 을 <list> 단위로 읽으면서 항목을 하나씩 반환
+def iter_corp_records(xml_file) -> Iterator[CorpRecord]:
+    for _, elem in ET.iterparse(xml_file, events=("end",)):
+        if elem.tag != "list":
+            continue
+        yield CorpRecord(
+            corp_code=(elem.findtext("corp_code") or "").strip(),
+            corp_name=(elem.findtext("corp_name") or "").strip(),
+            corp_eng_name=(elem.findtext("corp_eng_name") or "").strip(),
+            stock_code=(elem.findtext("stock_code") or "").strip(),
+        )
+        elem.clear()
+
+
+class CorpRegistry:
+    """SQLite 에 저장된 기업코드 목록 + 메모리 인덱스"""
+
+    def __init__(self, path: str = DEFAULT_REGISTRY_PATH, max_age: int = CORP_REGISTRY_MAX_AGE):
+        self.path = path
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._records: list[CorpRecord] | None = None
+        self._by_code: dict[str, CorpRecord] = {}
+        self._by_name: dict[str, CorpRecord] = {}
+        self._by_stock: dict[str, CorpRecord] = {}
+        self._refresh_thread: threading.Thread | None = None
+        self.version = 0  # 목록이 다시 로딩될 때마다 증가 (이 목록으로 만든 인덱스의 갱신 판단용)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS corps ("
+            " corp_code TEXT PRIMARY KEY,"
+            " corp_name TEXT NOT NULL,"
+            " corp_eng_name TEXT NOT NULL,"
+            " stock_code TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS corps_name ON corps (corp_name)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS corps_stock ON corps (stock_code)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._conn.commit()
+
+    def refreshed_at(self) -> float:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'refreshed_at'").fetchone()
+        return float(row[0]) if row else 0.0
+
+    def is_stale(self) -> bool:
+        return time.time() - self.refreshed_at() > self.max_age
+
+    # corpCode.xml 을 다시 받아서 저장소를 교체 (저장한 항목 수 반환)
+    def refresh(self, zip_bytes: bytes | None = None) -> int:
+        if zip_bytes is None:
+            print("📥 corpCode.xml 다운로드 중...")
+            zip_bytes = get_bytes("corpCode.xml", {"crtfc_key": os.getenv("DART_API_KEY", "")})
+        with zipfile.ZipFile(io.BytesIO(zip_bytes)) as zf:
+            with zf.open(zf.namelist()[0]) as xml_file:
+                records = [r for r in iter_corp_records(xml_file) if r.corp_code]
+
+        with self._lock:
+            self._conn.execute("DELETE FROM corps")
+            self._conn.executemany("INSERT OR REPLACE INTO corps VALUES (?, ?, ?, ?)", records)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('refreshed_at', ?)", (str(time.time()),)
+            )
+            self._conn.commit()
+        self._load()
+        print(f"✅ 기업코드 {len(records)}개 저장 완료")
+        return len(records)
+
+    # 저장된 목록은 그대로 쓰면서 데몬 스레드에서 갱신 (질문 처리 경로에서 다운로드를 기다리지 않도록)
+    def refresh_in_background(self) -> threading.Thread:
+        def _run():
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"⚠️ 기업코드 갱신 실패, 저장된 목록 사용: {e}")
+
+        with self._lock:
+            if self._refresh_thread is None or not self._refresh_thread.is_alive():
+                self._refresh_thread = threading.Thread(target=_run, name="corp-registry-refresh", daemon=True)
+                self._refresh_thread.start()
+            return self._refresh_thread
+
+    # 저장된 목록을 만료 처리 (다음 조회 때 다시 다운로드)
+    def invalidate(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM meta WHERE key = 'refreshed_at'")
+            self._conn.commit()
+            self._records = None
+
+    def _load(self) -> None:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT corp_code, corp_name, corp_eng_name, stock_code FROM corps ORDER BY rowid"
+            ).fetchall()
+            records = [CorpRecord(*row) for row in rows]
+            self._by_code = {r.corp_code: r for r in records}
+            # 같은 이름이 여러 개면 상장사(종목코드 있는 회사)를 우선
+            self._by_name = {}
+            for r in records:
+                current = self._by_name.get(r.corp_name)
+                if current is None or (not current.stock_code and r.stock_code):
+                    self._by_name[r.corp_name] = r
+            self._by_stock = {r.stock_code: r for r in records if r.stock_code}
+            self._records = records
+            self.version += 1
+
+    def _ensure_loaded(self) -> None:
+        if self._records is not None:
+            return
+        if self.refreshed_at() == 0.0:
+            # 저장된 목록이 없으면(처음 실행하는 환경) 받을 때까지 기다림
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"⚠️ 기업코드 다운로드 실패: {e}")
+        elif self.is_stale():
+            self.refresh_in_background()
+        if self._records is None:
+            self._load()
+
+    def all(self) -> list[CorpRecord]:
+        self._ensure_loaded()
+        return self._records
+
+    def by_name(self, corp_name: str) -> CorpRecord | None:
+        self._ensure_loaded()
+        return self._by_name.get(corp_name.strip())
+
+    def by_corp_code(self, corp_code: str) -> CorpRecord | None:
+        self._ensure_loaded()
+        return self._by_code.get(corp_code.strip())
+
+    def by_stock_code(self, stock_code: str) -> CorpRecord | None:
+        self._ensure_loaded()
+        return self._by_stock.get(stock_code.strip())
+
+
+_registry: CorpRegistry | None = None
+_registry_lock = threading.Lock()
+
+
+# 프로세스 전체에서 공유하는 기업코드 레지스트리
+def get_corp_registry() -> CorpRegistry:
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = CorpRegistry()
+        return _registry
@@ -0,0 +1,136 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+
+# DART 재무제표 응답 로컬 저장소 (SQLite)
+# 키: (corp_code, bsns_year, reprt_code, fs_div)
+# - 마감된 연도(올해-2 이전)의 정상 응답은 변하지 않으므로 만료 없이 재사용
+# - 직전 연도/올해(공시 시즌)는 DART_CACHE_TTL 초 동안만 재사용
+# - status 013(조회된 데이터 없음)은 DART_CACHE_NEGATIVE_TTL 초 동안 재사용 (negative caching)
+# - 그 외 오류 응답은 저장하지 않음
+
+DEFAULT_CACHE_PATH = os.getenv(
+    "DART_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "dart_cache.sqlite3")
+)
+DART_CACHE_TTL = int(os.getenv("DART_CACHE_TTL", str(6 * 3600)))
+DART_CACHE_NEGATIVE_TTL = int(os.getenv("DART_CACHE_NEGATIVE_TTL", str(24 * 3600)))
+
+STATUS_OK = "000"
+STATUS_NO_DATA = "013"
+
+
+class DartStatementCache:
+    """DART 재무제표 API 응답을 키 단위로 저장/재사용하는 클래스"""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._listeners = []
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS statements ("
+            " corp_code TEXT NOT NULL,"
+            " bsns_year TEXT NOT NULL,"
+            " reprt_code TEXT NOT NULL,"
+            " fs_div TEXT NOT NULL,"
+            " status TEXT NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " fetched_at REAL NOT NULL,"
+            " PRIMARY KEY (corp_code, bsns_year, reprt_code, fs_div))"
+        )
+        self._conn.commit()
+
+    # 해당 응답을 아직 재사용해도 되는지 판단
+    @staticmethod
+    def is_fresh(bsns_year: str, status: str, fetched_at: float, now: float | None = None) -> bool:
+        now = now or time.time()
+        age = now - fetched_at
+        if status == STATUS_NO_DATA:
+            return age < DART_CACHE_NEGATIVE_TTL
+        try:
+            closed = int(bsns_year) <= datetime.now().year - 2
+        except ValueError:
+            closed = False
+        return closed or age < DART_CACHE_TTL
+
+    def get(self, corp_code: str, bsns_year: str, reprt_code: str, fs_div: str) -> dict | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, payload, fetched_at FROM statements"
+                " WHERE corp_code = ? AND bsns_year = ? AND reprt_code = ? AND fs_div = ?",
+                (corp_code, bsns_year, reprt_code, fs_div)
+            ).fetchone()
+        if row is None:
+            return None
+        status, payload, fetched_at = row
+        if not self.is_fresh(bsns_year, status, fetched_at):
+            return None
+        return json.loads(payload)
+
+    def put(self, corp_code: str, bsns_year: str, reprt_code: str, fs_div: str, data: dict) -> None:
+        status = data.get("status")
+        if status not in (STATUS_OK, STATUS_NO_DATA):
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO statements VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (corp_code, bsns_year, reprt_code, fs_div, status,
+                 json.dumps(data, ensure_ascii=False), time.time())
+            )
+            self._conn.commit()
+
+    # 캐시에 있으면 바로 반환, 없으면 fetch() 로 받아와 저장 후 반환
+    def get_or_fetch(self, corp_code: str, bsns_year: str, reprt_code: str, fs_div: str, fetch) -> dict:
+        cached = self.get(corp_code, bsns_year, reprt_code, fs_div)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        self.misses += 1
+        data = fetch()
+        self.put(corp_code, bsns_year, reprt_code, fs_div, data)
+        return data
+
+    # get_or_fetch 의 async 버전 (afetch 는 코루틴 함수, SQLite 조회/저장은 짧아서 그대로 실행)
+    async def aget_or_fetch(self, corp_code: str, bsns_year: str, reprt_code: str, fs_div: str, afetch) -> dict:
+        cached = self.get(corp_code, bsns_year, reprt_code, fs_div)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        self.misses += 1
+        data = await afetch()
+        self.put(corp_code, bsns_year, reprt_code, fs_div, data)
+        return data
+
+    # 특정 회사(또는 전체) 저장 내용 삭제 (정정공시 등으로 데이터가 바뀌었을 때)
+    def invalidate(self, corp_code: str | None = None, bsns_year: str | None = None) -> None:
+        query, params = "DELETE FROM statements WHERE 1 = 1", []
+        if corp_code:
+            query += " AND corp_code = ?"
+            params.append(corp_code)
+        if bsns_year:
+            query += " AND bsns_year = ?"
+            params.append(bsns_year)
+        with self._lock:
+            self._conn.execute(query, params)
+            self._conn.commit()
+        for listener in self._listeners:
+            listener(corp_code, bsns_year)
+
+    # 삭제 시 함께 호출할 함수 등록 (예: 해당 회사 답변 캐시 삭제), listener(corp_code, bsns_year)
+    def add_invalidation_listener(self, listener) -> None:
+        self._listeners.append(listener)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0}
+
+
+statement_cache = DartStatementCache() if os.getenv("DART_CACHE", "1") != "0" else None
@@ -0,0 +1,139 @@
+import asyncio
+import os
+import random
+import threading
+import time
+
+import aiohttp
+
+
+# DART API 공용 전송 모듈 (재무제표 조회 등 모든 DART 호출이 같은 연결 풀/요청 한도를 사용)
+# - 프로세스 안에서 하나의 aiohttp 세션(keep-alive 연결 풀)을 전용 이벤트 루프 스레드에서 공유
+# - 동시 요청 수 제한(DART_MAX_CONCURRENCY) + 초당 요청 수 토큰 버킷(DART_RATE_PER_SEC, DART_BURST)
+# - 5xx, 연결 오류, 시간 초과, DART 요청 제한/일시 오류 상태 코드는 지수 백오프로 재시도
+# - 동기 코드는 get_json/get_bytes, async 코드는 aget_json/aget_bytes 사용
+
+DART_BASE_URL = "https://opendart.fss.or.kr/api"
+DART_TIMEOUT = float(os.getenv("DART_TIMEOUT", "10"))
+DART_MAX_CONCURRENCY = int(os.getenv("DART_MAX_CONCURRENCY", "8"))
+DART_RATE_PER_SEC = float(os.getenv("DART_RATE_PER_SEC", "10"))
+DART_BURST = int(os.getenv("DART_BURST", "10"))
+DART_MAX_RETRIES = int(os.getenv("DART_MAX_RETRIES", "4"))
+DART_BACKOFF_BASE = float(os.getenv("DART_BACKOFF_BASE", "0.5"))
+
+# 020: 요청 제한 초과, 800: 시스템 점검, 900: 정의되지 않은 오류 (잠시 후 다시 요청하면 성공하는 경우가 많음)
+RETRY_STATUS = {"020", "800", "900"}
+
+
+class TokenBucket:
+    """초당 rate 개, 최대 burst 개까지 모아둘 수 있는 요청 허용량 (전송 루프 안에서만 사용)"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            wait = 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+            self._tokens -= 1
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class _RetryableError(Exception):
+    pass
+
+
+class DartTransport:
+    """전용 이벤트 루프 스레드에서 세션/세마포어/토큰 버킷을 소유하는 DART 전송 계층"""
+
+    def __init__(self):
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._lock = threading.Lock()
+        self._session: aiohttp.ClientSession | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self._bucket: TokenBucket | None = None
+        self.requests = 0
+        self.retries = 0
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="dart-transport", daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    # 전송 루프 안에서 처음 요청할 때 세션/제한 객체 생성
+    def _ensure_session(self) -> aiohttp.ClientSession:
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=DART_MAX_CONCURRENCY, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(
+                connector=connector, timeout=aiohttp.ClientTimeout(total=DART_TIMEOUT)
+            )
+            self._semaphore = asyncio.Semaphore(DART_MAX_CONCURRENCY)
+            self._bucket = TokenBucket(DART_RATE_PER_SEC, DART_BURST)
+        return self._session
+
+    async def _request(self, endpoint: str, params: dict, as_json: bool):
+        session = self._ensure_session()
+        url = endpoint if endpoint.startswith("http") else f"{DART_BASE_URL}/{endpoint}"
+        params = {"crtfc_key": os.getenv("DART_API_KEY", ""), **params}
+
+        for attempt in range(DART_MAX_RETRIES + 1):
+            await self._bucket.acquire()
+            try:
+                async with self._semaphore:
+                    self.requests += 1
+                    async with session.get(url, params=params) as response:
+                        if response.status >= 500:
+                            raise _RetryableError(f"HTTP {response.status}")
+                        response.raise_for_status()
+                        if not as_json:
+                            return await response.read()
+                        data = await response.json(content_type=None)
+                if (isinstance(data, dict) and data.get("status") in RETRY_STATUS
+                        and attempt < DART_MAX_RETRIES):
+                    raise _RetryableError(f"DART status {data.get('status')} {data.get('message', '')}")
+                return data
+            except (_RetryableError, aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt >= DART_MAX_RETRIES:
+                    raise
+                self.retries += 1
+                delay = DART_BACKOFF_BASE * (2 ** attempt) * (1 + random.random())
+                print(f"⚠️ DART {endpoint} 재시도 {attempt + 1}/{DART_MAX_RETRIES} ({e}) - {delay:.1f}초 후")
+                await asyncio.sleep(delay)
+
+    def _submit(self, endpoint: str, params: dict | None, as_json: bool):
+        coro = self._request(endpoint, dict(params or {}), as_json)
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    def get_json(self, endpoint: str, params: dict | None = None) -> dict:
+        return self._submit(endpoint, params, True).result()
+
+    def get_bytes(self, endpoint: str, params: dict | None = None) -> bytes:
+        return self._submit(endpoint, params, False).result()
+
+    async def aget_json(self, endpoint: str, params: dict | None = None) -> dict:
+        return await asyncio.wrap_future(self._submit(endpoint, params, True))
+
+    async def aget_bytes(self, endpoint: str, params: dict | None = None) -> bytes:
+        return await asyncio.wrap_future(self._submit(endpoint, params, False))
+
+    def stats(self) -> dict:
+        return {"requests": self.requests, "retries": self.retries}
+
+
+# 프로세스 전체에서 공유하는 전송 계층
+transport = DartTransport()
+
+get_json = transport.get_json
+get_bytes = transport.get_bytes
+aget_json = transport.aget_json
+aget_bytes = transport.aget_bytes
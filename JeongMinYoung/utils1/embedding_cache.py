@@ -0,0 +1,128 @@
+import hashlib
+import os
+import sqlite3
+import threading
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+# (모델명, 텍스트 해시) -> 임베딩 벡터(float16) 를 저장하는 SQLite 캐시
+# 질의(embed_query)와 문서(embed_documents)가 같은 벡터 공간을 쓰는 모델(bge-m3, OpenAI) 기준으로
+# 두 경로가 같은 캐시를 공유함.
+
+DEFAULT_CACHE_PATH = os.getenv(
+    "EMBEDDING_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "embedding_cache.sqlite3")
+)
+
+
+_instances = []
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+# 캐시에 저장되는 정밀도(float16)로 맞춰서 반환 (캐시 적중 여부와 관계없이 같은 벡터가 나오도록)
+def _to_stored_precision(vector) -> list[float]:
+    return np.asarray(vector, dtype=np.float16).astype(np.float32).tolist()
+
+
+# 프로세스 안의 모든 임베딩 캐시 적중률
+def all_cache_stats() -> list[dict]:
+    return [cache.stats() for cache in _instances]
+
+
+# EMBEDDING_CACHE=0 이면 캐시 없이 원래 임베딩 객체를 그대로 사용
+def with_embedding_cache(embeddings: Embeddings, namespace: str) -> Embeddings:
+    if os.getenv("EMBEDDING_CACHE", "1") == "0":
+        return embeddings
+    return CachedEmbeddings(embeddings, namespace)
+
+
+class CachedEmbeddings(Embeddings):
+    """임의의 LangChain Embeddings 를 감싸서 계산된 벡터를 디스크에 캐시하는 클래스"""
+
+    def __init__(self, embeddings: Embeddings, namespace: str, path: str = DEFAULT_CACHE_PATH):
+        self.embeddings = embeddings
+        self.namespace = namespace
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model TEXT NOT NULL,"
+            " text_hash TEXT NOT NULL,"
+            " dim INTEGER NOT NULL,"
+            " vector BLOB NOT NULL,"
+            " PRIMARY KEY (model, text_hash))"
+        )
+        self._conn.commit()
+        _instances.append(self)
+
+    def _lookup(self, hashes: list[str]) -> dict:
+        found = {}
+        with self._lock:
+            # SQLite 변수 개수 제한 때문에 나눠서 조회
+            for i in range(0, len(hashes), 500):
+                chunk = hashes[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                    [self.namespace, *chunk]
+                ).fetchall()
+                for h, blob in rows:
+                    found[h] = np.frombuffer(blob, dtype=np.float16).astype(np.float32).tolist()
+        return found
+
+    def _store(self, items: list[tuple[str, list[float]]]) -> None:
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, dim, vector) VALUES (?, ?, ?, ?)",
+                [(self.namespace, h, len(v), np.asarray(v, dtype=np.float16).tobytes()) for h, v in items]
+            )
+            self._conn.commit()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        hashes = [text_hash(t) for t in texts]
+        cached = self._lookup(list(set(hashes)))
+
+        # 캐시에 없는 텍스트만 (중복 제거 후) 실제 모델로 계산
+        missing = {}
+        for h, t in zip(hashes, texts):
+            if h not in cached and h not in missing:
+                missing[h] = t
+        if missing:
+            vectors = self.embeddings.embed_documents(list(missing.values()))
+            new_items = [(h, _to_stored_precision(v)) for h, v in zip(missing.keys(), vectors)]
+            self._store(new_items)
+            cached.update(new_items)
+
+        self.misses += len(missing)
+        self.hits += len(texts) - len(missing)
+        return [cached[h] for h in hashes]
+
+    def embed_query(self, text: str) -> list[float]:
+        h = text_hash(text)
+        cached = self._lookup([h])
+        if h in cached:
+            self.hits += 1
+            return cached[h]
+
+        self.misses += 1
+        vector = _to_stored_precision(self.embeddings.embed_query(text))
+        self._store([(h, vector)])
+        return vector
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "model": self.namespace,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
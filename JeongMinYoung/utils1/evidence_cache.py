@@ -0,0 +1,68 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from .answer_cache import normalize_question
+
+
+# 레벨과 관계없는 근거 수집 결과(라우팅 결과 + 체인 입력)를 (세션, 질문) 단위로 보관하는 메모리 저장소
+# 초급/중급/고급은 마지막 프롬프트만 다르기 때문에, 같은 세션에서 같은 질문을 다른 레벨로 다시 물으면
+# 분류/추출/DART 조회/벡터 검색 없이 저장된 근거로 답변 생성(LLM 1회)만 수행함
+# - EVIDENCE_CACHE_TTL 초가 지나면 다시 수집, EVIDENCE_CACHE_MAX_ENTRIES 를 넘으면 가장 오래 안 쓴 항목부터 삭제
+
+EVIDENCE_CACHE_TTL = int(os.getenv("EVIDENCE_CACHE_TTL", str(30 * 60)))
+EVIDENCE_CACHE_MAX_ENTRIES = int(os.getenv("EVIDENCE_CACHE_MAX_ENTRIES", "256"))
+
+
+class EvidenceCache:
+    """(세션, 정규화된 질문) -> (라우팅 결과, 체인 입력) LRU 저장소"""
+
+    def __init__(self, ttl: int = EVIDENCE_CACHE_TTL, max_entries: int = EVIDENCE_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(session_id: str | None, question: str) -> tuple:
+        return session_id or "", normalize_question(question)
+
+    def get(self, session_id: str | None, question: str) -> tuple | None:
+        key = self.make_key(session_id, question)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.time() - entry[2] > self.ttl:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0], entry[1]
+
+    def put(self, session_id: str | None, question: str, route, inputs: dict | None) -> None:
+        key = self.make_key(session_id, question)
+        with self._lock:
+            self._entries[key] = (route, inputs, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    # 세션 단위 또는 전체 삭제 (대화 초기화, 데이터 갱신 시)
+    def invalidate(self, session_id: str | None = None) -> None:
+        with self._lock:
+            if session_id is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if k[0] == session_id]:
+                    del self._entries[key]
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0}
+
+
+evidence_cache = EvidenceCache() if os.getenv("EVIDENCE_CACHE", "1") != "0" else None
@@ -0,0 +1,193 @@
+import argparse
+import csv
+import json
+import os
+import time
+
+import faiss
+import numpy as np
+from langchain_community.vectorstores import FAISS
+
+
+# FAISS 인덱스 종류별 빌드/로딩 도구
+# - flat  : 전수 검색 (기존 노트북의 FAISS.from_documents 와 동일)
+# - hnsw  : 그래프 기반 근사 검색 (M, ef_construction, ef_search)
+# - ivfpq : 역파일 + 곱 양자화 근사 검색 (nlist, m, nbits, nprobe)
+#
+# 예시) 기존 flat 인덱스에서 HNSW 버전을 만들고 flat 대비 재현율/지연시간 비교
+#   python -m utils1.faiss_index_builder faiss_index_bge_m3 --type hnsw --M 32 --ef-search 64 --report --questions questions.csv
+
+INDEX_TYPES = ("flat", "hnsw", "ivfpq")
+
+DEFAULT_PARAMS = {
+    "hnsw": {"M": 32, "ef_construction": 200, "ef_search": 64},
+    "ivfpq": {"nlist": 256, "m": 64, "nbits": 8, "nprobe": 16},
+}
+
+
+def _utils_dir() -> str:
+    return os.path.dirname(os.path.abspath(__file__))
+
+
+# 변형 인덱스 폴더 이름 (예: faiss_index3 + hnsw -> faiss_index3_hnsw)
+def variant_dir(index_dir: str, index_type: str) -> str:
+    return index_dir if index_type == "flat" else f"{index_dir}_{index_type}"
+
+
+# 벡터 행렬로 faiss 인덱스 생성
+def create_faiss_index(vectors: np.ndarray, index_type: str = "flat", **params):
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    dim = vectors.shape[1]
+    params = {**DEFAULT_PARAMS.get(index_type, {}), **{k: v for k, v in params.items() if v is not None}}
+
+    if index_type == "flat":
+        index = faiss.IndexFlatL2(dim)
+    elif index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, params["M"])
+        index.hnsw.efConstruction = params["ef_construction"]
+        index.hnsw.efSearch = params["ef_search"]
+    elif index_type == "ivfpq":
+        # 학습 데이터보다 클러스터가 많으면 학습이 안 되므로 문서 수에 맞춰 줄임
+        nlist = max(1, min(params["nlist"], len(vectors) // 39))
+        # PQ 코드북도 부분 공간마다 2**nbits 개 중심을 학습하므로 그보다 벡터가 적으면 학습할 수 없음
+        if len(vectors) < 2 ** params["nbits"]:
+            raise ValueError(f"IVF-PQ 학습 벡터가 부족합니다: {len(vectors)}개 < 2**nbits({2 ** params['nbits']}개), "
+                             f"--nbits 를 줄이거나 hnsw 를 사용하세요")
+        quantizer = faiss.IndexFlatL2(dim)
+        index = faiss.IndexIVFPQ(quantizer, dim, nlist, params["m"], params["nbits"])
+        index.train(vectors)
+        index.nprobe = min(params["nprobe"], nlist)
+    else:
+        raise ValueError(f"지원하지 않는 인덱스 종류입니다: {index_type} ({', '.join(INDEX_TYPES)})")
+
+    index.add(vectors)
+    return index
+
+
+# 검색 시 파라미터 조정 (HNSW: ef_search, IVF: nprobe)
+def set_search_params(vector_db, ef_search: int | None = None, nprobe: int | None = None) -> None:
+    index = vector_db.index
+    if ef_search is not None and hasattr(index, "hnsw"):
+        index.hnsw.efSearch = ef_search
+    if nprobe is not None and hasattr(index, "nprobe"):
+        index.nprobe = nprobe
+
+
+# 문서를 임베딩해서 원하는 종류의 FAISS 벡터 db 생성 (노트북의 FAISS.from_documents 대체)
+def build_vectordb(documents, embeddings, index_type: str = "flat", **params):
+    vectors = np.asarray(embeddings.embed_documents([d.page_content for d in documents]), dtype=np.float32)
+    vector_db = FAISS.from_embeddings(
+        [(d.page_content, v) for d, v in zip(documents, vectors.tolist())],
+        embeddings,
+        metadatas=[d.metadata for d in documents]
+    )
+    if index_type != "flat":
+        vector_db.index = create_faiss_index(vectors, index_type, **params)
+    return vector_db
+
+
+# 이미 저장된 flat 인덱스의 벡터를 그대로 꺼내 근사 인덱스로 변환 (재임베딩 불필요)
+def convert_vectordb(flat_db, index_type: str, **params):
+    vectors = flat_db.index.reconstruct_n(0, flat_db.index.ntotal)
+    return FAISS(
+        embedding_function=flat_db.embedding_function,
+        index=create_faiss_index(vectors, index_type, **params),
+        docstore=flat_db.docstore,
+        index_to_docstore_id=dict(flat_db.index_to_docstore_id),
+    )
+
+
+# flat(정답) 대비 recall@k 와 질의당 평균 지연시간 비교
+# 인덱스에 들어 있는 벡터를 질의로 쓸 때는 self_ids 로 각 질의 자신의 id 를 넘겨서 정답/결과에서 모두 제외
+# (자기 자신은 항상 최근접 이웃이라 제외하지 않으면 근사 인덱스의 재현율이 부풀려짐)
+def recall_latency_report(flat_db, candidates: dict, query_vectors: np.ndarray, k: int = 6,
+                          self_ids: np.ndarray | None = None) -> list[dict]:
+    query_vectors = np.ascontiguousarray(query_vectors, dtype=np.float32)
+
+    def _run(index):
+        started = time.perf_counter()
+        _, ids = index.search(query_vectors, k if self_ids is None else k + 1)
+        elapsed_ms = (time.perf_counter() - started) * 1000 / len(query_vectors)
+        if self_ids is not None:
+            ids = np.stack([row[row != own][:k] for row, own in zip(ids, self_ids)])
+        return ids, elapsed_ms
+
+    truth, flat_ms = _run(flat_db.index)
+    report = [{"index": "flat", "recall@k": 1.0, "latency_ms": flat_ms}]
+    for name, vector_db in candidates.items():
+        ids, ms = _run(vector_db.index)
+        hits = sum(len((set(t) & set(r)) - {-1}) for t, r in zip(truth, ids))
+        report.append({"index": name, "recall@k": hits / max(1, int((truth >= 0).sum())), "latency_ms": ms})
+    return report
+
+
+# 리포트용 질문 파일 (.csv 의 question 열, .jsonl 의 question 키, 그 외에는 한 줄에 질문 하나)
+def load_query_texts(path: str) -> list[str]:
+    if path.lower().endswith(".csv"):
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            texts = [row.get("question") or "" for row in csv.DictReader(f)]
+    elif path.lower().endswith(".jsonl"):
+        with open(path, encoding="utf-8") as f:
+            texts = [json.loads(line).get("question") or "" for line in f if line.strip()]
+    else:
+        with open(path, encoding="utf-8") as f:
+            texts = f.readlines()
+    return [t.strip() for t in texts if t.strip()]
+
+
+def print_report(report: list[dict], k: int) -> None:
+    print(f"{'index':<24}{'recall@' + str(k):>12}{'ms/query':>12}")
+    for row in report:
+        print(f"{row['index']:<24}{row['recall@k']:>12.3f}{row['latency_ms']:>12.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FAISS 근사 인덱스 빌드 및 재현율/지연시간 비교")
+    parser.add_argument("index_dir", help="utils1 아래 flat 인덱스 폴더 (예: faiss_index3)")
+    parser.add_argument("--type", choices=INDEX_TYPES[1:], default="hnsw")
+    parser.add_argument("--M", type=int)
+    parser.add_argument("--ef-construction", type=int)
+    parser.add_argument("--ef-search", type=int)
+    parser.add_argument("--nlist", type=int)
+    parser.add_argument("--m", type=int, help="IVF-PQ 부분 벡터 개수 (차원의 약수)")
+    parser.add_argument("--nbits", type=int)
+    parser.add_argument("--nprobe", type=int)
+    parser.add_argument("--report", action="store_true", help="flat 대비 recall/지연시간 출력")
+    parser.add_argument("--questions", help="리포트에 사용할 실제 질문 파일 (.csv/.jsonl/.txt, 인덱스에 없는 문장)")
+    parser.add_argument("--queries", type=int, default=200, help="질문 파일이 없을 때 리포트에 사용할 샘플 질의 수")
+    parser.add_argument("--k", type=int, default=6)
+    args = parser.parse_args()
+
+    from .retreiver_setting import load_bge_m3_embeddings, load_faiss_vectordb
+    from .answer_cache import clear_answer_cache
+
+    # FAISS_VARIANT 환경변수와 관계없이 항상 flat 인덱스를 원본(정답)으로 사용
+    embeddings = load_bge_m3_embeddings()
+    flat_db = load_faiss_vectordb(args.index_dir, embeddings, variant="flat")
+    ann_db = convert_vectordb(
+        flat_db, args.type, M=args.M, ef_construction=args.ef_construction, ef_search=args.ef_search,
+        nlist=args.nlist, m=args.m, nbits=args.nbits, nprobe=args.nprobe
+    )
+    out_dir = os.path.join(_utils_dir(), variant_dir(args.index_dir, args.type))
+    ann_db.save_local(out_dir)
+    print(f"✅ {args.type} 인덱스 저장: {out_dir} (벡터 {ann_db.index.ntotal}개)")
+    clear_answer_cache()  # 검색 결과가 바뀌므로 이전 답변은 재사용하지 않음
+
+    if args.report:
+        if args.questions:
+            # 인덱스에 없는 실제 질문을 한 번에 임베딩해서 질의로 사용
+            texts = load_query_texts(args.questions)
+            query_vectors = np.asarray(embeddings.embed_documents(texts), dtype=np.float32)
+            self_ids = None
+        else:
+            # 질문 파일이 없으면 저장된 문서 벡터 일부를 질의로 쓰고, 각 질의 자신은 정답/결과에서 제외
+            print("⚠️ --questions 가 없어 저장된 문서 벡터로 비교합니다 (자기 자신은 제외)")
+            rng = np.random.default_rng(0)
+            self_ids = rng.choice(flat_db.index.ntotal, size=min(args.queries, flat_db.index.ntotal), replace=False)
+            query_vectors = np.stack([flat_db.index.reconstruct(int(i)) for i in self_ids])
+        report = recall_latency_report(flat_db, {args.type: ann_db}, query_vectors, args.k, self_ids=self_ids)
+        print_report(report, args.k)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+import numpy as np
+import pandas as pd
+
+from .context_packer import count_tokens, pack_lines
+
+
+# DART 단일회사 전체 재무제표 응답을 숫자 표로 바꾸고, 증감/재무비율을 미리 계산하는 모듈
+# LLM 이 직접 계산하던 증감액, 증감률, 영업이익률, 부채비율, 유동비율, ROE, 억원 환산을
+# 여기서 한 번에(연도 축 벡터 연산) 계산해서 짧은 표로 프롬프트에 넣음
+
+STATUS_OK = "000"
+EOK = 1e8  # 억원
+
+# (표시 이름, 재무제표 구분, account_id 후보, account_nm 후보(공백 제거))
+STATEMENT_ITEMS = [
+    ("매출액", ("IS", "CIS"), ("ifrs-full_Revenue",), ("매출액", "수익(매출액)", "매출", "영업수익")),
+    ("매출원가", ("IS", "CIS"), ("ifrs-full_CostOfSales",), ("매출원가", "영업비용")),
+    ("매출총이익", ("IS", "CIS"), ("ifrs-full_GrossProfit",), ("매출총이익", "매출총이익(손실)")),
+    ("영업이익", ("IS", "CIS"), ("dart_OperatingIncomeLoss", "ifrs-full_ProfitLossFromOperatingActivities"),
+     ("영업이익", "영업이익(손실)")),
+    ("당기순이익", ("IS", "CIS"), ("ifrs-full_ProfitLoss",), ("당기순이익", "당기순이익(손실)", "연결당기순이익")),
+    ("자산총계", ("BS",), ("ifrs-full_Assets",), ("자산총계",)),
+    ("유동자산", ("BS",), ("ifrs-full_CurrentAssets",), ("유동자산",)),
+    ("비유동자산", ("BS",), ("ifrs-full_NoncurrentAssets",), ("비유동자산",)),
+    ("부채총계", ("BS",), ("ifrs-full_Liabilities",), ("부채총계",)),
+    ("유동부채", ("BS",), ("ifrs-full_CurrentLiabilities",), ("유동부채",)),
+    ("자본총계", ("BS",), ("ifrs-full_Equity",), ("자본총계",)),
+]
+ITEM_NAMES = [name for name, *_ in STATEMENT_ITEMS]
+_MATCHED_IDS = {account_id for _, _, ids, _ in STATEMENT_ITEMS for account_id in ids}
+_MATCHED_NAMES = {account_nm for _, _, _, names in STATEMENT_ITEMS for account_nm in names}
+
+
+def _to_number(values: pd.Series) -> pd.Series:
+    cleaned = values.astype(str).str.replace(",", "", regex=False).str.strip()
+    return pd.to_numeric(cleaned, errors="coerce")
+
+
+# API 응답(dict) -> 계정 DataFrame (금액은 float, 값이 없으면 NaN)
+def parse_statement(data: dict) -> pd.DataFrame:
+    columns = ["sj_div", "account_id", "account_nm", "thstrm_amount", "frmtrm_amount", "currency"]
+    if not data or data.get("status") != STATUS_OK or not data.get("list"):
+        return pd.DataFrame(columns=columns)
+
+    df = pd.DataFrame(data["list"]).reindex(columns=columns)
+    df["account_nm"] = df["account_nm"].fillna("").str.replace(" ", "", regex=False)
+    df["account_id"] = df["account_id"].fillna("")
+    df["currency"] = df["currency"].fillna("KRW")
+    for col in ("thstrm_amount", "frmtrm_amount"):
+        df[col] = _to_number(df[col])
+    return df
+
+
+# 표준 항목별 (당기, 전기) 금액 추출 -> index: 항목, columns: thstrm_amount/frmtrm_amount
+def extract_items(df: pd.DataFrame) -> pd.DataFrame:
+    rows = {}
+    for name, sj_divs, ids, names in STATEMENT_ITEMS:
+        mask = df["sj_div"].isin(sj_divs) & (df["account_id"].isin(ids) | df["account_nm"].isin(names))
+        # account_id 가 일치하는 행을 우선, 같으면 보고서 순서(첫 행) 사용
+        matched = df[mask].assign(_by_id=lambda d: d["account_id"].isin(ids)).sort_values("_by_id", ascending=False, kind="stable")
+        if not matched.empty:
+            rows[name] = matched.iloc[0][["thstrm_amount", "frmtrm_amount"]]
+    return pd.DataFrame.from_dict(rows, orient="index", columns=["thstrm_amount", "frmtrm_amount"]).reindex(ITEM_NAMES)
+
+
+# 연도별 응답 {연도: dict} -> 항목 x 연도 금액표 (원 단위)
+# 각 연도 보고서의 전기 금액으로 한 해 앞 연도도 채워서, 한 해만 물어봐도 증감을 계산할 수 있게 함
+def build_statement_frame(statements: dict[str, dict]) -> pd.DataFrame:
+    columns = {}
+    prior = {}
+    for year, data in statements.items():
+        df = parse_statement(data)
+        if df.empty:
+            continue
+        items = extract_items(df)
+        columns[int(year)] = items["thstrm_amount"]
+        prior[int(year) - 1] = items["frmtrm_amount"]
+
+    for year, values in prior.items():
+        columns[year] = columns[year].combine_first(values) if year in columns else values
+
+    if not columns:
+        return pd.DataFrame(index=ITEM_NAMES, dtype=float)
+    frame = pd.DataFrame(columns).reindex(ITEM_NAMES).astype(float)
+    return frame.reindex(columns=sorted(frame.columns)).dropna(axis=1, how="all")
+
+
+def _ratio(numerator: pd.Series, denominator: pd.Series) -> pd.Series:
+    return numerator / denominator.where(denominator != 0) * 100
+
+
+# 금액표 -> 재무비율표 (%)
+def compute_ratios(frame: pd.DataFrame) -> pd.DataFrame:
+    f = frame
+    # ROE 는 바로 앞 연도(연도-1) 자본이 있으면 평균자본, 없으면 기말자본 기준
+    # (요청 연도가 떨어져 있으면 앞 열이 연도-1 이 아닐 수 있으므로 열 순서가 아니라 연도로 찾음)
+    equity = f.loc["자본총계"]
+    prior_equity = equity.reindex([year - 1 for year in equity.index]).set_axis(equity.index)
+    avg_equity = ((equity + prior_equity) / 2).fillna(equity)
+    return pd.DataFrame({
+        "매출총이익률": _ratio(f.loc["매출총이익"], f.loc["매출액"]),
+        "영업이익률": _ratio(f.loc["영업이익"], f.loc["매출액"]),
+        "순이익률": _ratio(f.loc["당기순이익"], f.loc["매출액"]),
+        "부채비율": _ratio(f.loc["부채총계"], f.loc["자본총계"]),
+        "유동비율": _ratio(f.loc["유동자산"], f.loc["유동부채"]),
+        "ROE": _ratio(f.loc["당기순이익"], avg_equity),
+    }).T
+
+
+# 금액표 -> 직전 연도 대비 증감액(원), 증감률(%)
+def compute_changes(frame: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    delta = frame.diff(axis=1)
+    prev = frame.shift(1, axis=1)
+    growth = delta / prev.abs().where(prev != 0) * 100
+    return delta, growth
+
+
+def _fmt_amount(value: float, signed: bool = False) -> str:
+    if pd.isna(value):
+        return "데이터 없음" if not signed else "-"
+    return f"{value / EOK:+,.0f}" if signed else f"{value / EOK:,.0f}"
+
+
+def _fmt_pct(value: float, signed: bool = False, unit: str = "%") -> str:
+    if pd.isna(value) or np.isinf(value):
+        return "-" if signed else "데이터 없음"
+    return f"{value:+.1f}{unit}" if signed else f"{value:.1f}{unit}"
+
+
+# 프롬프트에 넣을 요약표 (금액은 억원, 마지막 열은 최근 연도의 직전 연도 대비 증감)
+def format_statement_table(frame: pd.DataFrame, currency: str = "KRW") -> str:
+    if frame.empty or frame.columns.empty:
+        return ""
+
+    years = list(frame.columns)
+    delta, growth = compute_changes(frame)
+    ratios = compute_ratios(frame)
+    ratio_change = ratios.diff(axis=1)
+    latest = years[-1]
+    has_change = len(years) > 1
+
+    header = " | ".join(["항목"] + [f"{y}년" for y in years] + (["증감(억원)", "증감률"] if has_change else []))
+    lines = [f"단위: 억원 (통화: {currency}), 비율은 %", header]
+    for name in frame.index:
+        if frame.loc[name].isna().all():
+            continue
+        cells = [name] + [_fmt_amount(frame.at[name, y]) for y in years]
+        if has_change:
+            cells += [_fmt_amount(delta.at[name, latest], signed=True), _fmt_pct(growth.at[name, latest], signed=True)]
+        lines.append(" | ".join(cells))
+
+    lines.append("")
+    lines.append(" | ".join(["재무비율"] + [f"{y}년" for y in years] + (["변화"] if has_change else [])))
+    for name in ratios.index:
+        if ratios.loc[name].isna().all():
+            continue
+        cells = [name] + [_fmt_pct(ratios.at[name, y]) for y in years]
+        if has_change:
+            cells.append(_fmt_pct(ratio_change.at[name, latest], signed=True, unit="%p"))
+        lines.append(" | ".join(cells))
+    return "\n".join(lines)
+
+
+# 표준 항목에 없는 나머지 계정 (최근 연도 보고서 기준, 억원)
+def other_account_lines(data: dict) -> list[str]:
+    df = parse_statement(data)
+    if df.empty:
+        return []
+    rest = df[~df["account_id"].isin(_MATCHED_IDS) & ~df["account_nm"].isin(_MATCHED_NAMES)]
+    rest = rest.dropna(subset=["thstrm_amount"]).drop_duplicates("account_nm")
+    return [
+        f"{row.account_nm} : {_fmt_amount(row.thstrm_amount)} (당기), {_fmt_amount(row.frmtrm_amount)} (전기)"
+        for row in rest.itertuples()
+    ]
+
+
+# 연도별 응답 -> 프롬프트용 재무제표 문자열 (요약표 + 예산 안에서 나머지 계정)
+def build_financial_context(statements: dict[str, dict], budget: int, label: str = "재무제표") -> str:
+    ok = {y: d for y, d in statements.items() if d and d.get("status") == STATUS_OK}
+    errors = [
+        f"📅 {y}년 재무제표: [API 오류] {(d or {}).get('message', '유효한 데이터를 찾을 수 없습니다.')}"
+        for y, d in statements.items() if y not in ok
+    ]
+    if not ok:
+        return "\n".join(errors)
+
+    latest_year = max(ok, key=int)
+    currency = (ok[latest_year]["list"][0].get("currency") or "KRW")
+    table = format_statement_table(build_statement_frame(ok), currency)
+    blocks = [f"📊 연결재무제표(사업보고서) 요약표 (증감액·증감률·재무비율은 미리 계산된 값이므로 그대로 사용)\n{table}"] + errors
+
+    remaining = budget - count_tokens("\n\n".join(blocks))
+    others = other_account_lines(ok[latest_year])
+    if others and remaining > 0:
+        blocks.append(f"📅 {latest_year}년 기타 계정 (억원):\n" + pack_lines(others, remaining, f"{label} 기타 계정"))
+    return "\n\n".join(blocks)
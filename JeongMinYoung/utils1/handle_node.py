@@ -1,268 +1,547 @@
 from .normalize_code_search import find_corporation_code, normalize_company_name, parse_extracted_text
-from .retreiver_setting import faiss_retriever_loading, preprocess, calculate_bm25
-from .api_get import get_financial_state
-from .chain_setting import create_chain
+from .retreiver_setting import build_business_metadata_filter, filtered_business_search, afiltered_business_search
+from .query_rules import extract_rule_based
+from .api_get import get_financial_statement, aget_financial_statement
+from .registry import LazyResource
+from .context_packer import CONTEXT_BUDGETS, pack_documents
+from .financial_engine import build_financial_context
+from .query_router import QueryRoute, DEFAULT_YEARS
+import asyncio
+import json
 import os
-from langchain.chat_models import ChatOpenAI
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, Future, TimeoutError as FutureTimeoutError
+
+# 체인/retriever 는 registry 에서 처음 사용할 때 한 번만 생성되고 프로세스 전체에서 공유됨
+extract_chain = LazyResource("extract_chain")
+hybrid_chain1, hybrid_chain2, hybrid_chain3 = (LazyResource(f"hybrid_chain{i}") for i in (1, 2, 3))
+account_chain1, account_chain2, account_chain3 = (LazyResource(f"account_chain{i}") for i in (1, 2, 3))
+business_chain1, business_chain2, business_chain3 = (LazyResource(f"business_chain{i}") for i in (1, 2, 3))
+financial_chain1, financial_chain2, financial_chain3 = (LazyResource(f"financial_chain{i}") for i in (1, 2, 3))
+
+accounting_retriever = LazyResource("accounting_search_retriever")
+business_retriever = LazyResource("business_search_retriever")
+business_retriever2 = LazyResource("business_retriever2")
+self_retriever = LazyResource("self_query_retriever")
+pinecone_vectordb = LazyResource("pinecone_vectordb")
+
+
+# 회사/연도 결정: 라우터가 회사를 뽑았으면 그대로 쓰고, 없으면 extract_chain 으로 추출
+def resolve_company_years(question: str, route: QueryRoute | None = None) -> tuple[str | None, list[str]]:
+    if route is not None and route.company:
+        return route.company, route.year_list
+    extracted = parse_extracted_text(extract_chain.invoke({"question": question}))
+    return extracted["company"], extracted.get("year_list") or list(DEFAULT_YEARS)
+
+
+# 회계 질문용 체인 입력 생성 함수
+def build_accounting_inputs(question: str, route: QueryRoute | None = None, speculation=None) -> dict:
+    docs = _take(speculation, "accounting", accounting_retriever.invoke, question)
+    context = pack_documents(docs, CONTEXT_BUDGETS["accounting"], "accounting")
+    return {"context": context, "question": question}
+
+
+# 사업보고서 메타데이터 필터 후보 (앞에서부터 시도)
+# 1) 회사+연도: 라우터/LLM 이 준 회사명("삼전", "하이닉스" 등)을 Pinecone 에 저장된 정식 corp_name 으로 정규화
+# 2) 연도만: 회사명 필터로 찾은 문서가 없을 때
+def business_metadata_filters(question: str, route: QueryRoute | None = None) -> list[dict]:
+    if route is not None and route.company:
+        company, years = route.company, route.years
+    else:
+        rules = extract_rule_based(question)
+        company, years = rules["company"], rules["year_list"]
+
+    filters = []
+    if company:
+        try:
+            canonical = normalize_company_name(company) or company
+        except Exception as e:
+            print(f"⚠️ 회사명 정규화 실패: {e}")
+            canonical = company
+        filters.append(build_business_metadata_filter(canonical, years))
+    year_filter = build_business_metadata_filter(None, years)
+    if year_filter is not None:
+        filters.append(year_filter)
+    return filters
+
+
+# 사업보고서 검색 함수
+# 질문에서 회사/연도가 (라우터 또는 규칙으로) 확실히 뽑히면 메타데이터 필터를 직접 만들어 검색하고,
+# 뽑히지 않거나 모든 필터 결과가 없을 때만 LLM 이 필터를 만드는 SelfQueryRetriever 사용
+def retrieve_business_docs(question: str, route: QueryRoute | None = None, speculation=None) -> list:
+    for metadata_filter in business_metadata_filters(question, route):
+        try:
+            docs = _take(speculation, ("business", _filter_key(metadata_filter)),
+                         filtered_business_search, pinecone_vectordb, question, metadata_filter)
+            if docs:
+                print(f"🔎 규칙 기반 필터 검색: {metadata_filter}")
+                return docs
+            print(f"🔎 필터 검색 결과 없음: {metadata_filter}")
+        except Exception as e:
+            print(f"⚠️ 규칙 기반 필터 검색 실패: {e}")
+    return self_retriever.invoke(question)
+
+
+# 사업보고서 질문용 체인 입력 생성 함수
+def build_business_inputs(question: str, route: QueryRoute | None = None, speculation=None) -> dict:
+    # docs = business_retriever.invoke(question)
+    # docs = business_retriever2.invoke(question)
+    docs = retrieve_business_docs(question, route, speculation)
+    context = pack_documents(docs, CONTEXT_BUDGETS["business"], "business")
+    return {"context": context, "question": question}
+
+
+# 재무제표 질문용 체인 입력 생성 함수
+def build_financial_inputs(question: str, route: QueryRoute | None = None, speculation=None) -> dict:
+    # 추출 (라우터 결과가 있으면 LLM 추출 생략)
+    company, years = resolve_company_years(question, route)
+    corp_code = find_corporation_code(company or "")
 
-simple_chain, classification_chain, extract_chain,hybrid_chain1, hybrid_chain2, hybrid_chain3,account_chain1, account_chain2, account_chain3,business_chain1, business_chain2, business_chain3, financial_chain1, financial_chain2, financial_chain3 = create_chain()
+    # 재무제표 연도별 조회 후 증감/재무비율을 미리 계산한 요약표로 구조화
+    statements = {y: _take(speculation, ("dart", corp_code, y), get_financial_statement, corp_code, y, "11011", "CFS")
+                  for y in years}
+    structured_financial = build_financial_context(statements, CONTEXT_BUDGETS["financial"])
 
-accounting_retriever, business_retriever, business_retriever2, self_retriever = faiss_retriever_loading()
+    return {
+        "financial_data": structured_financial,
+        "question": question,
+        "resolved_corp_name": company,
+    }
 
 
 # 초급 회계 질문 답변 분기 함수
-def handle_accounting1(question: str) -> str:
+def handle_accounting1(question: str, route: QueryRoute | None = None, speculation=None) -> str:
     print("📥 accounting 처리 시작")
-    docs = accounting_retriever.invoke(question)
-    context = "\n\n".join(doc.page_content for doc in docs)
-    return account_chain1.invoke({"context": context, "question": question})
+    return account_chain1.invoke(build_accounting_inputs(question, route, speculation))
 
 
 # 중급 회계 질문 답변 분기 함수
-def handle_accounting2(question: str) -> str:
+def handle_accounting2(question: str, route: QueryRoute | None = None, speculation=None) -> str:
     print("📥 accounting 처리 시작")
-    docs = accounting_retriever.invoke(question)
-    context = "\n\n".join(doc.page_content for doc in docs)
-    return account_chain2.invoke({"context": context, "question": question})
+    return account_chain2.invoke(build_accounting_inputs(question, route, speculation))
 
 # 고급 회계 질문 답변 분기 함수
-def handle_accounting3(question: str) -> str:
+def handle_accounting3(question: str, route: QueryRoute | None = None, speculation=None) -> str:
     print("📥 accounting 처리 시작")
-    docs = accounting_retriever.invoke(question)
-    context = "\n\n".join(doc.page_content for doc in docs)
-    return account_chain3.invoke({"context": context, "question": question})
+    return account_chain3.invoke(build_accounting_inputs(question, route, speculation))
 
 # 초급 사업보고서 질문 답변 분기 함수
-def handle_business1(question: str) -> str:
+def handle_business1(question: str, route: QueryRoute | None = None, speculation=None) -> str:
     print("📥 business 처리 시작")
-    # docs = business_retriever.invoke(question)
-    # docs = business_retriever2.invoke(question)
-    docs = self_retriever.get_relevant_documents(question)
-    context = "\n\n".join(doc.page_content for doc in docs)
-
-    return business_chain1.invoke({"context": context, "question": question})
+    return business_chain1.invoke(build_business_inputs(question, route, speculation))
 
 # 중급 사업보고서 질문 답변 분기 함수
-def handle_business2(question: str) -> str:
+def handle_business2(question: str, route: QueryRoute | None = None, speculation=None) -> str:
     print("📥 business 처리 시작")
-    # docs = business_retriever.invoke(question)
-    # docs = business_retriever2.invoke(question)
-    docs = self_retriever.get_relevant_documents(question)
-    context = "\n\n".join(doc.page_content for doc in docs)
-
-    return business_chain2.invoke({"context": context, "question": question})
+    return business_chain2.invoke(build_business_inputs(question, route, speculation))
 
 
 # 고급 사업보고서 질문 답변 분기 함수
-def handle_business3(question: str) -> str:
+def handle_business3(question: str, route: QueryRoute | None = None, speculation=None) -> str:
     print("📥 business 처리 시작")
-    # docs = business_retriever.invoke(question)
-    # docs = business_retriever2.invoke(question)
-    docs = self_retriever.get_relevant_documents(question)
-    context = "\n\n".join(doc.page_content for doc in docs)
-
-    return business_chain3.invoke({"context": context, "question": question})
+    return business_chain3.invoke(build_business_inputs(question, route, speculation))
 
 
 # 초급 재무제표 질문 답변하는 분기 함수
-def handle_financial1(question: str) -> str:
+def handle_financial1(question: str, route: QueryRoute | None = None, speculation=None) -> str:
     print("📥 financial 처리 시작")
+    return financial_chain1.invoke(build_financial_inputs(question, route, speculation))
 
-    # 추출
-    extracted_text = extract_chain.invoke({"question": question})
-    extracted = parse_extracted_text(extracted_text)
-
-    corp_code = find_corporation_code(extracted["company"])
-    years = extracted.get("year_list", ["2024"])
 
-    # 재무제표 연도별 구조화
-    fin_blocks = []
-    for y in years:
-        rows = get_financial_state(corp_code, y, "11011", "CFS")
-        if rows:
-            fin_blocks.append(f"📅 {y}년 재무제표:\n" + "\n".join(rows))
+# 중급 재무제표 질문 답변하는 분기 함수
+def handle_financial2(question: str, route: QueryRoute | None = None, speculation=None) -> str:
+    print("📥 financial 처리 시작")
+    return financial_chain2.invoke(build_financial_inputs(question, route, speculation))
 
-    structured_financial = "\n\n".join(fin_blocks)
 
-    # 체인 실행
-    return financial_chain1.invoke({
-        "financial_data": structured_financial,
+# 고급 재무제표 질문 답변하는 분기 함수
+def handle_financial3(question: str, route: QueryRoute | None = None, speculation=None) -> str:
+    print("📥 financial 처리 시작")
+    return financial_chain3.invoke(build_financial_inputs(question, route, speculation))
+
+
+
+# 하이브리드 병렬 수집 설정 (단위: 초)
+HYBRID_EXTRACT_TIMEOUT = float(os.getenv("HYBRID_EXTRACT_TIMEOUT", "20"))
+HYBRID_DART_TIMEOUT = float(os.getenv("HYBRID_DART_TIMEOUT", "10"))
+HYBRID_RETRIEVER_TIMEOUT = float(os.getenv("HYBRID_RETRIEVER_TIMEOUT", "15"))
+
+_hybrid_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="hybrid")
+
+
+# 제출 시점부터 timeout 초 안에 끝난 결과만 사용하고, 실패/시간 초과 시 fallback 반환
+def _collect(future: Future, submitted_at: float, timeout: float, fallback, label: str):
+    remaining = max(0.0, submitted_at + timeout - time.monotonic())
+    try:
+        return future.result(timeout=remaining)
+    except FutureTimeoutError:
+        future.cancel()
+        print(f"⏱️ {label} 시간 초과({timeout:.0f}초) - 나머지 결과로 진행")
+    except Exception as e:
+        print(f"⚠️ {label} 실패: {e} - 나머지 결과로 진행")
+    return fallback
+
+
+# 분류(LLM 라우팅)와 동시에 검색을 미리 시작할지 여부 (SPECULATIVE_RETRIEVAL=0 이면 사용 안 함)
+SPECULATIVE_RETRIEVAL = os.getenv("SPECULATIVE_RETRIEVAL", "1") != "0"
+# 미리 검색은 하이브리드 수집과 별도의 스레드 풀에서 실행 (분류 결과로 버려질 수 있는 작업이 실제 수집을 막지 않도록)
+# 대기 중인 작업이 SPECULATIVE_MAX_PENDING 개를 넘으면 새 미리 검색은 건너뛰고 분류 후에 직접 실행
+SPECULATIVE_MAX_WORKERS = int(os.getenv("SPECULATIVE_MAX_WORKERS", "4"))
+SPECULATIVE_MAX_PENDING = int(os.getenv("SPECULATIVE_MAX_PENDING", str(SPECULATIVE_MAX_WORKERS * 2)))
+
+_speculation_executor = ThreadPoolExecutor(max_workers=SPECULATIVE_MAX_WORKERS, thread_name_prefix="speculative")
+_speculation_slots = threading.BoundedSemaphore(SPECULATIVE_MAX_PENDING)
+
+
+def _filter_key(metadata_filter: dict) -> str:
+    return json.dumps(metadata_filter, sort_keys=True, ensure_ascii=False)
+
+
+class SpeculativeRetrieval:
+    """LLM 분류가 끝나기 전에 미리 시작한 검색/조회 작업 묶음
+
+    - 회계 기준서 검색, 사업보고서 로컬 검색(FAISS 또는 FAISS+BM25)은 항상 시작
+    - 규칙으로 회사가 뽑히면 Pinecone 필터 검색과 연도별 DART 재무제표 조회도 시작
+    - 분류 결과에 맞는 handler 가 같은 키(같은 입력)의 결과만 가져가고, 나머지는 close() 에서 취소/폐기
+    - 미리 검색 풀이 가득 차 있으면 해당 작업은 시작하지 않음 (take() 에서 직접 실행)
+    """
+
+    def __init__(self, question: str):
+        self.question = question
+        self._futures = {}
+        self._used = set()
+
+        rules = extract_rule_based(question)
+        # LazyResource 의 .invoke 를 여기서 꺼내면 처음 요청 때 bge-m3/FAISS 로딩이 호출한 스레드에서 일어나므로
+        # 리소스 확인까지 미리 검색 스레드에서 하도록 lambda 로 넘김 (라우터 LLM 호출과 겹쳐서 로딩)
+        self._submit("accounting", lambda q: accounting_retriever.invoke(q), question)
+        self._submit("business_faiss", lambda q: business_retriever.invoke(q), question)
+        metadata_filter = build_business_metadata_filter(rules["company"], rules["year_list"])
+        if metadata_filter is not None:
+            self._submit(("business", _filter_key(metadata_filter)),
+                         filtered_business_search, pinecone_vectordb, question, metadata_filter)
+        if rules["corp_code"]:
+            for y in rules["year_list"] or DEFAULT_YEARS:
+                self._submit(("dart", rules["corp_code"], y),
+                             get_financial_statement, rules["corp_code"], y, "11011", "CFS")
+
+    def _submit(self, key, fn, *args) -> None:
+        if not _speculation_slots.acquire(blocking=False):
+            return
+        try:
+            future = _speculation_executor.submit(fn, *args)
+        except Exception:
+            _speculation_slots.release()
+            raise
+        future.add_done_callback(lambda _: _speculation_slots.release())
+        self._futures[key] = future
+
+    # 미리 시작한 작업의 future (없으면 None)
+    def future(self, key) -> Future | None:
+        future = self._futures.get(key)
+        if future is not None:
+            self._used.add(key)
+        return future
+
+    # 미리 시작한 결과를 가져오고, 없거나 실패했으면 fn(*args) 를 직접 실행
+    def take(self, key, fn, *args):
+        future = self.future(key)
+        if future is None:
+            return fn(*args)
+        try:
+            result = future.result()
+            print(f"⚡ 미리 시작한 검색 결과 사용: {key if isinstance(key, str) else key[0]}")
+            return result
+        except Exception as e:
+            print(f"⚠️ 미리 시작한 검색 실패: {e} - 다시 실행")
+            return fn(*args)
+
+    # 사용하지 않은 작업 취소 (이미 실행 중인 작업은 끝나도 결과를 버림)
+    def close(self) -> None:
+        unused = [key for key in self._futures if key not in self._used]
+        for key in unused:
+            self._futures[key].cancel()
+        if unused:
+            print(f"🗑️ 사용하지 않은 미리 검색 {len(unused)}개 폐기")
+
+
+def _take(speculation: SpeculativeRetrieval | None, key, fn, *args):
+    if speculation is None:
+        return fn(*args)
+    return speculation.take(key, fn, *args)
+
+
+def _submit_or_reuse(speculation: SpeculativeRetrieval | None, key, fn, *args) -> Future:
+    future = speculation.future(key) if speculation is not None else None
+    return future or _hybrid_executor.submit(fn, *args)
+
+
+# 하이브리드 답변에 필요한 근거(회계 기준서, 사업보고서, 재무제표)를 병렬로 수집하는 함수
+def gather_hybrid_context(question: str, route: QueryRoute | None = None, speculation=None) -> dict:
+    # 1. 서로 의존하지 않는 작업은 한 번에 제출 (벡터 검색 2개 + 라우터에 회사가 없을 때만 회사/연도 추출)
+    #    분류 중에 미리 시작한 작업이 있으면 그 future 를 그대로 사용
+    started = time.monotonic()
+    acct_future = _submit_or_reuse(speculation, "accounting", lambda q: accounting_retriever.invoke(q), question)
+    biz_future = _submit_or_reuse(speculation, "business_faiss", lambda q: business_retriever.invoke(q), question)
+    if route is not None and route.company:
+        extracted = {"company": route.company, "year_list": route.year_list}
+    else:
+        extract_future = _hybrid_executor.submit(extract_chain.invoke, {"question": question})
+        extracted_text = _collect(extract_future, started, HYBRID_EXTRACT_TIMEOUT, None, "회사/연도 추출")
+        extracted = parse_extracted_text(extracted_text) if extracted_text is not None else None
+
+    # 2. 회사/연도가 정해지면 연도별 재무제표 요청을 동시에 제출
+    fin_futures = []
+    if extracted is not None:
+        corp_code = find_corporation_code(extracted["company"]) if extracted["company"] else None
+        years = extracted.get("year_list") or list(DEFAULT_YEARS)
+        fin_started = time.monotonic()
+        for y in years:
+            if corp_code and not corp_code.startswith("[ERROR]"):
+                fin_futures.append((y, _submit_or_reuse(speculation, ("dart", corp_code, y),
+                                                        get_financial_statement, corp_code, y, "11011", "CFS")))
+            else:
+                fin_futures.append((y, None))
+
+    # 3. 결과 수집 (부분 실패 시 해당 연도만 대체 문구로 채움)
+    statements = {}
+    for y, future in fin_futures:
+        if future is not None:
+            statements[y] = _collect(future, fin_started, HYBRID_DART_TIMEOUT, None, f"{y}년 재무제표 조회")
+        else:
+            statements[y] = None
+    if statements:
+        fin_context = build_financial_context(statements, CONTEXT_BUDGETS["hybrid_fin"], "hybrid 재무제표")
+    else:
+        fin_context = "재무제표 데이터를 찾을 수 없습니다."
+
+    acct_docs = _collect(acct_future, started, HYBRID_RETRIEVER_TIMEOUT, [], "회계 기준서 검색")
+    biz_docs = _collect(biz_future, started, HYBRID_RETRIEVER_TIMEOUT, [], "사업보고서 검색")
+
+    acct_context = pack_documents(acct_docs, CONTEXT_BUDGETS["hybrid_acct"], "hybrid 회계 기준서") if acct_docs else "관련 회계 기준서를 찾을 수 없습니다."
+    biz_context = pack_documents(biz_docs, CONTEXT_BUDGETS["hybrid_biz"], "hybrid 사업보고서") if biz_docs else "관련 사업보고서를 찾을 수 없습니다."
+
+    print(f"⏱️ hybrid 근거 수집 완료: {time.monotonic() - started:.2f}초")
+    return {
         "question": question,
-        "resolved_corp_name": extracted["company"],
-    })
-
+        "acct": acct_context,
+        "biz": biz_context,
+        "fin": fin_context
+    }
 
-# 중급 재무제표 질문 답변하는 분기 함수
-def handle_financial2(question: str) -> str:
-    print("📥 financial 처리 시작")
 
-    # 추출
-    extracted_text = extract_chain.invoke({"question": question})
-    extracted = parse_extracted_text(extracted_text)
+# 초급 하이브리드 분기 함수
+def handle_hybrid1(question: str, route: QueryRoute | None = None, speculation=None) -> str:
+    print("📥 hybrid 처리 시작")
+    return hybrid_chain1.invoke(gather_hybrid_context(question, route, speculation))
 
-    corp_code = find_corporation_code(extracted["company"])
-    years = extracted.get("year_list", ["2024"])
 
-    # 재무제표 연도별 구조화
-    fin_blocks = []
-    for y in years:
-        rows = get_financial_state(corp_code, y, "11011", "CFS")
-        if rows:
-            fin_blocks.append(f"📅 {y}년 재무제표:\n" + "\n".join(rows))
+# 중급 하이브리드 분기 함수
+def handle_hybrid2(question: str, route: QueryRoute | None = None, speculation=None) -> str:
+    print("📥 hybrid 처리 시작")
+    return hybrid_chain2.invoke(gather_hybrid_context(question, route, speculation))
 
-    structured_financial = "\n\n".join(fin_blocks)
 
-    # 체인 실행
-    return financial_chain2.invoke({
-        "financial_data": structured_financial,
-        "question": question,
-        "resolved_corp_name": extracted["company"],
-    })
+# 고급 하이브리드 분기 함수
+def handle_hybrid3(question: str, route: QueryRoute | None = None, speculation=None) -> str:
+    print("📥 hybrid 처리 시작")
+    return hybrid_chain3.invoke(gather_hybrid_context(question, route, speculation))
 
 
-# 고급 재무제표 질문 답변하는 분기 함수
-def handle_financial3(question: str) -> str:
-    print("📥 financial 처리 시작")
+# 일반 질문 분기함수
+# 일반(else) 질문 고정 답변 (simple_prompt 가 항상 내놓던 문장이라 LLM 호출 없이 바로 반환)
+ELSE_REPLY = "해당 내용은 제가 알지 못하는 분야입니다."
 
-    # 추출
-    extracted_text = extract_chain.invoke({"question": question})
-    extracted = parse_extracted_text(extracted_text)
 
-    corp_code = find_corporation_code(extracted["company"])
-    years = extracted.get("year_list", ["2024"])
+def elief(question: str, route: QueryRoute | None = None, speculation=None) -> str:
+    print("일반 질문")
+    return ELSE_REPLY
 
-    # 재무제표 연도별 구조화
-    fin_blocks = []
-    for y in years:
-        rows = get_financial_state(corp_code, y, "11011", "CFS")
-        if rows:
-            fin_blocks.append(f"📅 {y}년 재무제표:\n" + "\n".join(rows))
 
-    structured_financial = "\n\n".join(fin_blocks)
+# 작업유형별 (체인 입력 생성 함수, 레벨별 체인) 매핑
+HANDLER_TABLE = {
+    "accounting": (build_accounting_inputs, {1: account_chain1, 2: account_chain2, 3: account_chain3}),
+    "business": (build_business_inputs, {1: business_chain1, 2: business_chain2, 3: business_chain3}),
+    "finance": (build_financial_inputs, {1: financial_chain1, 2: financial_chain2, 3: financial_chain3}),
+    "hybrid": (gather_hybrid_context, {1: hybrid_chain1, 2: hybrid_chain2, 3: hybrid_chain3}),
+}
 
-    # 체인 실행
-    return financial_chain3.invoke({
-        "financial_data": structured_financial,
-        "question": question,
-        "resolved_corp_name": extracted["company"],
-    })
 
+# 작업유형/레벨에 맞는 체인의 답변을 토큰 단위로 흘려보내는 함수 (handle_* 의 스트리밍 버전)
+def stream_handler(type_result: str, level: int, question: str, route: QueryRoute | None = None, speculation=None):
+    if type_result == "else":
+        print("일반 질문")
+        yield ELSE_REPLY
+        return
 
+    build_inputs, _ = HANDLER_TABLE[type_result]
+    print(f"📥 {type_result} 처리 시작 (stream)")
+    yield from stream_answer(type_result, level, build_inputs(question, route, speculation))
 
-# 초급 하이브리드 분기 함수
-def handle_hybrid1(question: str) -> str:
-    print("📥 hybrid 처리 시작")
 
-    # 고정 재무제표 수집 함수 (CFS + 사업보고서만)
-    def try_get_financial_strict(corp_code: str, year: str) -> str:
-        rows = get_financial_state(corp_code, year, "11011", "CFS")
-        if rows and "[API 오류]" not in rows[0]:
-            return f"📅 {year}년 (CFS, 사업보고서):\n" + "\n".join(rows)
-        return f"📅 {year}년 재무제표: 유효한 데이터를 찾을 수 없습니다."
+# 레벨별 답변 생성 단계 (근거 수집이 끝난 체인 입력으로 LLM 1회 호출)
+def generate_answer(type_result: str, level: int, inputs: dict) -> str:
+    _, chains = HANDLER_TABLE[type_result]
+    return chains[level].invoke(inputs)
 
-    # 1. 회사명 및 연도 추출
-    extracted_text = extract_chain.invoke({"question": question})
-    extracted = parse_extracted_text(extracted_text)
 
-    corp_code = find_corporation_code(extracted["company"])
-    years = extracted.get("year_list", ["2024"])
+def stream_answer(type_result: str, level: int, inputs: dict):
+    _, chains = HANDLER_TABLE[type_result]
+    yield from chains[level].stream(inputs)
 
-    # 2. 재무제표 수집
-    financials = [try_get_financial_strict(corp_code, y) for y in years]
 
-    # 3. 회계 기준서 검색
-    acct_docs = accounting_retriever.invoke(question)
-    acct_context = "\n\n".join(doc.page_content for doc in acct_docs) if acct_docs else "관련 회계 기준서를 찾을 수 없습니다."
 
-    # 4. 사업보고서 검색
-    biz_docs = business_retriever.invoke(question)
-    biz_context = "\n\n".join(doc.page_content for doc in biz_docs) if biz_docs else "관련 사업보고서를 찾을 수 없습니다."
+# ---------------------------------------------------------------------------
+# async 버전: 하나의 이벤트 루프에서 여러 질문을 동시에 처리할 때 사용 (FastAPI, 일괄 처리 등)
+# 체인/retriever 는 ainvoke, DART 는 aiohttp 로 호출해서 스레드를 점유하지 않음
+# 동기 함수(handle_*, build_*_inputs)는 Streamlit 에서 그대로 사용
+# ---------------------------------------------------------------------------
 
-    # 5. Hybrid 체인 실행
-    return hybrid_chain1.invoke({
-        "question": question,
-        "acct": acct_context,
-        "biz": biz_context,
-        "fin": "\n\n".join(financials)
-    })
+# 답변에 사용한 근거 목록 (일괄 처리 결과 기록용, 체인 프롬프트에서는 사용하지 않음)
+def _doc_sources(docs) -> list[dict]:
+    return [dict(doc.metadata) for doc in docs]
 
 
-# 중급 하이브리드 분기 함수
-def handle_hybrid2(question: str) -> str:
-    print("📥 hybrid 처리 시작")
+def _dart_sources(corp_code: str | None, years: list[str]) -> list[dict]:
+    return [{"source": "DART fnlttSinglAcntAll", "corp_code": corp_code, "year": y} for y in years]
 
-    # 고정 재무제표 수집 함수 (CFS + 사업보고서만)
-    def try_get_financial_strict(corp_code: str, year: str) -> str:
-        rows = get_financial_state(corp_code, year, "11011", "CFS")
-        if rows and "[API 오류]" not in rows[0]:
-            return f"📅 {year}년 (CFS, 사업보고서):\n" + "\n".join(rows)
-        return f"📅 {year}년 재무제표: 유효한 데이터를 찾을 수 없습니다."
 
-    # 1. 회사명 및 연도 추출
-    extracted_text = extract_chain.invoke({"question": question})
-    extracted = parse_extracted_text(extracted_text)
+async def _await_or(coro, timeout: float, fallback, label: str):
+    try:
+        return await asyncio.wait_for(coro, timeout)
+    except asyncio.TimeoutError:
+        print(f"⏱️ {label} 시간 초과({timeout:.0f}초) - 나머지 결과로 진행")
+    except Exception as e:
+        print(f"⚠️ {label} 실패: {e} - 나머지 결과로 진행")
+    return fallback
 
-    corp_code = find_corporation_code(extracted["company"])
-    years = extracted.get("year_list", ["2024"])
 
-    # 2. 재무제표 수집
-    financials = [try_get_financial_strict(corp_code, y) for y in years]
+async def aresolve_company_years(question: str, route: QueryRoute | None = None) -> tuple[str | None, list[str]]:
+    if route is not None and route.company:
+        return route.company, route.year_list
+    extracted = parse_extracted_text(await extract_chain.ainvoke({"question": question}))
+    return extracted["company"], extracted.get("year_list") or list(DEFAULT_YEARS)
 
-    # 3. 회계 기준서 검색
-    acct_docs = accounting_retriever.invoke(question)
-    acct_context = "\n\n".join(doc.page_content for doc in acct_docs) if acct_docs else "관련 회계 기준서를 찾을 수 없습니다."
 
-    # 4. 사업보고서 검색
-    biz_docs = business_retriever.invoke(question)
-    biz_context = "\n\n".join(doc.page_content for doc in biz_docs) if biz_docs else "관련 사업보고서를 찾을 수 없습니다."
+async def abuild_accounting_inputs(question: str, route: QueryRoute | None = None) -> dict:
+    docs = await accounting_retriever.ainvoke(question)
+    context = pack_documents(docs, CONTEXT_BUDGETS["accounting"], "accounting")
+    return {"context": context, "question": question, "sources": _doc_sources(docs)}
 
-    # 5. Hybrid 체인 실행
-    return hybrid_chain2.invoke({
-        "question": question,
-        "acct": acct_context,
-        "biz": biz_context,
-        "fin": "\n\n".join(financials)
-    })
-
-# 고급 하이브리드 분기 함수
-def handle_hybrid3(question: str) -> str:
-    print("📥 hybrid 처리 시작")
 
-    # 고정 재무제표 수집 함수 (CFS + 사업보고서만)
-    def try_get_financial_strict(corp_code: str, year: str) -> str:
-        rows = get_financial_state(corp_code, year, "11011", "CFS")
-        if rows and "[API 오류]" not in rows[0]:
-            return f"📅 {year}년 (CFS, 사업보고서):\n" + "\n".join(rows)
-        return f"📅 {year}년 재무제표: 유효한 데이터를 찾을 수 없습니다."
+async def aretrieve_business_docs(question: str, route: QueryRoute | None = None) -> list:
+    # 회사명 정규화/규칙 추출은 기업명 인덱스를 쓰므로 스레드에서 실행
+    filters = await asyncio.to_thread(business_metadata_filters, question, route)
+    for metadata_filter in filters:
+        try:
+            docs = await afiltered_business_search(await pinecone_vectordb.aload(), question, metadata_filter)
+            if docs:
+                print(f"🔎 규칙 기반 필터 검색: {metadata_filter}")
+                return docs
+            print(f"🔎 필터 검색 결과 없음: {metadata_filter}")
+        except Exception as e:
+            print(f"⚠️ 규칙 기반 필터 검색 실패: {e}")
+    return await self_retriever.ainvoke(question)
 
-    # 1. 회사명 및 연도 추출
-    extracted_text = extract_chain.invoke({"question": question})
-    extracted = parse_extracted_text(extracted_text)
 
-    corp_code = find_corporation_code(extracted["company"])
-    years = extracted.get("year_list", ["2024"])
+async def abuild_business_inputs(question: str, route: QueryRoute | None = None) -> dict:
+    docs = await aretrieve_business_docs(question, route)
+    context = pack_documents(docs, CONTEXT_BUDGETS["business"], "business")
+    return {"context": context, "question": question, "sources": _doc_sources(docs)}
 
-    # 2. 재무제표 수집
-    financials = [try_get_financial_strict(corp_code, y) for y in years]
 
-    # 3. 회계 기준서 검색
-    acct_docs = accounting_retriever.invoke(question)
-    acct_context = "\n\n".join(doc.page_content for doc in acct_docs) if acct_docs else "관련 회계 기준서를 찾을 수 없습니다."
+# 연도별 재무제표를 동시에 조회
+async def abuild_financial_inputs(question: str, route: QueryRoute | None = None) -> dict:
+    company, years = await aresolve_company_years(question, route)
+    corp_code = await asyncio.to_thread(find_corporation_code, company or "")
 
-    # 4. 사업보고서 검색
-    biz_docs = business_retriever.invoke(question)
-    biz_context = "\n\n".join(doc.page_content for doc in biz_docs) if biz_docs else "관련 사업보고서를 찾을 수 없습니다."
+    results = await asyncio.gather(
+        *(aget_financial_statement(corp_code, y, "11011", "CFS") for y in years)
+    )
+    structured_financial = build_financial_context(dict(zip(years, results)), CONTEXT_BUDGETS["financial"])
 
-    # 5. Hybrid 체인 실행
-    return hybrid_chain3.invoke({
+    return {
+        "financial_data": structured_financial,
+        "question": question,
+        "resolved_corp_name": company,
+        "sources": _dart_sources(corp_code, years),
+    }
+
+
+# gather_hybrid_context 의 async 버전 (시간 초과/부분 실패 처리는 동기 버전과 같음)
+async def agather_hybrid_context(question: str, route: QueryRoute | None = None) -> dict:
+    started = time.monotonic()
+    acct_task = asyncio.create_task(_await_or(accounting_retriever.ainvoke(question),
+                                              HYBRID_RETRIEVER_TIMEOUT, [], "회계 기준서 검색"))
+    biz_task = asyncio.create_task(_await_or(business_retriever.ainvoke(question),
+                                             HYBRID_RETRIEVER_TIMEOUT, [], "사업보고서 검색"))
+    if route is not None and route.company:
+        extracted = {"company": route.company, "year_list": route.year_list}
+    else:
+        extracted_text = await _await_or(extract_chain.ainvoke({"question": question}),
+                                         HYBRID_EXTRACT_TIMEOUT, None, "회사/연도 추출")
+        extracted = parse_extracted_text(extracted_text) if extracted_text is not None else None
+
+    statements = {}
+    sources = []
+    if extracted is not None:
+        corp_code = (await asyncio.to_thread(find_corporation_code, extracted["company"])
+                     if extracted["company"] else None)
+        years = extracted.get("year_list") or list(DEFAULT_YEARS)
+        if corp_code and not corp_code.startswith("[ERROR]"):
+            sources = _dart_sources(corp_code, years)
+            results = await asyncio.gather(*(
+                _await_or(aget_financial_statement(corp_code, y, "11011", "CFS"),
+                          HYBRID_DART_TIMEOUT, None, f"{y}년 재무제표 조회")
+                for y in years
+            ))
+            statements = dict(zip(years, results))
+        else:
+            statements = {y: None for y in years}
+    if statements:
+        fin_context = build_financial_context(statements, CONTEXT_BUDGETS["hybrid_fin"], "hybrid 재무제표")
+    else:
+        fin_context = "재무제표 데이터를 찾을 수 없습니다."
+
+    acct_docs, biz_docs = await asyncio.gather(acct_task, biz_task)
+    acct_context = pack_documents(acct_docs, CONTEXT_BUDGETS["hybrid_acct"], "hybrid 회계 기준서") if acct_docs else "관련 회계 기준서를 찾을 수 없습니다."
+    biz_context = pack_documents(biz_docs, CONTEXT_BUDGETS["hybrid_biz"], "hybrid 사업보고서") if biz_docs else "관련 사업보고서를 찾을 수 없습니다."
+
+    print(f"⏱️ hybrid 근거 수집 완료: {time.monotonic() - started:.2f}초")
+    return {
         "question": question,
         "acct": acct_context,
         "biz": biz_context,
-        "fin": "\n\n".join(financials)
-    })
+        "fin": fin_context,
+        "sources": _doc_sources(acct_docs) + _doc_sources(biz_docs) + sources,
+    }
 
 
-# 일반 질문 분기함수
-def elief(question: str) -> str:
-    print("일반 질문")
-    return simple_chain.invoke({"question":{question}})
\ No newline at end of file
+# 작업유형별 async 체인 입력 생성 함수 (레벨별 체인은 HANDLER_TABLE 과 공유)
+ABUILD_TABLE = {
+    "accounting": abuild_accounting_inputs,
+    "business": abuild_business_inputs,
+    "finance": abuild_financial_inputs,
+    "hybrid": agather_hybrid_context,
+}
+
+
+async def agenerate_answer(type_result: str, level: int, inputs: dict) -> str:
+    _, chains = HANDLER_TABLE[type_result]
+    return await chains[level].ainvoke(inputs)
+
+
+async def astream_answer(type_result: str, level: int, inputs: dict):
+    _, chains = HANDLER_TABLE[type_result]
+    async for chunk in chains[level].astream(inputs):
+        yield chunk
+
+
+# handle_* 의 async 버전 (작업유형/레벨을 인자로 받음)
+async def ahandle(type_result: str, level: int, question: str, route: QueryRoute | None = None) -> str:
+    if type_result == "else":
+        return elief(question, route)
+    print(f"📥 {type_result} 처리 시작 (async)")
+    inputs = await ABUILD_TABLE[type_result](question, route)
+    return await agenerate_answer(type_result, level, inputs)
@@ -0,0 +1,143 @@
+import json
+import os
+import re
+import threading
+import time
+
+import joblib
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import make_pipeline
+
+from .chain_setting import classification_prompt
+
+
+# classification_chain(gpt-4o) 호출 없이 질문 유형을 분류하는 로컬 분류기
+# - 음절 n-gram TF-IDF + 로지스틱 회귀
+# - 학습 데이터: 분류 프롬프트에 들어 있는 예시 + 아래 추가 예시 + LLM 이 분류한 질문 로그
+# - 확신도가 INTENT_CONFIDENCE 미만이면 호출하는 쪽이 LLM 분류로 넘어가고, 그 결과를 로그에 쌓아 다음 학습에 사용
+
+INTENT_TYPES = ("accounting", "finance", "business", "hybrid", "else")
+INTENT_CONFIDENCE = float(os.getenv("INTENT_CONFIDENCE", "0.6"))
+
+_BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+INTENT_LOG_PATH = os.getenv("INTENT_LOG_PATH", os.path.join(_BASE_DIR, "intent_log.jsonl"))
+INTENT_MODEL_PATH = os.getenv("INTENT_MODEL_PATH", os.path.join(_BASE_DIR, "intent_model.joblib"))
+
+_PROMPT_EXAMPLE_RE = re.compile(r"질문:\s*(.+?)\s*\n작업유형:\s*(\w+)")
+
+# 프롬프트 예시만으로는 부족한 유형을 보강하는 예시
+EXTRA_EXAMPLES = [
+    ("감가상각은 어떻게 계산해?", "accounting"),
+    ("리스 회계처리 방법 알려줘", "accounting"),
+    ("충당부채 인식 요건이 뭐야?", "accounting"),
+    ("수익 인식 5단계 설명해줘", "accounting"),
+    ("영업권 손상검사는 어떻게 해?", "accounting"),
+    ("금융자산 분류 기준이 궁금해", "accounting"),
+    ("현대자동차 2023년 영업이익 알려줘", "finance"),
+    ("SK하이닉스 부채비율이 얼마야?", "finance"),
+    ("삼성전자 2022년과 2023년 매출액 비교해줘", "finance"),
+    ("네이버 2024년 당기순이익은?", "finance"),
+    ("LG전자 유동비율 계산해줘", "finance"),
+    ("셀트리온의 사업 구조를 설명해줘", "business"),
+    ("현대자동차 주요 제품과 시장은 뭐야?", "business"),
+    ("카카오의 경영 전략이 뭐야?", "business"),
+    ("포스코홀딩스 사업보고서에 나온 위험 요인 알려줘", "business"),
+    ("삼성전자 투자 가치가 있을까?", "hybrid"),
+    ("SK하이닉스 실적과 사업을 종합해서 분석해줘", "hybrid"),
+    ("LG화학 앞으로 성장 가능성은 어때?", "hybrid"),
+    ("안녕", "else"),
+    ("고마워", "else"),
+    ("주말에 어디 놀러 갈까?", "else"),
+    ("너는 누구야?", "else"),
+    ("파이썬 공부는 어떻게 해?", "else"),
+]
+
+
+def prompt_examples() -> list[tuple[str, str]]:
+    return [(q, t) for q, t in _PROMPT_EXAMPLE_RE.findall(classification_prompt.template)
+            if t in INTENT_TYPES and "{" not in q]
+
+
+def logged_examples(path: str = INTENT_LOG_PATH) -> list[tuple[str, str]]:
+    if not os.path.exists(path):
+        return []
+    examples = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get("type") in INTENT_TYPES and record.get("question"):
+                examples.append((record["question"], record["type"]))
+    return examples
+
+
+_log_lock = threading.Lock()
+
+
+# LLM 이 분류한 질문을 로그에 추가 (다음 학습 때 사용)
+def log_labeled_question(question: str, type_result: str, path: str = INTENT_LOG_PATH) -> None:
+    if type_result not in INTENT_TYPES:
+        return
+    record = {"question": question, "type": type_result, "logged_at": time.time()}
+    with _log_lock, open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+class IntentClassifier:
+    """질문 -> (작업유형, 확신도) 로컬 분류기"""
+
+    def __init__(self, pipeline=None):
+        self.pipeline = pipeline
+
+    @classmethod
+    def train(cls, examples: list[tuple[str, str]]) -> "IntentClassifier":
+        questions, labels = zip(*examples)
+        pipeline = make_pipeline(
+            TfidfVectorizer(analyzer="char_wb", ngram_range=(1, 3), sublinear_tf=True),
+            LogisticRegression(C=10.0, max_iter=1000, class_weight="balanced"),
+        )
+        pipeline.fit(questions, labels)
+        return cls(pipeline)
+
+    def predict(self, question: str) -> tuple[str, float]:
+        proba = self.pipeline.predict_proba([question])[0]
+        best = proba.argmax()
+        return str(self.pipeline.classes_[best]), float(proba[best])
+
+    def save(self, path: str = INTENT_MODEL_PATH) -> None:
+        joblib.dump(self.pipeline, path)
+
+    @classmethod
+    def load(cls, path: str = INTENT_MODEL_PATH) -> "IntentClassifier":
+        return cls(joblib.load(path))
+
+
+# 저장된 모델이 질문 로그보다 최신이면 그대로 로딩, 아니면 다시 학습해서 저장
+def load_intent_classifier() -> IntentClassifier:
+    log_mtime = os.path.getmtime(INTENT_LOG_PATH) if os.path.exists(INTENT_LOG_PATH) else 0
+    if os.path.exists(INTENT_MODEL_PATH) and os.path.getmtime(INTENT_MODEL_PATH) >= log_mtime:
+        try:
+            return IntentClassifier.load()
+        except Exception as e:
+            print(f"⚠️ 질문 분류 모델 로딩 실패, 다시 학습합니다: {e}")
+
+    examples = prompt_examples() + EXTRA_EXAMPLES + logged_examples()
+    classifier = IntentClassifier.train(examples)
+    try:
+        classifier.save()
+    except OSError as e:
+        print(f"⚠️ 질문 분류 모델 저장 실패: {e}")
+    print(f"🧭 질문 분류 모델 학습 완료 (예시 {len(examples)}개)")
+    return classifier
+
+
+if __name__ == "__main__":
+    # 질문 로그까지 포함해 다시 학습 (python -m utils1.intent_classifier)
+    if os.path.exists(INTENT_MODEL_PATH):
+        os.remove(INTENT_MODEL_PATH)
+    clf = load_intent_classifier()
+    for q in ("재고자산 평가방법 알려줘", "삼성전자 2023년 매출액", "오늘 점심 뭐 먹지?"):
+        print(q, "->", clf.predict(q))
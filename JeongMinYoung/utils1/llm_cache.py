@@ -0,0 +1,149 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+
+
+# temperature=0 체인의 LLM 응답을 (프롬프트, 모델 설정) 해시로 저장해서 재사용하는 캐시 (SQLite)
+# - 같은 프롬프트면 LLM 을 다시 호출하지 않음 (예: 레벨만 바꿔서 같은 질문 재분류, 후속 질문의 extract_chain)
+# - LLM_CACHE_MAX_ENTRIES 를 넘으면 가장 오래 안 쓴 항목부터 삭제
+# - 체인별 사용 여부: LLM_CACHE_<체인 이름 대문자>=0 (예: LLM_CACHE_HYBRID_CHAIN3=0), 전체 끄기: LLM_CACHE=0
+# - LangChain 캐시는 invoke 경로에만 적용되고, stream() 으로 받는 답변은 캐시하지 않음
+
+DEFAULT_CACHE_PATH = os.getenv(
+    "LLM_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "llm_cache.sqlite3")
+)
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "20000"))
+
+_stores = {}
+_stores_lock = threading.Lock()
+_instances = []
+
+
+def prompt_hash(prompt: str, llm_string: str) -> str:
+    return hashlib.sha256(f"{llm_string}\x00{prompt}".encode("utf-8")).hexdigest()
+
+
+class LLMResponseStore:
+    """프롬프트 해시 -> 직렬화된 응답(Generation 목록) 저장소"""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_entries: int = LLM_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_responses ("
+            " key TEXT PRIMARY KEY,"
+            " namespace TEXT NOT NULL,"
+            " response TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_used_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            row = self._conn.execute("SELECT response FROM llm_responses WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._conn.execute("UPDATE llm_responses SET last_used_at = ? WHERE key = ?", (time.time(), key))
+                self._conn.commit()
+        return row[0] if row else None
+
+    def put(self, key: str, namespace: str, response: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_responses VALUES (?, ?, ?, ?, ?)",
+                (key, namespace, response, now, now)
+            )
+            # 매번 개수를 세지 않고 100번 저장마다 크기 제한 적용
+            self._writes += 1
+            if self._writes % 100 == 1:
+                self._conn.execute(
+                    "DELETE FROM llm_responses WHERE key IN ("
+                    " SELECT key FROM llm_responses ORDER BY last_used_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+            self._conn.commit()
+
+    def clear(self, namespace: str | None = None) -> None:
+        with self._lock:
+            if namespace:
+                self._conn.execute("DELETE FROM llm_responses WHERE namespace = ?", (namespace,))
+            else:
+                self._conn.execute("DELETE FROM llm_responses")
+            self._conn.commit()
+
+
+def get_store(path: str = DEFAULT_CACHE_PATH) -> LLMResponseStore:
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = LLMResponseStore(path)
+        return _stores[path]
+
+
+class LLMResponseCache(BaseCache):
+    """체인 하나(namespace)에 붙이는 LangChain 캐시, 저장소는 공유하고 적중률은 체인별로 집계"""
+
+    def __init__(self, namespace: str, store: LLMResponseStore | None = None):
+        self.namespace = namespace
+        self.store = store or get_store()
+        self.hits = 0
+        self.misses = 0
+        _instances.append(self)
+
+    def lookup(self, prompt: str, llm_string: str):
+        response = self.store.get(prompt_hash(prompt, llm_string))
+        if response is None:
+            self.misses += 1
+            return None
+        try:
+            generations = [loads(g) for g in json.loads(response)]
+        except Exception:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return generations
+
+    def update(self, prompt: str, llm_string: str, return_val) -> None:
+        response = json.dumps([dumps(g) for g in return_val], ensure_ascii=False)
+        self.store.put(prompt_hash(prompt, llm_string), self.namespace, response)
+
+    def clear(self, **kwargs) -> None:
+        self.store.clear(self.namespace)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "chain": self.namespace,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+def is_cache_enabled(namespace: str) -> bool:
+    if os.getenv("LLM_CACHE", "1") == "0":
+        return False
+    return os.getenv(f"LLM_CACHE_{namespace.upper()}", "1") != "0"
+
+
+# 체인별 LLM: 캐시를 켠 체인은 응답 캐시가 붙은 복사본, 끈 체인은 원래 객체를 그대로 사용
+def with_llm_cache(llm, namespace: str):
+    if not is_cache_enabled(namespace):
+        return llm
+    return llm.model_copy(update={"cache": LLMResponseCache(namespace)})
+
+
+# 프로세스 안의 모든 체인별 캐시 적중률
+def all_cache_stats() -> list[dict]:
+    return [cache.stats() for cache in _instances]
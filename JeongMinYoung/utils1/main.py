@@ -1,82 +1,462 @@
-from .handle_node import (handle_accounting1, handle_accounting2, handle_accounting3,
-                          handle_business1, handle_business2, handle_business3,
-                          handle_financial1, handle_financial2, handle_financial3,
-                          handle_hybrid1, handle_hybrid2, handle_hybrid3, elief)
-from .chain_setting import create_chain
+from .handle_node import (elief, HANDLER_TABLE, generate_answer, stream_answer,
+                          SpeculativeRetrieval, SPECULATIVE_RETRIEVAL,
+                          ABUILD_TABLE, agenerate_answer, astream_answer)
+from .registry import LazyResource
+from .intent_classifier import INTENT_CONFIDENCE, INTENT_TYPES, log_labeled_question
+from .query_router import QueryRoute, route_from_rules
+from .normalize_code_search import find_corporation_code
+from .dart_cache import statement_cache
+from .evidence_cache import evidence_cache
+import asyncio
 import os
+import time
+import weakref
 
-simple_chain, classification_chain, extract_chain,hybrid_chain1, hybrid_chain2, hybrid_chain3,account_chain1, account_chain2, account_chain3,business_chain1, business_chain2, business_chain3, financial_chain1, financial_chain2, financial_chain3 = create_chain()
+classification_chain = LazyResource("classification_chain")
+router_chain = LazyResource("router_chain")
+intent_classifier = LazyResource("intent_classifier")
 
-# 초급 전체 분기 실행 함수
-def run_flexible_rag1(question: str) -> str:
-    type_output = classification_chain.invoke({"question": question}).strip().lower()
+# 회사/연도가 있어야 답할 수 있는 작업유형
+ENTITY_TYPES = {"finance", "hybrid"}
 
-    # '작업유형:' 파싱
-    type_result = None
-    if "작업유형:" in type_output:
-        type_result = type_output.split("작업유형:")[-1].strip()
-    else:
-        type_result = type_output  # 혹시 몰라 fallback
+# ANSWER_CACHE=0 이면 답변 캐시를 사용하지 않음
+answer_cache = LazyResource("answer_cache")
+USE_ANSWER_CACHE = os.getenv("ANSWER_CACHE", "1") != "0"
 
-    if type_result == "accounting":
-        return handle_accounting1(question)
-    elif type_result == "hybrid":
-        return handle_hybrid1(question)
-    elif type_result == "finance":
-        return handle_financial1(question)
-    elif type_result == "business":
-        return handle_business1(question)
-    elif type_result == "else":
-        return elief(question)
-    else:
-        return f"❗질문의 유형을 정확히 분류할 수 없습니다.\n(모델 응답: {type_output})"
+
+def _route_corp_code(route: QueryRoute) -> str | None:
+    if not route.company:
+        return None
+    corp_code = find_corporation_code(route.company)
+    return None if corp_code.startswith("[ERROR]") else corp_code
+
+
+# 같은 레벨/작업유형/기업코드/연도에서 의미가 비슷한 질문의 답변이 있으면 반환 (else 질문은 캐시하지 않음)
+# 회사가 나왔는데 기업코드를 찾지 못한 질문은 다른 회사 질문과 섞이지 않도록 캐시하지 않음
+def cached_answer(level: int, question: str, route: QueryRoute) -> str | None:
+    if not USE_ANSWER_CACHE or route.task_type not in HANDLER_TABLE:
+        return None
+    try:
+        corp_code = _route_corp_code(route)
+        if route.company and corp_code is None:
+            return None
+        return answer_cache.lookup(level, question, route.task_type, corp_code, route.years)
+    except Exception as e:
+        print(f"⚠️ 답변 캐시 조회 실패: {e}")
+        return None
+
+
+def remember_answer(level: int, question: str, route: QueryRoute, answer: str) -> None:
+    if not USE_ANSWER_CACHE or route.task_type not in HANDLER_TABLE or not answer or answer.startswith("❗"):
+        return
+    try:
+        corp_code = _route_corp_code(route)
+        if route.company and corp_code is None:
+            return
+        answer_cache.store(level, question, answer, route.task_type, corp_code, route.years)
+    except Exception as e:
+        print(f"⚠️ 답변 캐시 저장 실패: {e}")
+
+
+# DART 재무제표 저장소에서 회사 데이터가 삭제되면 해당 회사의 답변과 저장된 근거도 함께 삭제
+def _on_statements_invalidated(corp_code: str | None, bsns_year: str | None) -> None:
+    if evidence_cache is not None:
+        evidence_cache.invalidate()
+    if USE_ANSWER_CACHE:
+        if corp_code:
+            answer_cache.invalidate(corp_code=corp_code)
+        else:
+            answer_cache.invalidate()
+
+
+if statement_cache is not None:
+    statement_cache.add_invalidation_listener(_on_statements_invalidated)
+
+# INTENT_CLASSIFIER=0 이면 로컬 분류기를 쓰지 않고 항상 classification_chain 으로 분류
+USE_LOCAL_CLASSIFIER = os.getenv("INTENT_CLASSIFIER", "1") != "0"
+
+# 1단계(레벨 무관): 라우팅. 같은 세션에서 같은 질문의 근거가 있으면 (라우팅 결과, 체인 입력) 재사용
+# 반환: (route, 저장된 체인 입력 또는 None, speculation 또는 None)
+def lookup_evidence(question: str, session_id: str | None = None) -> tuple:
+    entry = evidence_cache.get(session_id, question) if evidence_cache is not None else None
+    if entry is not None:
+        route, inputs = entry
+        print(f"♻️ 저장된 근거 재사용 (유형: {route.task_type})")
+        return route, inputs, None
+
+    route, speculation = route_with_speculation(question)
+    if evidence_cache is not None:
+        evidence_cache.put(session_id, question, route, None)
+    return route, None, speculation
+
+
+# 2단계(레벨 무관): 근거 수집(검색, DART 조회) 후 체인 입력 저장
+def collect_evidence(question: str, route: QueryRoute, speculation=None, session_id: str | None = None) -> dict:
+    build_inputs, _ = HANDLER_TABLE[route.task_type]
+    print(f"📥 {route.task_type} 근거 수집 시작")
+    inputs = build_inputs(question, route, speculation)
+    if evidence_cache is not None:
+        evidence_cache.put(session_id, question, route, inputs)
+    return inputs
+
+
+# 레벨별 전체 분기 실행 함수
+# 근거 수집 결과는 session_id 단위로 저장되므로, 같은 질문을 다른 레벨로 다시 물으면 답변 생성(LLM 1회)만 수행
+def run_flexible_rag(question: str, level: int = 1, session_id: str | None = None) -> str:
+    route, inputs, speculation = lookup_evidence(question, session_id)
+    try:
+        cached = cached_answer(level, question, route)
+        if cached is not None:
+            return cached
+        type_result = route.task_type
+
+        if type_result == "else":
+            return elief(question, route)
+        if type_result not in HANDLER_TABLE:
+            return f"❗질문의 유형을 정확히 분류할 수 없습니다.\n(모델 응답: {type_result})"
+        if inputs is None:
+            inputs = collect_evidence(question, route, speculation, session_id)
+    finally:
+        if speculation is not None:
+            speculation.close()
+
+    answer = generate_answer(type_result, level, inputs)
+    remember_answer(level, question, route, answer)
+    return answer
+
+
+# 초급 전체 분기 실행 함수
+def run_flexible_rag1(question: str, session_id: str | None = None) -> str:
+    return run_flexible_rag(question, 1, session_id)
 
 
 # 중급 전체 분기 실행 함수
-def run_flexible_rag2(question: str) -> str:
+def run_flexible_rag2(question: str, session_id: str | None = None) -> str:
+    return run_flexible_rag(question, 2, session_id)
+
+
+# 고급 전체 분기 실행 함수
+def run_flexible_rag3(question: str, session_id: str | None = None) -> str:
+    return run_flexible_rag(question, 3, session_id)
+
+
+# LLM 질문 유형 분류 ('작업유형:' 파싱 포함)
+def classify_question_llm(question: str) -> tuple[str, str]:
     type_output = classification_chain.invoke({"question": question}).strip().lower()
 
-    # '작업유형:' 파싱
-    type_result = None
     if "작업유형:" in type_output:
         type_result = type_output.split("작업유형:")[-1].strip()
     else:
         type_result = type_output  # 혹시 몰라 fallback
+    return type_result, type_output
+
+
+# 로컬 분류기 + 규칙 기반 추출로 라우팅 (LLM 호출 없음)
+# 확신도가 INTENT_CONFIDENCE 미만이거나, finance/hybrid 인데 규칙으로 회사를 못 찾으면 None
+def route_locally(question: str) -> QueryRoute | None:
+    if not USE_LOCAL_CLASSIFIER:
+        return None
+    try:
+        type_result, confidence = intent_classifier.predict(question)
+    except Exception as e:
+        print(f"⚠️ 로컬 분류 실패: {e} - LLM 분류 사용")
+        return None
+
+    if confidence < INTENT_CONFIDENCE:
+        print(f"🧭 로컬 분류 확신도 낮음: {type_result} ({confidence:.2f}) - LLM 분류 사용")
+        return None
+    route = route_from_rules(question, type_result)
+    if type_result in ENTITY_TYPES and not route.company:
+        print(f"🧭 로컬 분류: {type_result} ({confidence:.2f}) - 회사명 추출에 LLM 사용")
+        return None
+    print(f"🧭 로컬 분류: {type_result} ({confidence:.2f})")
+    return route
+
+
+# router_chain 한 번으로 분류와 추출을 같이 하고, 분류 결과는 로컬 분류기 학습용 로그에 저장
+def route_with_llm(question: str) -> QueryRoute:
+    try:
+        route = router_chain.invoke({"question": question})
+    except Exception as e:
+        # 구조화 출력이 실패하면 기존 분류 체인 + 규칙 기반 추출로 대체
+        print(f"⚠️ 라우터 호출 실패: {e} - 분류 체인 사용")
+        type_result, _ = classify_question_llm(question)
+        route = route_from_rules(question, type_result if type_result in INTENT_TYPES else "else")
+    print(f"🧭 LLM 라우팅: {route.task_type} (회사: {route.companies}, 연도: {route.years}, 주제: {route.topics})")
+
+    try:
+        log_labeled_question(question, route.task_type)
+    except OSError as e:
+        print(f"⚠️ 질문 분류 로그 저장 실패: {e}")
+    return route
+
+
+# 질문 라우팅 함수 (작업유형 + 회사/연도/주제), 로컬 라우팅이 안 되면 LLM 사용
+def route_question(question: str) -> QueryRoute:
+    return route_locally(question) or route_with_llm(question)
+
+
+# LLM 라우팅이 필요한 경우에만, LLM 응답을 기다리는 동안 검색/DART 조회를 미리 시작
+# 반환된 speculation 은 답변이 끝나면 close() 해서 쓰지 않은 작업을 정리해야 함
+def route_with_speculation(question: str) -> tuple[QueryRoute, SpeculativeRetrieval | None]:
+    route = route_locally(question)
+    if route is not None:
+        return route, None
+
+    speculation = None
+    if SPECULATIVE_RETRIEVAL:
+        try:
+            speculation = SpeculativeRetrieval(question)
+        except Exception as e:
+            print(f"⚠️ 미리 검색 시작 실패: {e}")
+    return route_with_llm(question), speculation
+
+
+# 질문 유형 분류 함수 (작업유형, 표시용 문자열)
+def classify_question(question: str) -> tuple[str, str]:
+    route = route_question(question)
+    return route.task_type, f"작업유형: {route.task_type}"
+
+
+# 레벨별 스트리밍 분기 실행 함수
+# metrics 딕셔너리를 넘기면 유형, 첫 토큰까지 걸린 시간(time_to_first_token), 전체 시간(total_time)을 채워줌
+def stream_flexible_rag(question: str, level: int = 1, metrics: dict | None = None, session_id: str | None = None):
+    started = time.perf_counter()
+    metrics = metrics if metrics is not None else {}
+
+    route, inputs, speculation = lookup_evidence(question, session_id)
+    type_result = route.task_type
+    metrics["type"] = type_result
+    metrics["classified_at"] = time.perf_counter() - started
+    metrics["evidence_reused"] = inputs is not None
+
+    def answer_chunks():
+        if type_result == "else":
+            yield elief(question, route)
+            return
+        evidence = inputs if inputs is not None else collect_evidence(question, route, speculation, session_id)
+        metrics["evidence_at"] = time.perf_counter() - started
+        yield from stream_answer(type_result, level, evidence)
 
-    if type_result == "accounting":
-        return handle_accounting2(question)
-    elif type_result == "hybrid":
-        return handle_hybrid2(question)
-    elif type_result == "finance":
-        return handle_financial2(question)
-    elif type_result == "business":
-        return handle_business2(question)
-    elif type_result == "else":
-        return elief(question)
+    cached = cached_answer(level, question, route)
+    metrics["cache_hit"] = cached is not None
+    if cached is not None:
+        chunks = iter([cached])
+    elif type_result in HANDLER_TABLE or type_result == "else":
+        chunks = answer_chunks()
     else:
-        return f"❗질문의 유형을 정확히 분류할 수 없습니다.\n(모델 응답: {type_output})"
+        chunks = iter([f"❗질문의 유형을 정확히 분류할 수 없습니다.\n(모델 응답: {type_result})"])
 
+    parts = []
+    try:
+        for chunk in chunks:
+            if not chunk:
+                continue
+            if "time_to_first_token" not in metrics:
+                metrics["time_to_first_token"] = time.perf_counter() - started
+                print(f"⏱️ 첫 토큰까지 {metrics['time_to_first_token']:.2f}초 (유형: {type_result})")
+            parts.append(chunk)
+            yield chunk
+    finally:
+        if speculation is not None:
+            speculation.close()
+
+    # 끝까지 스트리밍된 답변만 캐시에 저장
+    if cached is None:
+        remember_answer(level, question, route, "".join(parts))
+    metrics["total_time"] = time.perf_counter() - started
+
+
+# 초급 스트리밍 분기 실행 함수
+def stream_flexible_rag1(question: str, metrics: dict | None = None, session_id: str | None = None):
+    return stream_flexible_rag(question, 1, metrics, session_id)
+
+
+# 중급 스트리밍 분기 실행 함수
+def stream_flexible_rag2(question: str, metrics: dict | None = None, session_id: str | None = None):
+    return stream_flexible_rag(question, 2, metrics, session_id)
+
+
+# 고급 스트리밍 분기 실행 함수
+def stream_flexible_rag3(question: str, metrics: dict | None = None, session_id: str | None = None):
+    return stream_flexible_rag(question, 3, metrics, session_id)
+
+
+# ---------------------------------------------------------------------------
+# async 진입점: 하나의 이벤트 루프에서 여러 질문을 동시에 처리 (FastAPI, 일괄 처리 등)
+# 동시에 처리하는 질문 수는 RAG_MAX_CONCURRENCY 로 제한 (LLM/DART 요청 한도 보호)
+# 블로킹 작업(리소스 첫 로딩, 로컬 분류, 기업코드 조회, 답변 캐시 임베딩)은 asyncio.to_thread 로 실행
+# Streamlit 은 위의 동기 함수(run_flexible_rag*, stream_flexible_rag*)를 그대로 사용
+# ---------------------------------------------------------------------------
+
+RAG_MAX_CONCURRENCY = int(os.getenv("RAG_MAX_CONCURRENCY", "8"))
+
+# 세마포어는 이벤트 루프마다 따로 만들어야 해서 루프별로 보관
+_semaphores = weakref.WeakKeyDictionary()
 
-# 고급 전체 분기 실행 함수
-def run_flexible_rag3(question: str) -> str:
-    type_output = classification_chain.invoke({"question": question}).strip().lower()
 
-    # '작업유형:' 파싱
-    type_result = None
+# 현재 이벤트 루프의 동시 처리 수 지정 (일괄 처리처럼 루프를 직접 만드는 경우, 다른 루프에는 영향 없음)
+def set_concurrency_limit(limit: int) -> None:
+    _semaphores[asyncio.get_running_loop()] = asyncio.Semaphore(limit)
+
+
+def _concurrency_limit() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _semaphores[loop] = asyncio.Semaphore(RAG_MAX_CONCURRENCY)
+    return semaphore
+
+
+async def aclassify_question_llm(question: str) -> tuple[str, str]:
+    type_output = (await classification_chain.ainvoke({"question": question})).strip().lower()
     if "작업유형:" in type_output:
         type_result = type_output.split("작업유형:")[-1].strip()
     else:
-        type_result = type_output  # 혹시 몰라 fallback
+        type_result = type_output
+    return type_result, type_output
 
-    if type_result == "accounting":
-        return handle_accounting3(question)
-    elif type_result == "hybrid":
-        return handle_hybrid3(question)
-    elif type_result == "finance":
-        return handle_financial3(question)
-    elif type_result == "business":
-        return handle_business3(question)
-    elif type_result == "else":
-        return elief(question)
-    else:
-        return f"❗질문의 유형을 정확히 분류할 수 없습니다.\n(모델 응답: {type_output})"
+
+async def aroute_with_llm(question: str) -> QueryRoute:
+    try:
+        route = await router_chain.ainvoke({"question": question})
+    except Exception as e:
+        print(f"⚠️ 라우터 호출 실패: {e} - 분류 체인 사용")
+        type_result, _ = await aclassify_question_llm(question)
+        route = await asyncio.to_thread(route_from_rules, question,
+                                        type_result if type_result in INTENT_TYPES else "else")
+    print(f"🧭 LLM 라우팅: {route.task_type} (회사: {route.companies}, 연도: {route.years}, 주제: {route.topics})")
+
+    try:
+        log_labeled_question(question, route.task_type)
+    except OSError as e:
+        print(f"⚠️ 질문 분류 로그 저장 실패: {e}")
+    return route
+
+
+# 로컬 분류기(첫 호출 때 학습/로딩)와 기업명 인덱스 조회는 스레드에서 실행
+async def aroute_question(question: str) -> QueryRoute:
+    return await asyncio.to_thread(route_locally, question) or await aroute_with_llm(question)
+
+
+# lookup_evidence 의 async 버전 (미리 검색은 사용하지 않음, 동시 처리로 대기 시간을 숨김)
+async def alookup_evidence(question: str, session_id: str | None = None) -> tuple:
+    entry = evidence_cache.get(session_id, question) if evidence_cache is not None else None
+    if entry is not None:
+        route, inputs = entry
+        print(f"♻️ 저장된 근거 재사용 (유형: {route.task_type})")
+        return route, inputs
+
+    route = await aroute_question(question)
+    if evidence_cache is not None:
+        evidence_cache.put(session_id, question, route, None)
+    return route, None
+
+
+async def acollect_evidence(question: str, route: QueryRoute, session_id: str | None = None) -> dict:
+    print(f"📥 {route.task_type} 근거 수집 시작 (async)")
+    inputs = await ABUILD_TABLE[route.task_type](question, route)
+    if evidence_cache is not None:
+        evidence_cache.put(session_id, question, route, inputs)
+    return inputs
+
+
+# 답변 캐시는 질문 임베딩 계산이 있어서 스레드에서 실행
+async def acached_answer(level: int, question: str, route: QueryRoute) -> str | None:
+    if not USE_ANSWER_CACHE or route.task_type not in HANDLER_TABLE:
+        return None
+    return await asyncio.to_thread(cached_answer, level, question, route)
+
+
+async def aremember_answer(level: int, question: str, route: QueryRoute, answer: str) -> None:
+    await asyncio.to_thread(remember_answer, level, question, route, answer)
+
+
+# run_flexible_rag 의 async 버전
+# trace 딕셔너리를 넘기면 유형, 단계별 시간(route/evidence/generate), 캐시 사용 여부, 근거 목록(sources)을 채워줌
+async def arun_flexible_rag(question: str, level: int = 1, session_id: str | None = None,
+                            trace: dict | None = None) -> str:
+    trace = trace if trace is not None else {}
+    async with _concurrency_limit():
+        started = time.perf_counter()
+        route, inputs = await alookup_evidence(question, session_id)
+        type_result = route.task_type
+        trace["type"] = type_result
+        trace["route_time"] = time.perf_counter() - started
+        trace["evidence_reused"] = inputs is not None
+
+        cached = await acached_answer(level, question, route)
+        trace["cache_hit"] = cached is not None
+        if cached is not None:
+            return cached
+
+        if type_result == "else":
+            return elief(question, route)
+        if type_result not in HANDLER_TABLE:
+            return f"❗질문의 유형을 정확히 분류할 수 없습니다.\n(모델 응답: {type_result})"
+        if inputs is None:
+            stage_started = time.perf_counter()
+            inputs = await acollect_evidence(question, route, session_id)
+            trace["evidence_time"] = time.perf_counter() - stage_started
+        trace["sources"] = inputs.get("sources", [])
+
+        stage_started = time.perf_counter()
+        answer = await agenerate_answer(type_result, level, inputs)
+        trace["generate_time"] = time.perf_counter() - stage_started
+        await aremember_answer(level, question, route, answer)
+        return answer
+
+
+async def arun_flexible_rag1(question: str, session_id: str | None = None) -> str:
+    return await arun_flexible_rag(question, 1, session_id)
+
+
+async def arun_flexible_rag2(question: str, session_id: str | None = None) -> str:
+    return await arun_flexible_rag(question, 2, session_id)
+
+
+async def arun_flexible_rag3(question: str, session_id: str | None = None) -> str:
+    return await arun_flexible_rag(question, 3, session_id)
+
+
+# stream_flexible_rag 의 async 버전 (metrics 항목도 같음)
+async def astream_flexible_rag(question: str, level: int = 1, metrics: dict | None = None,
+                               session_id: str | None = None):
+    started = time.perf_counter()
+    metrics = metrics if metrics is not None else {}
+
+    async with _concurrency_limit():
+        route, inputs = await alookup_evidence(question, session_id)
+        type_result = route.task_type
+        metrics["type"] = type_result
+        metrics["classified_at"] = time.perf_counter() - started
+        metrics["evidence_reused"] = inputs is not None
+
+        async def answer_chunks():
+            cached = await acached_answer(level, question, route)
+            metrics["cache_hit"] = cached is not None
+            if cached is not None:
+                yield cached
+            elif type_result == "else":
+                yield elief(question, route)
+            elif type_result in HANDLER_TABLE:
+                evidence = inputs if inputs is not None else await acollect_evidence(question, route, session_id)
+                metrics["evidence_at"] = time.perf_counter() - started
+                async for chunk in astream_answer(type_result, level, evidence):
+                    yield chunk
+            else:
+                yield f"❗질문의 유형을 정확히 분류할 수 없습니다.\n(모델 응답: {type_result})"
+
+        parts = []
+        async for chunk in answer_chunks():
+            if not chunk:
+                continue
+            if "time_to_first_token" not in metrics:
+                metrics["time_to_first_token"] = time.perf_counter() - started
+                print(f"⏱️ 첫 토큰까지 {metrics['time_to_first_token']:.2f}초 (유형: {type_result})")
+            parts.append(chunk)
+            yield chunk
+
+    if not metrics.get("cache_hit"):
+        await aremember_answer(level, question, route, "".join(parts))
+    metrics["total_time"] = time.perf_counter() - started
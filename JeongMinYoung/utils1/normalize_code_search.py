@@ -1,37 +1,145 @@
-from difflib import get_close_matches
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
 import re
 import os
 import json
+import threading
 
+from .corp_registry import get_corp_registry
+
+
+# 회사명 정규화 (한글명 / 영문명)
+def _normalize_kor(name: str) -> str:
+    return name.strip().lower().replace("(주)", "").replace("주식회사", "").replace(" ", "")
+
+
+def _normalize_eng(name: str) -> str:
+    return name.lower().replace("(주)", "").replace("co.,ltd.", "").replace(",", "").replace(" ", "")
 
-# 입력된 회사명을 corp_list에 있는 회사명 중 가장 유사한 회사명으로 정규화
-def normalize_company_name(user_input: str, corp_list: list[dict]) -> str:
-    # 입력 정규화
-    user_input_norm = user_input.strip().lower().replace("(주)", "").replace("주식회사", "").replace(" ", "")
 
-    # corp_name과 corp_eng_name 둘 다 비교 대상으로 만듦
-    all_names = []
-    mapping = {}
+# 한글 음절을 자모로 분해 (예: "삼성" -> "ㅅㅏㅁㅅㅓㅇ"), 오타/받침 차이에 강한 비교용
+_CHO = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_JUNG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+_JONG = " ㄱㄲㄳㄴㄵㄶㄷㄹㄺㄻㄼㄽㄾㄿㅀㅁㅂㅄㅅㅆㅇㅈㅊㅋㅌㅍㅎ"
 
-    for corp in corp_list:
-        kor = corp["corp_name"]
-        eng = corp["corp_eng_name"]
 
-        kor_norm = kor.lower().replace("(주)", "").replace("주식회사", "").replace(" ", "")
-        eng_norm = eng.lower().replace("(주)", "").replace("co.,ltd.", "").replace(",", "").replace(" ", "")
+def decompose_jamo(text: str) -> str:
+    out = []
+    for ch in text:
+        code = ord(ch) - 0xAC00
+        if 0 <= code < 11172:
+            out.append(_CHO[code // 588])
+            out.append(_JUNG[(code % 588) // 28])
+            if code % 28:
+                out.append(_JONG[code % 28])
+        else:
+            out.append(ch)
+    return "".join(out)
 
-        # 각 이름을 매핑 테이블에 저장
-        all_names.extend([kor_norm, eng_norm])
-        mapping[kor_norm] = kor
-        mapping[eng_norm] = kor  # 반환은 항상 kor 기준
 
-    # 유사한 이름 찾기
-    matches = get_close_matches(user_input_norm, all_names, n=1, cutoff=0.6)
-    if matches:
-        matched = matches[0]
-        return mapping[matched]
+def _grams(text: str) -> set[str]:
+    if len(text) < 2:
+        return {text} if text else set()
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+class CorpNameIndex:
+    """corp_list 를 한 번만 읽어 만든 회사명 검색 인덱스
+
+    - 정규화된 이름 -> 회사 해시맵 (정확 일치는 O(1))
+    - 음절 bigram 역색인으로 후보를 좁힌 뒤 자모 단위 유사도로 순위 결정
+    """
 
-    return None
+    def __init__(self, corp_list: list[dict]):
+        self.entries = []         # (정규화된 이름, 자모 분해 이름, corp_name, corp_code)
+        self.exact = {}
+        self.grams = defaultdict(list)
+        listed = {}               # exact 에 등록된 이름 -> 상장사 여부
+
+        for corp in corp_list:
+            kor = corp["corp_name"]
+            is_listed = bool((corp.get("stock_code") or "").strip())
+            for norm in (_normalize_kor(kor), _normalize_eng(corp.get("corp_eng_name") or "")):
+                if not norm:
+                    continue
+                entry_id = len(self.entries)
+                self.entries.append((norm, decompose_jamo(norm), kor, corp["corp_code"]))
+                # 반환은 항상 kor 기준, 같은 이름이면 상장사(종목코드 있는 회사) 우선, 그다음 먼저 나온 회사
+                if norm not in self.exact or (is_listed and not listed[norm]):
+                    self.exact[norm] = entry_id
+                    listed[norm] = is_listed
+                for g in _grams(norm):
+                    self.grams[g].append(entry_id)
+
+    # 유사한 회사 후보를 점수순으로 반환 [(corp_name, corp_code, score)]
+    def search(self, query: str, n: int = 5, cutoff: float = 0.6, max_candidates: int = 50) -> list[tuple]:
+        norm = _normalize_kor(query)
+        if not norm:
+            return []
+
+        if norm in self.exact:
+            _, _, kor, code = self.entries[self.exact[norm]]
+            return [(kor, code, 1.0)]
+
+        # 1단계: 공유 bigram 수로 후보 추리기
+        counts = Counter()
+        for g in _grams(norm):
+            counts.update(self.grams.get(g, ()))
+        candidates = [entry_id for entry_id, _ in counts.most_common(max_candidates)]
+
+        # 2단계: 자모 단위 유사도로 재정렬
+        query_jamo = decompose_jamo(norm)
+        scored = {}
+        for entry_id in candidates:
+            _, jamo, kor, code = self.entries[entry_id]
+            score = SequenceMatcher(None, query_jamo, jamo).ratio()
+            if score >= cutoff and score > scored.get(code, (None, 0.0))[1]:
+                scored[code] = (kor, score)
+
+        ranked = sorted(((kor, code, score) for code, (kor, score) in scored.items()),
+                        key=lambda x: x[2], reverse=True)
+        return ranked[:n]
+
+    def lookup(self, query: str) -> tuple | None:
+        results = self.search(query, n=1)
+        return results[0] if results else None
+
+
+def _corp_list_path() -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corp_list.json')
+
+
+_corp_index: CorpNameIndex | None = None
+_corp_index_version = -1
+_corp_index_lock = threading.Lock()
+
+
+# 공용 기업코드 레지스트리 기반 인덱스 (레지스트리 목록이 바뀌었을 때만 다시 생성)
+# 레지스트리가 비어 있으면(API 키 없음/오프라인) 노트북에서 만든 corp_list.json 사용
+# 처음 실행하는 환경에서는 corpCode.xml 다운로드가 필요하므로 registry.warm_up 에서 미리 로딩
+def get_corp_index() -> CorpNameIndex:
+    global _corp_index, _corp_index_version
+    registry = get_corp_registry()
+    records = registry.all()
+    if _corp_index is not None and _corp_index_version == registry.version:
+        return _corp_index
+
+    with _corp_index_lock:
+        if _corp_index is None or _corp_index_version != registry.version:
+            if records:
+                index = CorpNameIndex([r._asdict() for r in records])
+            else:
+                with open(_corp_list_path(), encoding='utf-8') as f:
+                    index = CorpNameIndex(json.load(f))
+            _corp_index, _corp_index_version = index, registry.version
+        return _corp_index
+
+
+# 입력된 회사명을 corp_list에 있는 회사명 중 가장 유사한 회사명으로 정규화
+def normalize_company_name(user_input: str, corp_list: list[dict] | None = None) -> str:
+    index = CorpNameIndex(corp_list) if corp_list is not None else get_corp_index()
+    match = index.lookup(user_input)
+    return match[0] if match else None
 
 
 # extract chain이 준 응답에서 회사명과 연도 추출하는 함수
@@ -40,8 +148,8 @@ def parse_extracted_text(text: str) -> dict:
     year_match = re.search(r"연도\s*:\s*(\d{4}(?:,\s*\d{4})*)", text)  # 여러 연도 대응 가능
 
     company = company_match.group(1).strip() if company_match else None
-    year_str = year_match.group(1) if year_match else "2024"
-    years = [y.strip() for y in year_str.split(",")]
+    # 연도가 없으면 빈 리스트 (기본 연도는 호출하는 쪽에서 query_router.DEFAULT_YEARS 로 채움)
+    years = [y.strip() for y in year_match.group(1).split(",")] if year_match else []
 
     return {
         "company": company,
@@ -57,23 +165,22 @@ def find_corporation_code(company_name: str) -> str:
     company_name = company_name.strip("'\"")
 
     try:
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        file_path = os.path.join(current_dir, 'corp_list.json')
-
-        with open(file_path, encoding='utf-8') as f:
-            corp_list = json.load(f)
-
+        index = get_corp_index()
     except Exception as e:
-        return f"[ERROR] corp_list.json 로드 실패: {str(e)}"
+        return f"[ERROR] 기업코드 목록 로드 실패: {str(e)}"
 
-    # Step 1: 정규화된 이름 찾기
-    normalized_name = normalize_company_name(company_name, corp_list)
-    if not normalized_name:
+    match = index.lookup(company_name)
+    if not match:
         return f"[ERROR] '{company_name}'에 유사한 기업명을 찾을 수 없습니다."
 
-    # Step 2: 기업 코드 반환
-    for corp in corp_list:
-        if corp["corp_name"] == normalized_name:
-            return corp["corp_code"]
+    return match[1]
+
+
+# 여러 회사명을 한 번에 기업코드로 변환 (실패한 이름은 [ERROR] 문자열)
+def find_corporation_codes(company_names: list[str]) -> dict[str, str]:
+    return {name: find_corporation_code(name) for name in dict.fromkeys(company_names)}
+
 
-    return f"[ERROR] '{normalized_name}'에 해당하는 기업 코드를 찾을 수 없습니다."
\ No newline at end of file
+# 유사 회사 후보 목록 (자동완성/확인 질문용)
+def search_companies(query: str, n: int = 5) -> list[tuple]:
+    return get_corp_index().search(query.strip("'\""), n=n)
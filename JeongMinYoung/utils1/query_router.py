@@ -0,0 +1,65 @@
+from typing import Literal
+
+from langchain_core.prompts import PromptTemplate
+from pydantic import BaseModel, Field
+
+from .query_rules import extract_rule_based
+
+
+# 질문 유형 분류(classification_chain) + 회사/연도 추출(extract_chain) 을 한 번의 LLM 호출로 처리하는 라우터
+# 결과는 정규식 파싱 없이 구조화 출력(QueryRoute)으로 받아서 handle_* 함수에 그대로 넘김
+
+TaskType = Literal["accounting", "finance", "business", "hybrid", "else"]
+
+# extract_prompt 와 같은 기본값 (질문에 연도가 없으면 2023, 2024)
+DEFAULT_YEARS = ["2023", "2024"]
+
+
+class QueryRoute(BaseModel):
+    """질문 라우팅 결과 (작업유형 + 질문에 나온 회사/연도/회계 주제)"""
+
+    task_type: TaskType = Field(description="질문의 주요 목적에 따른 작업 유형")
+    companies: list[str] = Field(default_factory=list, description="질문에 나온 회사명 (없으면 빈 리스트)")
+    years: list[str] = Field(default_factory=list, description="질문에 나온 연도 (4자리 숫자 문자열, 없으면 빈 리스트)")
+    topics: list[str] = Field(default_factory=list, description="질문에 나온 회계/재무 개념이나 계정 (예: 재고자산, 수익 인식)")
+
+    @property
+    def company(self) -> str | None:
+        return self.companies[0] if self.companies else None
+
+    @property
+    def year_list(self) -> list[str]:
+        return self.years or list(DEFAULT_YEARS)
+
+
+route_prompt = PromptTemplate.from_template("""
+다음 질문을 분석하여 작업 유형을 분류하고, 질문에 나온 회사명, 연도, 회계/재무 주제를 추출하세요.
+
+## 📋 작업 유형 분류 기준 (우선순위 순)
+- accounting: 회계 원리/기준/개념 설명이 주목적 (예: "재고자산 평가방법", "수익 인식 기준")
+- finance: 특정 기업의 구체적 재무 수치/비율/연도별 비교가 주목적 (예: "LG화학의 2024년 재무제표 수치를 알려줘")
+- business: 사업 현황/전략/시장 상황이 주목적 (예: "삼성전자는 2023년에 무슨 사업을 했어?")
+- hybrid: 재무 + 사업 + 회계를 종합한 분석/평가/전망이 주목적 (예: "카카오의 2023년 재무제표를 보고 앞으로의 전망을 알려줘")
+- else: 회계/재무/사업과 관련이 없는 질문 (예: "오늘 뭐 먹지?", "날씨 어때?")
+
+## 📝 추출 기준
+- companies: 질문에 나온 회사명을 그대로 (없으면 빈 리스트)
+- years: 질문에 나온 연도를 4자리 숫자로 (예: "23년" -> "2023", 없으면 빈 리스트)
+- topics: 질문에 나온 회계/재무 개념이나 계정명 (없으면 빈 리스트)
+
+질문: {question}
+""")
+
+
+def build_router_chain(llm):
+    return route_prompt | llm.with_structured_output(QueryRoute)
+
+
+# 로컬 분류 결과 + 규칙 기반 회사/연도 추출로 만든 라우팅 결과 (LLM 호출 없음)
+def route_from_rules(question: str, task_type: str) -> QueryRoute:
+    rules = extract_rule_based(question)
+    return QueryRoute(
+        task_type=task_type,
+        companies=[rules["company"]] if rules["company"] else [],
+        years=rules["year_list"],
+    )
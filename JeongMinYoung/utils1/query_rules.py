@@ -0,0 +1,83 @@
+import re
+from datetime import datetime
+from functools import lru_cache
+
+from .normalize_code_search import get_corp_index, _normalize_kor
+
+
+# LLM 없이 질문에서 회사명/연도를 뽑는 규칙 기반 추출기
+# 확실한 경우(정확히 일치하는 회사명, 명시된 연도)만 결과를 내고, 애매하면 None/빈 리스트를 돌려줘서
+# 호출하는 쪽이 LLM 추출로 넘어가도록 함
+
+_TOKEN_RE = re.compile(r"[가-힣A-Za-z0-9&]+")
+_YEAR4_RE = re.compile(r"(?<!\d)(20\d{2})(?!\d)")
+_YEAR2_RE = re.compile(r"(?<!\d)(\d{2})\s*년")
+_PARTICLES = ("에서는", "에서", "으로", "에게", "의", "은", "는", "이", "가", "을", "를", "에", "와", "과", "도", "로")
+
+# 회사명과 우연히 겹칠 수 있는 일반 단어
+_STOPWORDS = {
+    "회사", "기업", "사업", "매출", "매출액", "이익", "영업이익", "순이익", "재무", "재무제표", "재무상태",
+    "부채", "자산", "자본", "현금", "전망", "분석", "요약", "보고서", "사업보고서", "회계", "기준",
+    "올해", "작년", "내년", "연도", "비율", "성장", "투자", "주식", "배당",
+}
+
+
+def _strip_particle(token: str) -> str:
+    for p in _PARTICLES:
+        if token.endswith(p) and len(token) > len(p) + 1:
+            return token[:-len(p)]
+    return token
+
+
+# 질문에 명시된 연도 목록 (예: "2023년", "23년도" -> ["2023"])
+def extract_years(question: str) -> list[str]:
+    years = set(_YEAR4_RE.findall(question))
+    this_year = datetime.now().year
+    for yy in _YEAR2_RE.findall(question):
+        year = 2000 + int(yy)
+        if 2000 <= year <= this_year:
+            years.add(str(year))
+    return sorted(years)
+
+
+# 질문에 corp_list 의 회사명이 그대로 들어 있으면 (회사명, 기업코드) 반환
+def extract_company(question: str) -> tuple[str, str] | None:
+    try:
+        index = get_corp_index()
+    except Exception:
+        return None
+
+    tokens = _TOKEN_RE.findall(question)
+    candidates = []
+    for i, token in enumerate(tokens):
+        candidates.append(token)
+        candidates.append(_strip_particle(token))
+        if i + 1 < len(tokens):
+            # "삼성 전자" 처럼 띄어 쓴 회사명
+            candidates.append(token + _strip_particle(tokens[i + 1]))
+
+    for cand in candidates:
+        norm = _normalize_kor(cand)
+        if len(norm) < 2 or norm in _STOPWORDS:
+            continue
+        entry_id = index.exact.get(norm)
+        if entry_id is not None:
+            _, _, corp_name, corp_code = index.entries[entry_id]
+            return corp_name, corp_code
+    return None
+
+
+@lru_cache(maxsize=1024)
+def _extract_rule_based_cached(question: str) -> tuple:
+    company = extract_company(question)
+    return company, tuple(extract_years(question))
+
+
+# 회사/연도 규칙 추출 결과 (같은 질문은 캐시된 결과 재사용)
+def extract_rule_based(question: str) -> dict:
+    company, years = _extract_rule_based_cached(question)
+    return {
+        "company": company[0] if company else None,
+        "corp_code": company[1] if company else None,
+        "year_list": list(years),
+    }
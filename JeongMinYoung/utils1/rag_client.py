@@ -0,0 +1,77 @@
+import json
+import os
+
+import requests
+
+
+# RAG 서버(utils1/server.py) 호출 클라이언트
+# Streamlit 화면은 모델/인덱스를 직접 로딩하지 않고 이 모듈로 서버에 질문만 전달 (utils1.main 과 같은 함수 이름/인자)
+
+RAG_SERVER_URL = os.getenv("RAG_SERVER_URL", "http://localhost:8000").rstrip("/")
+RAG_CLIENT_TIMEOUT = float(os.getenv("RAG_CLIENT_TIMEOUT", "180"))
+
+
+def run_flexible_rag(question: str, level: int = 1, session_id: str | None = None) -> str:
+    response = requests.post(
+        f"{RAG_SERVER_URL}/ask",
+        json={"question": question, "level": level, "session_id": session_id},
+        timeout=RAG_CLIENT_TIMEOUT,
+    )
+    response.raise_for_status()
+    return response.json()["answer"]
+
+
+def run_flexible_rag1(question: str, session_id: str | None = None) -> str:
+    return run_flexible_rag(question, 1, session_id)
+
+
+def run_flexible_rag2(question: str, session_id: str | None = None) -> str:
+    return run_flexible_rag(question, 2, session_id)
+
+
+def run_flexible_rag3(question: str, session_id: str | None = None) -> str:
+    return run_flexible_rag(question, 3, session_id)
+
+
+# 서버가 보내는 NDJSON 스트림에서 토큰만 흘려보내고, 마지막 metrics 는 넘겨받은 딕셔너리에 채움
+def stream_flexible_rag(question: str, level: int = 1, metrics: dict | None = None, session_id: str | None = None):
+    metrics = metrics if metrics is not None else {}
+    with requests.post(
+        f"{RAG_SERVER_URL}/ask/stream",
+        json={"question": question, "level": level, "session_id": session_id},
+        stream=True,
+        timeout=RAG_CLIENT_TIMEOUT,
+    ) as response:
+        response.raise_for_status()
+        for line in response.iter_lines(decode_unicode=True):
+            if not line:
+                continue
+            event = json.loads(line)
+            if event["type"] == "token":
+                yield event["text"]
+            elif event["type"] == "metrics":
+                metrics.update(event["metrics"])
+            elif event["type"] == "error":
+                raise RuntimeError(event["message"])
+
+
+def stream_flexible_rag1(question: str, metrics: dict | None = None, session_id: str | None = None):
+    return stream_flexible_rag(question, 1, metrics, session_id)
+
+
+def stream_flexible_rag2(question: str, metrics: dict | None = None, session_id: str | None = None):
+    return stream_flexible_rag(question, 2, metrics, session_id)
+
+
+def stream_flexible_rag3(question: str, metrics: dict | None = None, session_id: str | None = None):
+    return stream_flexible_rag(question, 3, metrics, session_id)
+
+
+def ask_batch(questions: list[str], level: int = 1, session_id: str | None = None) -> list[dict]:
+    response = requests.post(
+        f"{RAG_SERVER_URL}/ask/batch",
+        json={"questions": [{"question": q, "level": level, "session_id": session_id} for q in questions]},
+        timeout=RAG_CLIENT_TIMEOUT,
+    )
+    response.raise_for_status()
+    return response.json()["results"]
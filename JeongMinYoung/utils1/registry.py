@@ -0,0 +1,187 @@
+import asyncio
+import os
+import threading
+import time
+
+from .chain_setting import CHAIN_PROMPTS, create_llm, build_chain
+from .retreiver_setting import (load_bge_m3_embeddings, load_faiss_vectordb, load_pinecone_vectordb,
+                                build_accounting_retriever, build_business_retriever,
+                                build_business_retriever2, build_self_query_retriever,
+                                load_bm25_retriever, build_hybrid_retriever)
+from .bm25_index import BM25_SOURCES, bm25_index_path
+from .intent_classifier import load_intent_classifier
+from .query_router import build_router_chain
+from .answer_cache import AnswerCache
+from .llm_cache import with_llm_cache
+from .normalize_code_search import get_corp_index
+
+
+# 프로세스 전체에서 공유하는 무거운 리소스(임베딩 모델, 벡터 db, retriever, 체인) 지연 로딩 저장소
+# - 각 리소스는 처음 사용될 때(또는 warm_up 스레드에서) 한 번만 생성되고 이후에는 재사용됨
+# - 리소스마다 별도 lock 을 사용해서 서로 다른 리소스는 동시에 로딩 가능
+
+_builders = {}
+_resources = {}
+_locks = {}
+_optional = set()
+_registry_lock = threading.Lock()
+_warmup_thread = None
+
+
+# 리소스 생성 함수 등록
+# optional=True 인 리소스는 미리 빌드된 파일이 있어야 해서 기본 warm_up 대상에서 제외
+def register(name: str, builder, optional: bool = False) -> None:
+    with _registry_lock:
+        _builders[name] = builder
+        _locks.setdefault(name, threading.Lock())
+        if optional:
+            _optional.add(name)
+
+
+# 리소스 가져오기 (없으면 생성)
+def get_resource(name: str):
+    if name in _resources:
+        return _resources[name]
+
+    if name not in _builders:
+        raise KeyError(f"등록되지 않은 리소스입니다: {name}")
+
+    with _locks[name]:
+        if name not in _resources:
+            started = time.perf_counter()
+            _resources[name] = _builders[name]()
+            print(f"📦 리소스 로딩 완료: {name} ({time.perf_counter() - started:.2f}초)")
+    return _resources[name]
+
+
+# async 코드용: 아직 로딩되지 않은 리소스는 스레드에서 로딩 (모델/인덱스 로딩이 이벤트 루프를 막지 않도록)
+async def aget_resource(name: str):
+    if name in _resources:
+        return _resources[name]
+    return await asyncio.to_thread(get_resource, name)
+
+
+def is_loaded(name: str) -> bool:
+    return name in _resources
+
+
+# 리소스 교체/초기화 (인덱스 재생성 후 다시 로딩할 때 사용)
+def reset_resource(name: str) -> None:
+    with _locks.get(name, _registry_lock):
+        _resources.pop(name, None)
+
+
+# 지정한 리소스(기본: optional 을 제외한 전체)를 미리 로딩
+# background=True 이면 데몬 스레드에서 로딩하고 바로 반환 (여러 번 호출해도 스레드는 하나만 실행)
+def warm_up(names=None, background: bool = True):
+    global _warmup_thread
+    names = list(names) if names is not None else [n for n in _builders if n not in _optional]
+
+    def _run():
+        for name in names:
+            try:
+                get_resource(name)
+            except Exception as e:
+                print(f"⚠️ 리소스 미리 로딩 실패: {name} ({e})")
+
+    if not background:
+        _run()
+        return None
+
+    with _registry_lock:
+        if _warmup_thread is None or not _warmup_thread.is_alive():
+            _warmup_thread = threading.Thread(target=_run, name="rag-warmup", daemon=True)
+            _warmup_thread.start()
+    return _warmup_thread
+
+
+# 모듈 전역 변수처럼 쓸 수 있는 지연 로딩 프록시
+# 속성에 처음 접근하는 순간 실제 리소스를 로딩하고, 이후 호출은 실제 객체로 전달됨
+class LazyResource:
+    def __init__(self, name: str):
+        self._name = name
+
+    def __getattr__(self, item):
+        return getattr(get_resource(self._name), item)
+
+    # async 코드에서는 실제 객체를 스레드에서 로딩한 뒤 사용
+    async def aload(self):
+        return await aget_resource(self._name)
+
+    async def ainvoke(self, *args, **kwargs):
+        return await (await self.aload()).ainvoke(*args, **kwargs)
+
+    async def astream(self, *args, **kwargs):
+        async for chunk in (await self.aload()).astream(*args, **kwargs):
+            yield chunk
+
+    def __repr__(self):
+        state = "loaded" if is_loaded(self._name) else "not loaded"
+        return f"<LazyResource {self._name} ({state})>"
+
+
+# ---- 기본 리소스 등록 ----
+register("llm", create_llm)
+for _chain_name in CHAIN_PROMPTS:
+    register(_chain_name, lambda _name=_chain_name: build_chain(_name, get_resource("llm")))
+
+# 기업명 인덱스 (처음 실행하는 환경에서는 corpCode.xml 다운로드 포함, 질문 처리 전에 미리 로딩)
+register("corp_index", get_corp_index)
+
+register("router_chain", lambda: build_router_chain(with_llm_cache(get_resource("llm"), "router_chain")))
+register("intent_classifier", load_intent_classifier)
+
+register("bge_m3_embeddings", load_bge_m3_embeddings)
+register("accounting_vectordb", lambda: load_faiss_vectordb("faiss_index3", get_resource("bge_m3_embeddings")))
+register("business_vectordb", lambda: load_faiss_vectordb("faiss_index_bge_m3", get_resource("bge_m3_embeddings")))
+register("pinecone_vectordb", load_pinecone_vectordb)
+
+register("accounting_retriever", lambda: build_accounting_retriever(get_resource("accounting_vectordb")))
+register("business_retriever", lambda: build_business_retriever(get_resource("business_vectordb")))
+register("business_retriever2", lambda: build_business_retriever2(get_resource("pinecone_vectordb")))
+register("self_query_retriever", lambda: build_self_query_retriever(get_resource("pinecone_vectordb")))
+register("accounting_bm25_retriever", lambda: load_bm25_retriever(BM25_SOURCES["faiss_index3"], k=6),
+         optional=True)
+register("accounting_hybrid_retriever", lambda: build_hybrid_retriever(get_resource("accounting_retriever"),
+                                                                     get_resource("accounting_bm25_retriever")),
+         optional=True)
+
+
+# 회계 질문에 실제로 사용할 retriever
+# ACCOUNTING_SEARCH_MODE=hybrid|faiss (기본값: BM25 인덱스 파일이 있으면 hybrid)
+def _build_accounting_search_retriever():
+    default_mode = "hybrid" if os.path.exists(bm25_index_path(BM25_SOURCES["faiss_index3"])) else "faiss"
+    mode = os.getenv("ACCOUNTING_SEARCH_MODE", default_mode)
+    if mode == "hybrid":
+        return get_resource("accounting_hybrid_retriever")
+    return get_resource("accounting_retriever")
+
+
+register("accounting_search_retriever", _build_accounting_search_retriever)
+
+register("business_bm25_retriever", lambda: load_bm25_retriever(BM25_SOURCES["faiss_index_bge_m3"], k=5),
+         optional=True)
+register("business_hybrid_retriever", lambda: build_hybrid_retriever(get_resource("business_retriever"),
+                                                                   get_resource("business_bm25_retriever")),
+         optional=True)
+
+
+# 하이브리드 질문의 사업보고서 검색에 실제로 사용할 retriever
+# BUSINESS_SEARCH_MODE=hybrid|faiss (기본값: BM25 인덱스 파일이 있으면 hybrid)
+def _build_business_search_retriever():
+    default_mode = "hybrid" if os.path.exists(bm25_index_path(BM25_SOURCES["faiss_index_bge_m3"])) else "faiss"
+    mode = os.getenv("BUSINESS_SEARCH_MODE", default_mode)
+    if mode == "hybrid":
+        return get_resource("business_hybrid_retriever")
+    return get_resource("business_retriever")
+
+
+register("business_search_retriever", _build_business_search_retriever)
+
+# 답변 캐시 (임베딩 모델은 실제 조회/저장할 때 로딩)
+register("answer_cache", lambda: AnswerCache(lambda text: get_resource("bge_m3_embeddings").embed_query(text)))
+
+
+# RAG_WARMUP=1 이면 import 시점에 백그라운드 미리 로딩 시작
+if os.getenv("RAG_WARMUP", "0") == "1":
+    warm_up()
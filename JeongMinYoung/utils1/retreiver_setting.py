@@ -1,7 +1,10 @@
 from dotenv import load_dotenv
 
-from transformers import BertTokenizer
+from .embedding_cache import with_embedding_cache
+from .faiss_index_builder import variant_dir, set_search_params
+from .bm25_index import BM25Index, BM25IndexRetriever, bm25_index_path, tokenize
 
+from langchain.retrievers import EnsembleRetriever
 from langchain.retrievers.self_query.base import SelfQueryRetriever
 from langchain.chains.query_constructor.schema import AttributeInfo
 
@@ -33,46 +36,65 @@ PINECONE_REGION = "us-east-1"
 PINECONE_CLOUD = "aws"
 EMBEDDING_MODEL = "text-embedding-3-small"
 
-def faiss_retriever_loading():
+# bge-m3 임베딩 모델 로딩 (FAISS 인덱스 두 개가 공유)
+def load_bge_m3_embeddings():
+    return with_embedding_cache(HuggingFaceEmbeddings(model_name="BAAI/bge-m3"), "BAAI/bge-m3")
+
+
+# utils1 폴더 아래 저장된 FAISS 인덱스 로딩
+# 인덱스 종류: FAISS_VARIANT_<폴더명> 또는 FAISS_VARIANT 환경변수 (flat|hnsw|ivfpq, 기본 flat)
+# 근사 인덱스는 python -m utils1.faiss_index_builder 로 미리 만들어 둔 폴더를 사용
+def load_faiss_vectordb(index_dir: str, embeddings, variant: str | None = None):
     current_dir = os.path.dirname(os.path.abspath(__file__))
-    faiss_path1 = os.path.join(current_dir, "faiss_index3")
-    faiss_path2 = os.path.join(current_dir, "faiss_index_bge_m3")
-    embeddings = HuggingFaceEmbeddings(model_name="BAAI/bge-m3")
+    variant = variant or os.getenv(f"FAISS_VARIANT_{index_dir.upper()}", os.getenv("FAISS_VARIANT", "flat"))
 
-    vector_db1 = FAISS.load_local(
-        faiss_path1,
+    path = os.path.join(current_dir, variant_dir(index_dir, variant))
+    if not os.path.exists(path):
+        print(f"⚠️ {variant} 인덱스가 없어 flat 인덱스를 사용합니다: {path}")
+        path = os.path.join(current_dir, index_dir)
+
+    vector_db = FAISS.load_local(
+        path,
         embeddings,
         allow_dangerous_deserialization=True
     )
+    ef_search = os.getenv("FAISS_HNSW_EF_SEARCH")
+    nprobe = os.getenv("FAISS_IVF_NPROBE")
+    set_search_params(vector_db,
+                      ef_search=int(ef_search) if ef_search else None,
+                      nprobe=int(nprobe) if nprobe else None)
+    return vector_db
+
 
-    accounting_retriever = vector_db1.as_retriever(
+# 사업보고서 벡터 db - pinecone
+def load_pinecone_vectordb():
+    pc = Pinecone(api_key=os.environ["PINECONE_API_KEY"])
+    embeddings = with_embedding_cache(OpenAIEmbeddings(model=EMBEDDING_MODEL), EMBEDDING_MODEL)
+    index = pc.Index(PINECONE_INDEX_NAME)
+    return PineconeVectorStore(index=index, embedding=embeddings)
+
+
+# 회계 기준서 retriever
+def build_accounting_retriever(vector_db):
+    return vector_db.as_retriever(
         search_type='similarity',
         search_kwargs={
             'k': 6
         })
 
-    # 사업보고서 벡터 db
-    vector_db2 = FAISS.load_local(
-        faiss_path2,
-        embeddings,
-        allow_dangerous_deserialization=True
-    )
-
 
-    business_retriever = vector_db2.as_retriever(
+# 사업보고서 retriever (FAISS)
+def build_business_retriever(vector_db):
+    return vector_db.as_retriever(
         search_type='similarity',
         search_kwargs={
             'k': 5,
         })
 
 
-    # 사업보고서 벡터 db - pinecone
-    pc = Pinecone(api_key=os.environ["PINECONE_API_KEY"])
-    embeddings = OpenAIEmbeddings(model=EMBEDDING_MODEL)
-    index = pc.Index(PINECONE_INDEX_NAME)
-    vector_db3 = PineconeVectorStore(index=index, embedding=embeddings)
-
-    business_retriever2 = vector_db3.as_retriever(
+# 사업보고서 retriever (pinecone)
+def build_business_retriever2(vector_db):
+    return vector_db.as_retriever(
         search_type='similarity',
         search_kwargs={
             'k': 7,
@@ -80,7 +102,8 @@ def faiss_retriever_loading():
     )
 
 
-
+# 연도 메타데이터 필터를 LLM이 만들어주는 SelfQueryRetriever
+def build_self_query_retriever(vector_db):
     metadata_field_info = [
         AttributeInfo(
             name='year',
@@ -91,24 +114,57 @@ def faiss_retriever_loading():
             type='string',
             description='문서 본문 내용')]
 
-
-    # SelfQueryRetriever 객체생성
-
-    self_query_retriever = SelfQueryRetriever.from_llm(
+    return SelfQueryRetriever.from_llm(
         llm=ChatOpenAI(model='gpt-4o-mini', temperature=0),
-        vectorstore=vector_db3,
+        vectorstore=vector_db,
         document_contents='page_content',  # 문서 내용을 가리키는 메타데이터 필드명
         metadata_field_info=metadata_field_info,
         search_kwargs={"k": 7}
     )
 
+
+# 회사명/연도로 사업보고서 메타데이터 필터 생성 (pinecone 문법, SelfQueryRetriever 의 LLM 호출 대체)
+def build_business_metadata_filter(company: str | None, years: list[str] | None) -> dict | None:
+    conditions = []
+    if company:
+        conditions.append({"corp_name": {"$eq": company}})
+    if years:
+        conditions.append({"year": {"$in": list(years)}})
+    if not conditions:
+        return None
+    return conditions[0] if len(conditions) == 1 else {"$and": conditions}
+
+
+# 필터를 직접 지정한 사업보고서 검색 (LLM 질의 생성 없이 바로 벡터 검색)
+def filtered_business_search(vector_db, question: str, metadata_filter: dict, k: int = 7):
+    return vector_db.similarity_search(question, k=k, filter=metadata_filter)
+
+
+async def afiltered_business_search(vector_db, question: str, metadata_filter: dict, k: int = 7):
+    return await vector_db.asimilarity_search(question, k=k, filter=metadata_filter)
+
+
+# 전체 retriever 한 번에 로딩 (처음부터 모두 필요할 때만 사용, 평소에는 registry 의 지연 로딩 사용)
+def faiss_retriever_loading():
+    embeddings = load_bge_m3_embeddings()
+
+    accounting_retriever = build_accounting_retriever(load_faiss_vectordb("faiss_index3", embeddings))
+
+    # 사업보고서 벡터 db
+    business_retriever = build_business_retriever(load_faiss_vectordb("faiss_index_bge_m3", embeddings))
+
+    vector_db3 = load_pinecone_vectordb()
+    business_retriever2 = build_business_retriever2(vector_db3)
+
+    # SelfQueryRetriever 객체생성
+    self_query_retriever = build_self_query_retriever(vector_db3)
+
     return accounting_retriever, business_retriever, business_retriever2, self_query_retriever
 
-# 한국어 형태소 분석기
+# 한국어 형태소 분석기 (토크나이저는 bm25_index 에서 한 번만 로딩해서 재사용)
 def preprocess(text):
-    tokenizer = BertTokenizer.from_pretrained('kykim/bert-kor-base')
     # BERT tokenizer를 사용하여 텍스트 토큰화
-    tokens = tokenizer.tokenize(text)  # BERT tokenizer로 단어 분리
+    tokens = tokenize(text)  # BERT tokenizer로 단어 분리
     return tokens
 
 def calculate_bm25(query, documents):
@@ -118,3 +174,12 @@ def calculate_bm25(query, documents):
     query_tokens = preprocess(query)  # 쿼리 전처리
     return bm25.get_scores(query_tokens)  # BM25 점수 계산
 
+
+# 미리 빌드된 BM25 인덱스 retriever (python -m utils1.bm25_index 로 생성)
+def load_bm25_retriever(filename: str, k: int = 6):
+    return BM25IndexRetriever(index=BM25Index.load(bm25_index_path(filename)), k=k)
+
+
+# FAISS(의미 검색) + BM25(키워드 검색) 결과를 reciprocal rank fusion 으로 합친 retriever
+def build_hybrid_retriever(faiss_retriever, bm25_retriever, weights=(0.5, 0.5)):
+    return EnsembleRetriever(retrievers=[faiss_retriever, bm25_retriever], weights=list(weights))
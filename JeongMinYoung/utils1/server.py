@@ -0,0 +1,159 @@
+import asyncio
+import json
+import os
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+
+from .main import arun_flexible_rag, astream_flexible_rag, RAG_MAX_CONCURRENCY, answer_cache, USE_ANSWER_CACHE
+from .registry import warm_up
+from .evidence_cache import evidence_cache
+from .llm_cache import all_cache_stats
+
+
+# RAG 파이프라인 HTTP 서버 (Streamlit 화면과 분리해서 따로 확장)
+# 실행: python -m utils1.server  또는  uvicorn utils1.server:app --workers 4 --port 8000
+# - 워커(프로세스)마다 모델/인덱스를 한 번 로딩하고, 워커 안에서는 하나의 이벤트 루프로 여러 질문을 동시에 처리
+# - 워커당 동시 처리 수는 RAG_MAX_CONCURRENCY, 그 이상은 RAG_MAX_QUEUE 개까지 대기하고 넘치면 503 반환
+
+RAG_SERVER_HOST = os.getenv("RAG_SERVER_HOST", "0.0.0.0")
+RAG_SERVER_PORT = int(os.getenv("RAG_SERVER_PORT", "8000"))
+RAG_SERVER_WORKERS = int(os.getenv("RAG_SERVER_WORKERS", "2"))
+RAG_MAX_QUEUE = int(os.getenv("RAG_MAX_QUEUE", "64"))
+RAG_BATCH_MAX = int(os.getenv("RAG_BATCH_MAX", "50"))
+
+_pending = 0
+
+
+class AskRequest(BaseModel):
+    question: str = Field(min_length=1)
+    level: int = Field(default=1, ge=1, le=3)
+    session_id: str | None = None
+
+
+class BatchRequest(BaseModel):
+    questions: list[AskRequest]
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 워커가 뜨자마자 임베딩 모델/벡터 db/체인 로딩 시작 (첫 요청이 로딩을 기다리지 않도록)
+    warm_up()
+    yield
+
+
+app = FastAPI(title="기업 재무 RAG 서버", lifespan=lifespan)
+
+
+# 처리 중 + 대기 중인 요청 수가 한도를 넘으면 바로 거절 (무한정 쌓이지 않도록)
+def _acquire(count: int = 1) -> None:
+    global _pending
+    if _pending + count > RAG_MAX_CONCURRENCY + RAG_MAX_QUEUE:
+        raise HTTPException(status_code=503, detail="요청이 많아 잠시 후 다시 시도해주세요.")
+    _pending += count
+
+
+def _release(count: int = 1) -> None:
+    global _pending
+    _pending -= count
+
+
+async def _answer(request: AskRequest) -> dict:
+    started = time.perf_counter()
+    try:
+        answer = await arun_flexible_rag(request.question, request.level, request.session_id)
+        return {"question": request.question, "level": request.level, "answer": answer,
+                "elapsed": time.perf_counter() - started}
+    except Exception as e:
+        print(f"⚠️ 답변 생성 실패: {e}")
+        return {"question": request.question, "level": request.level, "error": str(e),
+                "elapsed": time.perf_counter() - started}
+
+
+@app.get("/health")
+async def health() -> dict:
+    return {"status": "ok", "pending": _pending}
+
+
+@app.get("/stats")
+async def stats() -> dict:
+    return {
+        "pending": _pending,
+        "max_concurrency": RAG_MAX_CONCURRENCY,
+        "max_queue": RAG_MAX_QUEUE,
+        "evidence_cache": evidence_cache.stats() if evidence_cache is not None else None,
+        "answer_cache": answer_cache.stats() if USE_ANSWER_CACHE else None,
+        "llm_cache": all_cache_stats(),
+    }
+
+
+@app.get("/ask")
+async def ask(question: str = Query(min_length=1), level: int = Query(1, ge=1, le=3),
+              session_id: str | None = None) -> dict:
+    return await ask_post(AskRequest(question=question, level=level, session_id=session_id))
+
+
+@app.post("/ask")
+async def ask_post(request: AskRequest) -> dict:
+    _acquire()
+    try:
+        result = await _answer(request)
+    finally:
+        _release()
+    if "error" in result:
+        raise HTTPException(status_code=500, detail=result["error"])
+    return result
+
+
+# 응답 전송이 어떻게 끝나든(정상 종료, 연결 끊김, 본문을 보내기 전 취소) on_close 를 호출하는 StreamingResponse
+# generator 의 finally 는 본문을 한 번도 읽지 않으면 실행되지 않아서 자리 반환에 쓰지 않음
+class _SlotStreamingResponse(StreamingResponse):
+    def __init__(self, content, on_close, **kwargs):
+        super().__init__(content, **kwargs)
+        self._on_close = on_close
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self._on_close()
+
+
+# 토큰 스트리밍 (NDJSON: {"type": "token", "text": ...} 여러 줄 후 마지막에 {"type": "metrics", "metrics": {...}})
+@app.post("/ask/stream")
+async def ask_stream(request: AskRequest) -> StreamingResponse:
+    _acquire()
+
+    async def events():
+        metrics = {"level": request.level}
+        try:
+            async for chunk in astream_flexible_rag(request.question, request.level, metrics, request.session_id):
+                yield json.dumps({"type": "token", "text": chunk}, ensure_ascii=False) + "\n"
+            yield json.dumps({"type": "metrics", "metrics": metrics}, ensure_ascii=False) + "\n"
+        except Exception as e:
+            print(f"⚠️ 스트리밍 답변 실패: {e}")
+            yield json.dumps({"type": "error", "message": str(e)}, ensure_ascii=False) + "\n"
+
+    return _SlotStreamingResponse(events(), _release, media_type="application/x-ndjson")
+
+
+# 여러 질문을 한 번에 처리 (동시 처리 수는 RAG_MAX_CONCURRENCY 로 제한, 결과는 입력 순서대로)
+@app.post("/ask/batch")
+async def ask_batch(request: BatchRequest) -> dict:
+    if len(request.questions) > RAG_BATCH_MAX:
+        raise HTTPException(status_code=413, detail=f"한 번에 최대 {RAG_BATCH_MAX}개까지 요청할 수 있습니다.")
+    _acquire(len(request.questions))
+    try:
+        results = await asyncio.gather(*(_answer(item) for item in request.questions))
+    finally:
+        _release(len(request.questions))
+    return {"results": results}
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run("utils1.server:app", host=RAG_SERVER_HOST, port=RAG_SERVER_PORT, workers=RAG_SERVER_WORKERS)
@@ -1,4 +1,4 @@
-`#!/usr/bin/env python3
+#!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
 2024년도 재무제표 CSV 파일 다운로드 스크립트
@@ -12,6 +12,7 @@ from typing import List
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from src.rag.document_saver import DocumentSaver
+from src.clients.corp_registry import get_corp_registry
 
 def download_2024_financial_csv():
     """2024년도 재무제표 CSV 파일만 다운로드"""
@@ -34,13 +35,10 @@ def download_2024_financial_csv():
     corp_codes = []
     failed_companies = []
     
+    registry = get_corp_registry()
     for company in companies:
-        corp_list = document_saver.get_corp_code_list()
-        corp_info = None
-        for corp in corp_list:
-            if corp['corp_name'] == company:
-                corp_info = corp
-                break
+        record = registry.by_name(company)
+        corp_info = {'corp_code': record.corp_code, 'corp_name': record.corp_name} if record else None
         
         if corp_info:
             corp_codes.append(corp_info)
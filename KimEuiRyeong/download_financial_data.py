@@ -16,6 +16,7 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from src.config import load_config
 from src.rag.document_saver import DocumentSaver
+from src.clients.corp_registry import get_corp_registry
 
 # 로깅 설정
 logging.basicConfig(
@@ -49,27 +50,22 @@ class FinancialDataDownloader:
         """회사명을 기업코드로 변환하고 유효성 검증"""
         self.logger.info("회사명 → 기업코드 변환 시작")
         
-        # 전체 기업 리스트 가져오기
-        all_companies = self.document_saver.get_corp_code_list()
-        self.logger.info(f"전체 기업 수: {len(all_companies)}개")
+        # 전체 기업 목록은 공용 레지스트리에서 (회사명 조회는 해시맵)
+        registry = get_corp_registry()
+        self.logger.info(f"전체 기업 수: {len(registry.all())}개")
         
         valid_companies = []
         failed_companies = []
         
         for company_name in self.target_companies:
-            # 기업명으로 찾기
-            found = False
-            for corp in all_companies:
-                if corp['corp_name'] == company_name:
-                    valid_companies.append({
-                        "corp_code": corp['corp_code'],
-                        "corp_name": corp['corp_name']
-                    })
-                    self.logger.info(f"✓ {company_name} → {corp['corp_code']}")
-                    found = True
-                    break
-            
-            if not found:
+            corp = registry.by_name(company_name)
+            if corp is not None:
+                valid_companies.append({
+                    "corp_code": corp.corp_code,
+                    "corp_name": corp.corp_name
+                })
+                self.logger.info(f"✓ {company_name} → {corp.corp_code}")
+            else:
                 failed_companies.append(company_name)
                 self.logger.warning(f"✗ {company_name} → 변환 실패")
         
@@ -13,7 +13,7 @@ from .services.company_resolver import company_resolver
 TARGET_COMPANIES = os.environ.get("TARGET_COMPANIES", "")
 TARGET_YEARS = os.environ.get("TARGET_YEARS", "")
 MAX_WORKERS = int(os.environ.get("MAX_WORKERS", "3"))
-DELAY_BETWEEN_REQUESTS = float(os.environ.get("DELAY_BETWEEN_REQUESTS", "2.0"))
+DELAY_BETWEEN_REQUESTS = float(os.environ.get("DELAY_BETWEEN_REQUESTS", "0"))
 BATCH_SIZE = int(os.environ.get("BATCH_SIZE", "5"))
 
 def get_target_companies_from_env() -> List[Dict[str, str]]:
@@ -101,8 +101,8 @@ def validate_env_settings() -> Dict:
     if not (1 <= settings["max_workers"] <= 10):
         validation_result["warnings"].append(f"MAX_WORKERS({settings['max_workers']})가 권장 범위(1-10)를 벗어났습니다")
     
-    if not (0.5 <= settings["delay_between_requests"] <= 5.0):
-        validation_result["warnings"].append(f"DELAY_BETWEEN_REQUESTS({settings['delay_between_requests']})가 권장 범위(0.5-5.0)를 벗어났습니다")
+    if not (0 <= settings["delay_between_requests"] <= 5.0):
+        validation_result["warnings"].append(f"DELAY_BETWEEN_REQUESTS({settings['delay_between_requests']})가 권장 범위(0-5.0)를 벗어났습니다")
     
     if not (1 <= settings["batch_size"] <= 20):
         validation_result["warnings"].append(f"BATCH_SIZE({settings['batch_size']})가 권장 범위(1-20)를 벗어났습니다")
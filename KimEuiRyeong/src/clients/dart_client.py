@@ -3,15 +3,12 @@ DART API 클라이언트 모듈
 다양한 DART API 엔드포인트에 대한 통합 클라이언트
 """
 
-import requests
-import zipfile
-import xml.etree.ElementTree as ET
-import os
 from typing import List, Dict, Optional, Any
 from dataclasses import dataclass
-from pathlib import Path
 
 from src.config import DART_API_KEY
+from src.clients.corp_registry import get_corp_registry
+from src.clients.dart_request_cache import cached_get_json
 
 
 @dataclass
@@ -52,109 +49,35 @@ class DartClient:
     
     def __init__(self, api_key: str = DART_API_KEY):
         self.api_key = api_key
-        self._company_list_cache = None
-        self._cache_file = Path("corpcode_cache.xml")
-        
-    def _download_corpcode_if_needed(self) -> bool:
-        """필요한 경우에만 corpcode.xml을 다운로드합니다."""
-        try:
-            # 캐시 파일이 있으면 사용
-            if self._cache_file.exists():
-                print(f"[INFO] 기존 캐시 파일 사용: {self._cache_file}")
-                return True
-            
-            # 캐시 파일이 없으면 다운로드
-            print(f"[INFO] corpcode.xml 다운로드 중...")
-            url = f"https://opendart.fss.or.kr/api/corpCode.xml?crtfc_key={self.api_key}"
-            response = requests.get(url)
-            response.raise_for_status()
-            
-            # ZIP 파일로 저장
-            corp_code_file = 'corpCode.zip'
-            with open(corp_code_file, 'wb') as f:
-                f.write(response.content)
-            
-            # ZIP 파일 압축 해제
-            with zipfile.ZipFile(corp_code_file, 'r') as zip_ref:
-                zip_ref.extractall('.')
-            
-            # 임시 ZIP 파일 삭제
-            if os.path.exists(corp_code_file):
-                os.remove(corp_code_file)
-            
-            # CORPCODE.xml을 캐시 파일로 이동
-            if os.path.exists('CORPCODE.xml'):
-                os.rename('CORPCODE.xml', self._cache_file)
-                print(f"[INFO] corpcode.xml 캐시 파일로 저장: {self._cache_file}")
-                return True
-            else:
-                print(f"[ERROR] CORPCODE.xml 파일을 찾을 수 없습니다")
-                return False
-                
-        except Exception as e:
-            print(f"[ERROR] corpcode.xml 다운로드 실패: {e}")
-            return False
-    
-    def _load_companies_from_cache(self) -> List[CompanyInfo]:
-        """캐시 파일에서 기업 리스트를 로드합니다."""
-        try:
-            tree = ET.parse(self._cache_file)
-            root = tree.getroot()
-            
-            companies = []
-            for child in root.findall('list'):
-                corp_code = child.find('corp_code').text
-                corp_name = child.find('corp_name').text
-                companies.append(CompanyInfo(corp_code=corp_code, corp_name=corp_name))
-            
-            print(f"[INFO] 캐시에서 {len(companies)}개 기업 정보 로드 완료")
-            return companies
-            
-        except Exception as e:
-            print(f"[ERROR] 캐시 파일 로드 실패: {e}")
-            return []
+        # 기업코드 목록은 프로세스 전체에서 공유 (corpCode.xml 은 만료됐을 때만 다시 다운로드)
+        self._registry = get_corp_registry()
     
     def get_company_list(self) -> List[CompanyInfo]:
-        """기업 코드 리스트를 가져옵니다. (캐시 사용)"""
-        # 이미 메모리에 캐시된 경우
-        if self._company_list_cache is not None:
-            return self._company_list_cache
-        
-        # 캐시 파일 다운로드 또는 로드
-        if self._download_corpcode_if_needed():
-            self._company_list_cache = self._load_companies_from_cache()
-            return self._company_list_cache
-        else:
-            return []
+        """기업 코드 리스트를 가져옵니다. (공용 레지스트리 사용)"""
+        return [CompanyInfo(corp_code=r.corp_code, corp_name=r.corp_name) for r in self._registry.all()]
     
     def clear_cache(self) -> None:
-        """캐시를 삭제합니다."""
-        self._company_list_cache = None
-        if self._cache_file.exists():
-            self._cache_file.unlink()
-            print(f"[INFO] 캐시 파일 삭제: {self._cache_file}")
+        """저장된 기업코드 목록을 만료시킵니다. (다음 조회 때 다시 다운로드)"""
+        self._registry.invalidate()
     
     def refresh_company_list(self) -> List[CompanyInfo]:
         """기업 리스트를 새로 다운로드합니다."""
-        self.clear_cache()
+        self._registry.refresh()
         return self.get_company_list()
     
     def _make_request(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
         """API 요청을 수행합니다."""
         params['crtfc_key'] = self.api_key
-        url = f"{self.BASE_URL}/{endpoint}"
-        
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        return response.json()
+        # 연결 재사용, 재시도, 요청 한도는 공용 전송 계층에서 처리하고,
+        # 같은 (엔드포인트, 파라미터) 요청은 실행 중 한 번만 호출 (get_key_matters 등 반복 호출 제거)
+        return cached_get_json(endpoint, params)
     
     def find_company_by_name(self, company_name: str) -> Optional[CompanyInfo]:
         """기업명으로 기업 정보를 찾습니다."""
-        companies = self.get_company_list()
-        for company in companies:
-            if company.corp_name == company_name:
-                return company
-        return None
+        record = self._registry.by_name(company_name)
+        if record is None:
+            return None
+        return CompanyInfo(corp_code=record.corp_code, corp_name=record.corp_name)
     
     def get_financial_data(self, corp_code: str, year: int) -> List[Dict[str, Any]]:
         """재무제표 데이터를 가져옵니다."""
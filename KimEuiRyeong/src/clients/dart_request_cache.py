@@ -0,0 +1,145 @@
+"""
+DART 요청 메모이제이션 모듈
+(엔드포인트, 파라미터) 가 같은 요청은 한 실행(프로세스) 안에서 네트워크를 한 번만 타도록 하는 캐시 계층
+
+- 메모리: 정상(000)/데이터 없음(013) 응답을 실행이 끝날 때까지 보관
+- 같은 요청이 여러 스레드에서 동시에 들어오면 먼저 온 요청의 결과를 나머지가 기다렸다가 공유
+- 디스크(선택): DART_HTTP_CACHE=1 이면 SQLite 에 저장해서 다음 실행에서도 DART_HTTP_CACHE_TTL 초 동안 재사용
+- 그 외 오류 응답(요청 제한 등)은 저장하지 않음
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+
+from src.clients.dart_transport import get_json
+
+
+DART_HTTP_CACHE = os.getenv("DART_HTTP_CACHE", "0") == "1"
+DART_HTTP_CACHE_TTL = int(os.getenv("DART_HTTP_CACHE_TTL", str(7 * 24 * 3600)))
+DEFAULT_CACHE_PATH = os.getenv(
+    "DART_HTTP_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "dart_http_cache.sqlite3")
+)
+
+# 재사용해도 되는 DART 상태 코드 (000: 정상, 013: 조회된 데이터 없음)
+CACHEABLE_STATUS = {"000", "013"}
+
+
+class DartRequestCache:
+    """(엔드포인트, 파라미터) -> DART 응답 메모리/디스크 캐시"""
+
+    def __init__(self, path: Optional[str] = None, ttl: int = DART_HTTP_CACHE_TTL):
+        self.ttl = ttl
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memo: Dict[str, Any] = {}
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._conn = None
+        if path:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " payload TEXT NOT NULL,"
+                " fetched_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+
+    @staticmethod
+    def make_key(endpoint: str, params: Dict[str, Any]) -> str:
+        """인증키를 제외한 파라미터를 정렬해서 만든 요청 키"""
+        items = sorted((k, str(v)) for k, v in params.items() if k != "crtfc_key")
+        return json.dumps([endpoint, items], ensure_ascii=False)
+
+    @staticmethod
+    def is_cacheable(data: Any) -> bool:
+        return isinstance(data, dict) and data.get("status") in CACHEABLE_STATUS
+
+    def _disk_get(self, key: str) -> Optional[Any]:
+        if self._conn is None:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, fetched_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or time.time() - row[1] > self.ttl:
+            return None
+        return json.loads(row[0])
+
+    def _disk_put(self, key: str, data: Any) -> None:
+        if self._conn is None:
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?)",
+                (key, json.dumps(data, ensure_ascii=False), time.time())
+            )
+            self._conn.commit()
+
+    def get_or_fetch(self, endpoint: str, params: Dict[str, Any], fetch: Callable[[], Any]) -> Any:
+        key = self.make_key(endpoint, params)
+        with self._lock:
+            if key in self._memo:
+                self.hits += 1
+                return self._memo[key]
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+
+        # 같은 요청이 이미 진행 중이면 그 결과를 기다림
+        if not owner:
+            self.hits += 1
+            return future.result()
+
+        try:
+            data = self._disk_get(key)
+            if data is not None:
+                self.disk_hits += 1
+            else:
+                self.misses += 1
+                data = fetch()
+                if self.is_cacheable(data):
+                    self._disk_put(key, data)
+            if self.is_cacheable(data):
+                with self._lock:
+                    self._memo[key] = data
+            future.set_result(data)
+            return data
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def clear(self) -> None:
+        """메모리 캐시를 비웁니다. (디스크 캐시는 유지)"""
+        with self._lock:
+            self._memo.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.disk_hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.disk_hits) / total if total else 0.0,
+        }
+
+
+# 프로세스 전체에서 공유 (DartClient 인스턴스가 여러 개여도 같은 요청은 한 번만 호출)
+request_cache = DartRequestCache(DEFAULT_CACHE_PATH if DART_HTTP_CACHE else None)
+
+
+def cached_get_json(endpoint: str, params: Dict[str, Any]) -> Any:
+    """공용 전송 계층으로 DART JSON 을 가져오되, 같은 요청은 캐시된 응답을 반환합니다."""
+    return request_cache.get_or_fetch(endpoint, params, lambda: get_json(endpoint, params))
@@ -17,6 +17,10 @@ RAG_DOCUMENTS_FOLDER_NAME=os.environ.get("RAG_DOCUMENTS_FOLDER_NAME")
 FINANCIAL_REPORTS_FOLDER_NAME=os.environ.get("FINANCIAL_REPORTS_FOLDER_NAME")
 DART_API_KEY=os.environ.get("DART_API_KEY")
 
+# 벡터 스토어 업로드 배치 크기 (임베딩 요청 1회당 문서 수, Pinecone upsert 1회당 벡터 수)
+EMBED_BATCH_SIZE=int(os.environ.get("EMBED_BATCH_SIZE", "256"))
+UPSERT_BATCH_SIZE=int(os.environ.get("UPSERT_BATCH_SIZE", "100"))
+
 # 대량 처리 설정을 별도 모듈로 분리
 from .bulk_config import (
     get_target_companies_from_env,
@@ -10,6 +10,7 @@ from langchain_core.messages import HumanMessage, SystemMessage, AIMessage, Tool
 
 # The files that you made.
 from src.config import OPENAI_KEY, MODEL_NAME
+from src.llm_cache import with_llm_cache
 
 class LLM:
     def __init__(self, tools: List[Callable] = None):
@@ -18,6 +19,9 @@ class LLM:
                 model=MODEL_NAME,
                 api_key=OPENAI_KEY
             )
+            # Reuse stored responses for identical prompts (LLM_CACHE_LLM=0 turns it off).
+            # with_llm_cache only attaches the cache when temperature is 0, so sampled answers are never frozen.
+            self.llm = with_llm_cache(self.llm, "llm")
         except Exception as e:
             print(f"An error occurred while creating LLM: {e}")
             raise e
@@ -7,6 +7,7 @@ from langchain_core.documents import Document
 from src.llm import LLM
 from src.services.document_service import DocumentService
 from src.rag.document_loader import DocumentLoader
+from src.rag.vector_store import document_id
 
 class Orchestrator:
     """메인 오케스트레이터 - 모든 구성 요소를 조정합니다."""
@@ -34,7 +35,9 @@ class Orchestrator:
         self.vector_store.get_index_ready()
         document_loader = DocumentLoader()
         documents: List[Document] = document_loader.get_document_chunks(path)
-        uploaded_ids: List[str] = self.vector_store.add_documents_to_index(documents)
+        # 고정 ID 로 이미 올라간 청크는 건너뛰고, 나머지는 배치 임베딩/업로드
+        self.vector_store.sync_documents(documents, delete_stale=False)
+        uploaded_ids: List[str] = [document_id(doc) for doc in documents]
         return uploaded_ids
     
     def query_rag(self, query: str) -> str:
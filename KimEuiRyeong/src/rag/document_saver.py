@@ -1,26 +1,22 @@
 # ADD by EUIRYEONG
 from typing import List, Dict
 import os
-import zipfile
-import requests
 import uuid
 import openai
 import re
 
 from langchain_core.documents import Document
 import pandas as pd
-import xml.etree.ElementTree as ET
 
 from src.config import DART_API_KEY, RAG_DOCUMENTS_FOLDER_NAME, FINANCIAL_REPORTS_FOLDER_NAME
+from src.clients.corp_registry import get_corp_registry
+from src.clients.dart_request_cache import cached_get_json
 
 import dart_fss as dfs
 
 
-CORP_CODE_FILE_NAME = 'corpCode.zip'
-ELEMENT_TREE_NAME = 'CORPCODE.xml'
-URL_CORP_CODE = f'https://opendart.fss.or.kr/api/corpCode.xml?crtfc_key={DART_API_KEY}'
-URL_FINANCIAL_STATE = 'https://opendart.fss.or.kr/api/fnlttSinglAcntAll.json'
-URL_BUSINESS_REPORT = 'https://opendart.fss.or.kr/api/document.json'
+URL_FINANCIAL_STATE = 'fnlttSinglAcntAll.json'
+URL_BUSINESS_REPORT = 'document.json'
 FINANCIAL_CODE = '11011'
 YEAR = 2022
 
@@ -34,27 +30,9 @@ class DocumentSaver:
         pass
 
     def get_corp_code_list(self):
+        # 기업코드 목록은 공용 레지스트리에서 (corpCode.xml 은 만료됐을 때만 다시 다운로드)
         try:
-            url = URL_CORP_CODE
-            response = requests.get(url)
-            response.raise_for_status()
-            with open(CORP_CODE_FILE_NAME, 'wb') as f:
-                f.write(response.content)
-
-            with zipfile.ZipFile(CORP_CODE_FILE_NAME, 'r') as zip_ref:
-                zip_ref.extractall('.')
-
-            tree = ET.parse(ELEMENT_TREE_NAME)
-            root = tree.getroot()
-
-            corp_list = []
-            for child in root.findall('list'):
-                corp_list.append({
-                    CORP_CODE: child.find(CORP_CODE).text,
-                    CORP_NAME: child.find(CORP_NAME).text,
-                })
-
-            return corp_list
+            return [{CORP_CODE: r.corp_code, CORP_NAME: r.corp_name} for r in get_corp_registry().all()]
         
         except Exception as e:
             print(f"[ERROR] 기업코드 리스트 가져오기 실패: {e}")
@@ -85,8 +63,12 @@ class DocumentSaver:
                 "LG화학",
             ]
 
-        full_list = self.get_corp_code_list()
-        filtered_dict = [item for item in full_list if item[CORP_NAME] in target_names]
+        registry = get_corp_registry()
+        filtered_dict = []
+        for name in dict.fromkeys(target_names):
+            record = registry.by_name(name)
+            if record is not None:
+                filtered_dict.append({CORP_CODE: record.corp_code, CORP_NAME: record.corp_name})
 
         return filtered_dict
 
@@ -96,18 +78,13 @@ class DocumentSaver:
             print(f"[INFO] {corp_name} {year}년 사업보고서 정보 가져오기 시작")
             
             # 기업 코드 찾기
-            corp_list = self.get_corp_code_list()
-            corp_info = None
-            for corp in corp_list:
-                if corp[CORP_NAME] == corp_name:
-                    corp_info = corp
-                    break
+            corp_info = get_corp_registry().by_name(corp_name)
             
             if not corp_info:
                 print(f"[ERROR] {corp_name} 기업을 찾을 수 없습니다.")
                 return []
             
-            corp_code = corp_info[CORP_CODE]
+            corp_code = corp_info.corp_code
             print(f"[INFO] {corp_name} 기업 코드: {corp_code}")
             
             documents = []
@@ -115,7 +92,6 @@ class DocumentSaver:
             # 1. 정기보고서 주요정보 가져오기
             try:
                 print("[INFO] 정기보고서 주요정보 가져오기")
-                url = "https://opendart.fss.or.kr/api/alotMatter.json"
                 params = {
                     'crtfc_key': DART_API_KEY,
                     'corp_code': corp_code,
@@ -123,9 +99,7 @@ class DocumentSaver:
                     'reprt_code': '11011'  # 사업보고서
                 }
                 
-                response = requests.get(url, params=params)
-                response.raise_for_status()
-                data = response.json()
+                data = cached_get_json("alotMatter.json", params)
                 
                 if 'list' in data and data['list']:
                     for item in data['list']:
@@ -157,7 +131,6 @@ class DocumentSaver:
             # 2. 배당에 관한 사항 가져오기
             try:
                 print("[INFO] 배당에 관한 사항 가져오기")
-                url = "https://opendart.fss.or.kr/api/alotMatter.json"
                 params = {
                     'crtfc_key': DART_API_KEY,
                     'corp_code': corp_code,
@@ -165,9 +138,7 @@ class DocumentSaver:
                     'reprt_code': '11011'
                 }
                 
-                response = requests.get(url, params=params)
-                response.raise_for_status()
-                data = response.json()
+                data = cached_get_json("alotMatter.json", params)
                 
                 if 'list' in data and data['list']:
                     dividend_items = [item for item in data['list'] if '배당' in item.get('se', '')]
@@ -198,7 +169,6 @@ class DocumentSaver:
             # 3. 임직원 현황 가져오기 (다른 API 사용)
             try:
                 print("[INFO] 임직원 현황 가져오기")
-                url = "https://opendart.fss.or.kr/api/empSttus.json"
                 params = {
                     'crtfc_key': DART_API_KEY,
                     'corp_code': corp_code,
@@ -206,9 +176,7 @@ class DocumentSaver:
                     'reprt_code': '11011'
                 }
                 
-                response = requests.get(url, params=params)
-                response.raise_for_status()
-                data = response.json()
+                data = cached_get_json("empSttus.json", params)
                 
                 if 'list' in data and data['list']:
                     for item in data['list']:
@@ -242,7 +210,6 @@ class DocumentSaver:
             # 4. 주주현황 가져오기
             try:
                 print("[INFO] 주주현황 가져오기")
-                url = "https://opendart.fss.or.kr/api/hyslrSttus.json"
                 params = {
                     'crtfc_key': DART_API_KEY,
                     'corp_code': corp_code,
@@ -250,9 +217,7 @@ class DocumentSaver:
                     'reprt_code': '11011'
                 }
                 
-                response = requests.get(url, params=params)
-                response.raise_for_status()
-                data = response.json()
+                data = cached_get_json("hyslrSttus.json", params)
                 
                 if 'list' in data and data['list']:
                     for item in data['list']:
@@ -287,7 +252,6 @@ class DocumentSaver:
             # 5. 최대주주현황 가져오기
             try:
                 print("[INFO] 최대주주현황 가져오기")
-                url = "https://opendart.fss.or.kr/api/mrhlSttus.json"
                 params = {
                     'crtfc_key': DART_API_KEY,
                     'corp_code': corp_code,
@@ -295,9 +259,7 @@ class DocumentSaver:
                     'reprt_code': '11011'
                 }
                 
-                response = requests.get(url, params=params)
-                response.raise_for_status()
-                data = response.json()
+                data = cached_get_json("mrhlSttus.json", params)
                 
                 if 'list' in data and data['list']:
                     for item in data['list']:
@@ -454,16 +416,14 @@ class DocumentSaver:
             corp_code = corp[CORP_CODE]
             corp_name = corp[CORP_NAME]
 
-            url = (
-                f"{URL_FINANCIAL_STATE}"
-                f"?crtfc_key={DART_API_KEY}"
-                f"&corp_code={corp_code}"
-                f"&bsns_year={str(YEAR)}"
-                f"&reprt_code={FINANCIAL_CODE}"
-                f"&fs_div=CFS"
-            )
-            resp = requests.get(url)
-            data = resp.json()
+            params = {
+                'crtfc_key': DART_API_KEY,
+                'corp_code': corp_code,
+                'bsns_year': str(YEAR),
+                'reprt_code': FINANCIAL_CODE,
+                'fs_div': 'CFS',
+            }
+            data = cached_get_json(URL_FINANCIAL_STATE, params)
 
             if data.get('status') == '013':  # 데이터 없음
                 print(f"[INFO] {corp_name} - 해당 연도의 사업보고서가 없습니다.")
@@ -1,17 +1,56 @@
-from typing import List
-from uuid import uuid4
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
 
 from pinecone import Pinecone, ServerlessSpec
 from langchain_pinecone import PineconeVectorStore
 from langchain_openai import OpenAIEmbeddings
 from langchain_core.documents import Document
 
-from src.config import PINECONE_KEY, OPENAI_KEY, EMBEDDING_MODEL_NAME
+from src.config import PINECONE_KEY, OPENAI_KEY, EMBEDDING_MODEL_NAME, EMBED_BATCH_SIZE, UPSERT_BATCH_SIZE
+from src.rag.embedding_cache import with_embedding_cache
+
+# PineconeVectorStore 가 본문을 저장/조회하는 메타데이터 키 (기본값)
+TEXT_KEY = "text"
+# Pinecone 에서 한 번에 삭제/조회할 수 있는 최대 ID 수
+ID_BATCH_SIZE = 1000
+
+
+def document_scope(metadata: dict) -> str:
+    """문서가 속한 (기업코드, 연도) 범위의 ID 접두사"""
+    return f"{metadata.get('corp_code', '')}#{metadata.get('year', '')}#"
+
+
+def document_slot(doc_id: str) -> str:
+    """고정 ID 에서 내용 해시를 뗀 (기업코드, 연도, 섹션, 항목) 부분"""
+    return doc_id.rsplit("#", 1)[0]
+
+
+def document_id(doc: Document) -> str:
+    """(기업코드, 연도, 섹션, 항목, 내용 해시)로 만든 고정 ID
+
+    같은 문서는 몇 번을 다시 올려도 같은 ID 가 되어 중복 벡터가 생기지 않고,
+    내용이 바뀌면 ID 가 바뀌어서 동기화할 때 이전 벡터는 삭제 대상이 됩니다.
+    """
+    metadata = doc.metadata
+    item = (metadata.get("item") or metadata.get("item_name") or metadata.get("account_id")
+            or metadata.get("content_type") or "")
+    slot = hashlib.sha1(f"{metadata.get('section', '')}\x00{item}".encode("utf-8")).hexdigest()[:12]
+    content = hashlib.sha1(doc.page_content.encode("utf-8")).hexdigest()[:16]
+    return f"{document_scope(metadata)}{slot}#{content}"
+
 
 class VectorStore:
     def __init__(self, index_name: str):
         self.pc = Pinecone(api_key=PINECONE_KEY)
         self.index_name: str = index_name
+        # 임베딩 모델은 한 번만 만들고, 이미 계산한 텍스트는 디스크 캐시에서 재사용
+        self.embedding_model = with_embedding_cache(
+            OpenAIEmbeddings(model=EMBEDDING_MODEL_NAME, api_key=OPENAI_KEY),
+            EMBEDDING_MODEL_NAME
+        )
+        self._vs_index: Optional[PineconeVectorStore] = None
 
     def create_index(self) -> None:
         # This uses the pinecone library
@@ -35,19 +74,113 @@ class VectorStore:
     
     def get_index(self) -> PineconeVectorStore:
         # This uses the Langchain-pinecone library
-        embedding_model = OpenAIEmbeddings(
-            model=EMBEDDING_MODEL_NAME,
-            api_key=OPENAI_KEY
-        )
-        index = self.pc.Index(self.index_name)
-        vs_index = PineconeVectorStore(index=index, embedding=embedding_model)
-        return vs_index
+        # 인덱스 연결은 한 번만 만들어서 재사용
+        if self._vs_index is None:
+            index = self.pc.Index(self.index_name)
+            self._vs_index = PineconeVectorStore(index=index, embedding=self.embedding_model)
+        return self._vs_index
 
     def add_documents_to_index(self, documents: List[Document]) -> List[str]:
-        vs_index: PineconeVectorStore = self.get_index()
-        uuids = [str(uuid4()) for _ in range(len(documents))]
-        list_of_ids: List[str] = vs_index.add_documents(documents=documents, ids=uuids)
-        return list_of_ids
+        return self.add_documents_in_batches(documents)["ids"]
+
+    def add_documents_in_batches(self, documents: List[Document], ids: Optional[List[str]] = None,
+                                 embed_batch_size: int = EMBED_BATCH_SIZE,
+                                 upsert_batch_size: int = UPSERT_BATCH_SIZE) -> dict:
+        """문서를 배치 단위로 임베딩/업로드합니다.
+
+        임베딩은 embed_batch_size 개씩 한 번에 요청하고, upsert 는 upsert_batch_size 개씩 나눠서 보냅니다.
+        배치 N 을 업로드하는 동안 배치 N+1 임베딩을 계산해서 두 작업의 대기 시간을 겹칩니다.
+        """
+        ids = ids or [document_id(doc) for doc in documents]
+        index = self.pc.Index(self.index_name)
+        started = time.perf_counter()
+        upserted = 0
+
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="pinecone-upsert") as executor:
+            pending = None
+            for start in range(0, len(documents), embed_batch_size):
+                batch = documents[start:start + embed_batch_size]
+                batch_ids = ids[start:start + embed_batch_size]
+                vectors = self.embedding_model.embed_documents([doc.page_content for doc in batch])
+                records = [
+                    {"id": doc_id, "values": vector, "metadata": {**doc.metadata, TEXT_KEY: doc.page_content}}
+                    for doc_id, vector, doc in zip(batch_ids, vectors, batch)
+                ]
+                # 이전 배치 업로드가 끝나야 다음 업로드 시작 (업로드는 항상 한 배치만 진행)
+                if pending is not None:
+                    upserted += pending.result()
+                pending = executor.submit(self._upsert_records, index, records, upsert_batch_size)
+                print(f"[PROGRESS] {min(start + embed_batch_size, len(documents))}/{len(documents)} 문서 임베딩 완료")
+            if pending is not None:
+                upserted += pending.result()
+
+        elapsed = time.perf_counter() - started
+        docs_per_sec = upserted / elapsed if elapsed > 0 else 0.0
+        print(f"[SUCCESS] {upserted}개 벡터 업로드 ({elapsed:.1f}초, {docs_per_sec:.1f} docs/sec)")
+        return {"ids": ids, "upserted": upserted, "elapsed": elapsed, "docs_per_sec": docs_per_sec}
+
+    def sync_documents(self, documents: List[Document], delete_stale: bool = True) -> dict:
+        """로컬 문서 목록과 인덱스를 (기업코드, 연도) 범위별로 비교해서 바뀐 부분만 반영합니다.
+
+        - 이미 같은 ID(같은 내용)가 있는 문서는 건너뜀
+        - 새로 생기거나 내용이 바뀐 문서만 임베딩/업로드
+        - delete_stale=True 이면 이번에 다시 올린 (섹션, 항목) 안에서 로컬 목록에 없는 벡터(이전 내용) 삭제
+          한 섹션이나 필수 항목만 다시 동기화해도 같은 기업/연도의 다른 섹션 벡터는 그대로 유지됨
+        uuid4 ID 로 올라간 이전 벡터는 범위 접두사가 없어서 비교 대상이 아니므로 delete_all_vectors 로 한 번 정리해야 합니다.
+        """
+        index = self.pc.Index(self.index_name)
+        local: Dict[str, Document] = {}
+        for doc in documents:
+            local.setdefault(document_id(doc), doc)
+
+        scopes: Dict[str, set] = {}
+        for doc_id, doc in local.items():
+            scopes.setdefault(document_scope(doc.metadata), set()).add(doc_id)
+
+        to_upsert, stale = [], []
+        for prefix, ids in scopes.items():
+            existing = self._existing_ids(index, prefix, ids)
+            to_upsert.extend(doc_id for doc_id in ids if doc_id not in existing)
+            synced_slots = {document_slot(doc_id) for doc_id in ids}
+            stale.extend(doc_id for doc_id in existing - ids if document_slot(doc_id) in synced_slots)
+
+        skipped = len(local) - len(to_upsert)
+        print(f"[INFO] 동기화: 문서 {len(local)}개 중 변경 없음 {skipped}개, 업로드 {len(to_upsert)}개, "
+              f"삭제 대상 {len(stale) if delete_stale else 0}개")
+
+        result = {"upserted": 0, "skipped": skipped, "deleted": 0, "docs_per_sec": 0.0}
+        if to_upsert:
+            uploaded = self.add_documents_in_batches([local[doc_id] for doc_id in to_upsert], to_upsert)
+            result.update(upserted=uploaded["upserted"], docs_per_sec=uploaded["docs_per_sec"])
+        if delete_stale and stale:
+            for start in range(0, len(stale), ID_BATCH_SIZE):
+                index.delete(ids=stale[start:start + ID_BATCH_SIZE])
+            result["deleted"] = len(stale)
+            print(f"[SUCCESS] 이전 벡터 {len(stale)}개 삭제")
+        return result
+
+    @staticmethod
+    def _existing_ids(index, prefix: str, candidate_ids: set) -> set:
+        """범위 접두사로 인덱스에 있는 ID 목록 조회 (list 를 지원하지 않는 인덱스는 후보 ID 만 fetch 로 확인)"""
+        try:
+            existing = set()
+            for page in index.list(prefix=prefix):
+                existing.update(page)
+            return existing
+        except Exception as e:
+            print(f"[WARNING] ID 목록 조회 실패, 후보 ID 만 확인합니다: {e}")
+        existing = set()
+        candidates = list(candidate_ids)
+        for start in range(0, len(candidates), ID_BATCH_SIZE):
+            response = index.fetch(ids=candidates[start:start + ID_BATCH_SIZE])
+            existing.update(response.vectors.keys())
+        return existing
+
+    @staticmethod
+    def _upsert_records(index, records: List[dict], batch_size: int) -> int:
+        for start in range(0, len(records), batch_size):
+            index.upsert(vectors=records[start:start + batch_size])
+        return len(records)
     
     def similarity_search(self, query: str, k: int = 4) -> List[Document]:
         """유사도 검색을 수행합니다."""
@@ -23,13 +23,14 @@ class BulkProcessor:
     """대량 기업 데이터 처리 클래스"""
     
     def __init__(self, dart_client: DartClient, document_service: DocumentService, 
-                 max_workers: int = 5, delay_between_requests: float = 1.0,
-                 essential_only: bool = True):
+                 max_workers: int = 5, delay_between_requests: float = 0.0,
+                 essential_only: bool = True, delete_stale: bool = False):
         self.dart_client = dart_client
         self.document_service = document_service
         self.max_workers = max_workers
         self.delay_between_requests = delay_between_requests
         self.essential_only = essential_only  # 필수 섹션만 처리할지 여부
+        self.delete_stale = delete_stale  # 이번에 만든 (섹션, 항목)의 이전 내용 벡터 삭제 여부
         self.logger = logging.getLogger(__name__)
         
     def process_multiple_companies(self, 
@@ -67,8 +68,8 @@ class BulkProcessor:
             batch_results = self._process_batch(batch)
             completed_jobs.extend(batch_results)
             
-            # 배치 간 딜레이
-            if i + batch_size < len(jobs):
+            # 배치 간 딜레이 (DART 요청 한도는 공용 전송 계층의 토큰 버킷이 지키므로 기본값 0)
+            if self.delay_between_requests > 0 and i + batch_size < len(jobs):
                 time.sleep(self.delay_between_requests * 2)
                 
         return completed_jobs
@@ -96,7 +97,8 @@ class BulkProcessor:
                     self.logger.error(f"실패: {job.corp_name} ({job.year}) - {e}")
                 
                 # 요청 간 딜레이
-                time.sleep(self.delay_between_requests)
+                if self.delay_between_requests > 0:
+                    time.sleep(self.delay_between_requests)
         
         return completed_jobs
     
@@ -120,7 +122,9 @@ class BulkProcessor:
             
             if documents:
                 # Pinecone에 업로드
-                success = self.document_service.upload_documents_to_vector_store(documents)
+                success = self.document_service.upload_documents_to_vector_store(
+                    documents, delete_stale=self.delete_stale
+                )
                 if not success:
                     raise Exception("파인콘 업로드 실패")
                 job.document_count = len(documents)
@@ -8,6 +8,8 @@
 from typing import Dict, List, Optional
 import re
 
+from src.clients.corp_registry import get_corp_registry
+
 class CompanyResolver:
     """회사명을 기업코드로 변환하는 클래스"""
     
@@ -155,12 +157,17 @@ class CompanyResolver:
             if alias_name in self.company_map:
                 return self.company_map[alias_name]
         
-        # 4. 부분 매칭 (포함 관계)
+        # 4. DART 전체 기업 목록에서 정확히 일치하는 상장사 (매핑에 없는 회사)
+        record = get_corp_registry().by_name(normalized_name)
+        if record is not None and record.stock_code:
+            return record.stock_code
+        
+        # 5. 부분 매칭 (포함 관계)
         for company, code in self.company_map.items():
             if normalized_name in company or company in normalized_name:
                 return code
         
-        # 5. 영어/한글 변환 시도
+        # 6. 영어/한글 변환 시도
         english_korean_map = {
             "samsung": "삼성전자",
             "sk": "SK하이닉스", 
@@ -110,8 +110,13 @@ class DocumentService:
         print(f"[SUCCESS] 필수 문서 {len(all_documents)}개 생성 완료")
         return all_documents
     
-    def upload_documents_to_vector_store(self, documents: List[Document]) -> bool:
-        """문서들을 벡터 스토어에 업로드합니다."""
+    def upload_documents_to_vector_store(self, documents: List[Document], delete_stale: bool = False) -> bool:
+        """문서들을 벡터 스토어에 업로드합니다.
+        
+        Args:
+            documents: 업로드할 문서 목록
+            delete_stale: 이번에 올린 (섹션, 항목)의 이전 내용 벡터 삭제 여부 (증분 동기화)
+        """
         if not documents:
             print("[WARNING] 업로드할 문서가 없습니다.")
             return False
@@ -120,47 +125,45 @@ class DocumentService:
             print(f"[INFO] 벡터 스토어 준비 중...")
             self.vector_store.get_index_ready()
             
-            print(f"[INFO] {len(documents)}개 문서 업로드 중...")
-            success_count = 0
+            print(f"[INFO] {len(documents)}개 문서 검증 중...")
+            cleaned_docs = []
             failed_count = 0
             
             for i, doc in enumerate(documents, 1):
-                try:
-                    # 메타데이터 정리 및 검증
-                    cleaned_metadata = self._clean_metadata(doc.metadata)
-                    
-                    # 문서 내용 검증 강화
-                    content = doc.page_content.strip()
-                    if not content or len(content) < 20:
-                        print(f"[WARNING] 문서 {i}: 내용이 너무 짧아 건너뜀 (길이: {len(content)})")
-                        failed_count += 1
-                        continue
-                    
-                    # 무의미한 내용 필터링
-                    if self._is_meaningless_content(content):
-                        print(f"[WARNING] 문서 {i}: 무의미한 내용으로 건너뜀")
-                        failed_count += 1
-                        continue
-                    
-                    cleaned_doc = Document(
-                        page_content=content,
-                        metadata=cleaned_metadata
-                    )
-                    
-                    self.vector_store.add_documents_to_index([cleaned_doc])
-                    success_count += 1
-                    
-                    if i % 10 == 0:
-                        print(f"[PROGRESS] {i}/{len(documents)} 문서 업로드 완료")
-                        
-                except Exception as e:
-                    print(f"[ERROR] 문서 {i} 업로드 실패: {e}")
+                # 메타데이터 정리 및 검증
+                cleaned_metadata = self._clean_metadata(doc.metadata)
+                
+                # 문서 내용 검증 강화
+                content = doc.page_content.strip()
+                if not content or len(content) < 20:
+                    print(f"[WARNING] 문서 {i}: 내용이 너무 짧아 건너뜀 (길이: {len(content)})")
+                    failed_count += 1
+                    continue
+                
+                # 무의미한 내용 필터링
+                if self._is_meaningless_content(content):
+                    print(f"[WARNING] 문서 {i}: 무의미한 내용으로 건너뜀")
                     failed_count += 1
                     continue
+                
+                cleaned_docs.append(Document(
+                    page_content=content,
+                    metadata=cleaned_metadata
+                ))
+            
+            if not cleaned_docs:
+                print("[WARNING] 업로드할 유효한 문서가 없습니다.")
+                return False
+            
+            # 고정 ID 로 인덱스와 비교해서 바뀐 문서만 배치 임베딩 + 배치 upsert
+            print(f"[INFO] {len(cleaned_docs)}개 문서 동기화 중...")
+            result = self.vector_store.sync_documents(cleaned_docs, delete_stale=delete_stale)
+            success_count = result["upserted"] + result["skipped"]
             
-            print(f"[SUCCESS] {success_count}/{len(documents)}개 문서 업로드 완료")
+            print(f"[SUCCESS] {success_count}/{len(documents)}개 문서 반영 완료 "
+                  f"(업로드 {result['upserted']}개, 변경 없음 {result['skipped']}개, {result['docs_per_sec']:.1f} docs/sec)")
             if failed_count > 0:
-                print(f"[WARNING] {failed_count}개 문서 업로드 실패")
+                print(f"[WARNING] {failed_count}개 문서 건너뜀")
             
             return success_count > 0
             
@@ -76,7 +76,7 @@ def main():
             dart_client=dart_client,
             document_service=document_service,
             max_workers=max_workers,
-            delay_between_requests=2.0,  # API 안정성을 위해 2초 딜레이
+            delay_between_requests=0.0,  # DART 요청 한도는 공용 전송 계층(dart_transport)에서 관리
             essential_only=True  # 필수 섹션만 처리
         )
         
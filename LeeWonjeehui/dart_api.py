@@ -53,20 +53,24 @@
 # if __name__ == "__main__":
 #     fetch_and_print_financial_statements()
 # dart_api.py
-import OpenDartReader
 import os
+
+import pandas as pd
 from dotenv import load_dotenv
 
+from dart_transport import get_json
+from corp_registry import get_corp_registry
+
 # LangChain Document 객체가 없다면 아래처럼 정의해도 무방합니다
 class Document:
     def __init__(self, page_content, metadata=None):
         self.page_content = page_content
         self.metadata = metadata or {}
 
+
 def fetch_financial_docs_from_dart(company="삼성전자", year=2023):
     load_dotenv()
     api_key = os.getenv('DART_API_KEY')
-    dart = OpenDartReader(api_key)
     company_map = {
         '삼성전자': '005930',
         'SK하이닉스': '000660',
@@ -87,10 +91,22 @@ def fetch_financial_docs_from_dart(company="삼성전자", year=2023):
         'HMM': '011200'
     }
     REPORT_CODE = '11011'
-    corp_code = company_map.get(company)
-    if corp_code is None:
+    stock_code = company_map.get(company)
+    if stock_code is None:
+        return []
+    # 종목코드 -> DART 기업코드 (corpCode.xml 은 공용 레지스트리에 저장된 목록 사용)
+    corp = get_corp_registry().by_stock_code(stock_code)
+    if corp is None:
         return []
-    fs = dart.finstate(corp_code, year, REPORT_CODE)
+    corp_code = corp.corp_code
+    # OpenDartReader.finstate 와 같은 단일회사 주요계정 API (공용 전송 계층으로 호출)
+    data = get_json('fnlttSinglAcnt.json', {
+        'crtfc_key': api_key,
+        'corp_code': corp_code,
+        'bsns_year': str(year),
+        'reprt_code': REPORT_CODE,
+    })
+    fs = pd.DataFrame(data.get('list', [])) if data.get('status') == '000' else None
     if fs is not None and len(fs) > 0:
         cfs = fs[fs['fs_div'] == 'CFS']
         if len(cfs) == 0:
@@ -9,10 +9,13 @@ from langchain_core.prompts import ChatPromptTemplate
 from langchain_openai import ChatOpenAI
 from langchain.chains import RetrievalQA
 from dart_api import fetch_financial_docs_from_dart  # (company, year) 인자 등 실제 구현에 맞춰 조정
+from embedding_cache import with_embedding_cache
 
 def run_hybrid_qa():
     load_dotenv()
-    embeddings = OpenAIEmbeddings(model=os.environ["OPENAI_EMBEDDING_MODEL"])
+    embedding_model = os.environ["OPENAI_EMBEDDING_MODEL"]
+    # 질의 임베딩도 적재(pinecone_embedding.py)와 같은 디스크 캐시를 사용
+    embeddings = with_embedding_cache(OpenAIEmbeddings(model=embedding_model), embedding_model)
     vector_store = PineconeVectorStore(
         index_name="financial",
         embedding=embeddings
@@ -29,6 +29,7 @@ from langchain_community.document_loaders import PyPDFLoader
 from langchain_openai import OpenAIEmbeddings
 from langchain_pinecone import PineconeVectorStore
 from pinecone import Pinecone, ServerlessSpec
+from embedding_cache import with_embedding_cache
 import os
 
 
@@ -66,7 +67,7 @@ def init_pinecone_vector_store(
         else:
             raise e
 
-    embeddings = OpenAIEmbeddings(model=embedding_model)
+    embeddings = with_embedding_cache(OpenAIEmbeddings(model=embedding_model), embedding_model)
     vector_store = PineconeVectorStore(
         index_name=index_name,
         embedding=embeddings